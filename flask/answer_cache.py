@@ -0,0 +1,289 @@
+"""
+Answer Cache
+Two-tier cache of health assistant LLM answers, keyed on a normalized form
+of the question so rephrasings of the same question share an entry
+
+An in-process LRU answers repeat questions without I/O; misses fall
+through to the assistant_answers table, which survives restarts and is
+shared by every worker. Only parsed LLM answers are stored; rule-based
+answers are cheaper to recompute than to look up.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from models import db, AssistantAnswer
+
+logger = logging.getLogger(__name__)
+
+# Filler words dropped from cache keys. Negations, quantities and words like
+# "before"/"after" are kept because they change what is being asked.
+STOPWORDS = frozenset((
+    'a', 'an', 'the', 'and', 'or', 'i', 'im', 'me', 'my', 'we', 'us', 'our', 'you', 'your', 'it', 'its',
+    'is', 'are', 'am', 'was', 'were', 'be', 'been', 'do', 'does', 'did', 'can', 'could', 'should',
+    'would', 'will', 'shall', 'may', 'might', 'must', 'what', 'whats', 'which', 'how', 'hows',
+    'please', 'tell', 'give', 'some', 'any', 'about', 'to', 'of', 'for', 'in', 'on', 'at', 'with',
+    'that', 'this', 'there', 'if', 'so', 'just', 'really', 'hi', 'hello', 'hey', 'thanks', 'thank',
+))
+
+APOSTROPHES = re.compile(r"['\u2019]")
+NON_WORD = re.compile(r"[^\w\s]+")
+MAX_KEY_LENGTH = 255
+
+
+def normalize_question(question):
+    """
+    Case-fold, strip punctuation and drop stopwords
+
+    "What should I EAT, with diabetes?" and "what to eat with diabetes"
+    both become "eat diabetes". Returns '' when nothing meaningful is left.
+    """
+    words = NON_WORD.sub(' ', APOSTROPHES.sub('', question.casefold())).split()
+    key = ' '.join(word for word in words if word not in STOPWORDS)
+    if len(key) > MAX_KEY_LENGTH:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        key = f"{key[:MAX_KEY_LENGTH - 33]}#{digest}"
+    return key
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU of parsed answers in front of the assistant_answers table
+
+    Entries expire `ttl` seconds after the answer was generated, in both
+    tiers. The table is trimmed to `max_rows` least recently used rows
+    every `prune_every` stores. Database errors are logged and counted but
+    never fail the request; the cache then behaves as memory-only.
+    Entries are keyed on (model, normalized question), where `model`
+    should identify both the LLM and the prompt that produced the answer.
+
+    Hits in either tier only count in memory. The counts and last-used
+    times are written to the table in one batch every `flush_interval`
+    seconds and before each prune, so reads never take the database's
+    write lock per request. Counts not yet flushed when a worker exits
+    are lost; they only steer which rows prune() keeps.
+    """
+
+    def __init__(self, maxsize=512, ttl=7 * 24 * 3600, max_rows=5000, persist=True, prune_every=50,
+                 flush_interval=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.persist = persist
+        self.prune_every = prune_every
+        self.flush_interval = flush_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._usage = {}
+        self._flushed_at = time.monotonic()
+        self.usage_flushes = 0
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.errors = 0
+
+    def _remember(self, key, created_at, result):
+        with self._lock:
+            self._entries[key] = (created_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @staticmethod
+    def _copy(result):
+        return {'answer': result['answer'], 'tips': list(result['tips'])}
+
+    def get(self, question, model):
+        """A cached {'answer', 'tips'} for question, or None"""
+        question_key = normalize_question(question)
+        if not question_key or self.maxsize <= 0:
+            return None
+
+        key = (model, question_key)
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= cutoff:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    self._used(key)
+                    return self._copy(entry[1])
+                del self._entries[key]
+                self.expirations += 1
+
+        if self.persist:
+            row = self._load(model, question_key, cutoff)
+            if row is not None:
+                created_at, result = row
+                self._remember(key, created_at, result)
+                with self._lock:
+                    self.db_hits += 1
+                    self._used(key)
+                return self._copy(result)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, question, model, result):
+        """Cache a parsed LLM answer for question"""
+        question_key = normalize_question(question)
+        if not question_key or not result.get('answer') or self.maxsize <= 0:
+            return
+
+        created_at = datetime.utcnow()
+        result = {'answer': result['answer'], 'tips': tuple(result['tips'])}
+        self._remember((model, question_key), created_at, result)
+        with self._lock:
+            self.stores += 1
+            prune = self.prune_every > 0 and self.stores % self.prune_every == 0
+
+        if self.persist:
+            self._save(model, question_key, created_at, result)
+            if prune:
+                self.prune()
+
+    def _used(self, key):
+        # Called with self._lock held
+        if not self.persist:
+            return
+        count, _ = self._usage.get(key, (0, None))
+        self._usage[key] = (count + 1, datetime.utcnow())
+        if time.monotonic() - self._flushed_at >= self.flush_interval and has_app_context():
+            # Written off the request thread; the timestamp is reset first so only one flush starts
+            self._flushed_at = time.monotonic()
+            app = current_app._get_current_object()
+            threading.Thread(target=self._flush_in_app, args=(app,), name='answer-cache-flush', daemon=True).start()
+
+    def _flush_in_app(self, app):
+        with app.app_context():
+            self.flush_usage()
+
+    def flush_usage(self):
+        """Write the hit counts and last-used times gathered since the last flush; returns rows updated"""
+        with self._lock:
+            usage, self._usage = self._usage, {}
+            self._flushed_at = time.monotonic()
+        if not usage:
+            return 0
+
+        table = AssistantAnswer.__table__
+        statement = (
+            db.update(table)
+            .where(table.c.model == db.bindparam('b_model'), table.c.question_key == db.bindparam('b_question_key'))
+            .values(hits=table.c.hits + db.bindparam('b_hits'), last_used_at=db.bindparam('b_last_used_at'))
+        )
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(statement, [
+                    {'b_model': model, 'b_question_key': question_key, 'b_hits': count, 'b_last_used_at': last_used_at}
+                    for (model, question_key), (count, last_used_at) in usage.items()
+                ])
+        except SQLAlchemyError:
+            self._failed("Failed to record assistant answer usage")
+            return 0
+        with self._lock:
+            self.usage_flushes += 1
+        return len(usage)
+
+    def _load(self, model, question_key, cutoff):
+        table = AssistantAnswer.__table__
+        try:
+            with db.engine.connect() as conn:
+                row = conn.execute(
+                    db.select(table.c.answer, table.c.tips, table.c.created_at)
+                    .where(table.c.model == model, table.c.question_key == question_key,
+                           table.c.created_at >= cutoff)
+                ).first()
+        except SQLAlchemyError:
+            self._failed("Failed to read a cached assistant answer")
+            return None
+        if row is None:
+            return None
+        return row.created_at, {'answer': row.answer, 'tips': tuple(json.loads(row.tips))}
+
+    def _save(self, model, question_key, created_at, result):
+        table = AssistantAnswer.__table__
+        values = {
+            'answer': result['answer'],
+            'tips': json.dumps(result['tips']),
+            'created_at': created_at,
+            'last_used_at': created_at,
+        }
+        try:
+            with db.engine.begin() as conn:
+                updated = conn.execute(
+                    db.update(table)
+                    .where(table.c.model == model, table.c.question_key == question_key)
+                    .values(**values)
+                ).rowcount
+                if not updated:
+                    conn.execute(db.insert(table).values(model=model, question_key=question_key, hits=0, **values))
+        except IntegrityError:
+            # Another worker stored the same question first; either answer will do
+            pass
+        except SQLAlchemyError:
+            self._failed("Failed to store an assistant answer")
+
+    def prune(self):
+        """Delete expired rows and all but the max_rows most recently used; returns rows deleted"""
+        self.flush_usage()
+        table = AssistantAnswer.__table__
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        try:
+            with db.engine.begin() as conn:
+                deleted = conn.execute(db.delete(table).where(table.c.created_at < cutoff)).rowcount
+                oldest_kept = conn.execute(
+                    db.select(table.c.last_used_at)
+                    .order_by(table.c.last_used_at.desc())
+                    .offset(self.max_rows - 1).limit(1)
+                ).scalar()
+                if oldest_kept is not None:
+                    deleted += conn.execute(db.delete(table).where(table.c.last_used_at < oldest_kept)).rowcount
+        except SQLAlchemyError:
+            self._failed("Failed to prune assistant answers")
+            return 0
+        return deleted
+
+    def _failed(self, message):
+        with self._lock:
+            self.errors += 1
+        logger.exception(message)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'persist': self.persist,
+                'memory_hits': self.memory_hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'pending_usage': len(self._usage),
+                'usage_flushes': self.usage_flushes,
+                'errors': self.errors,
+            }
@@ -1,27 +1,31 @@
 import os
-import numpy as np
-import pandas as pd
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash
+import json
+import hmac
+from functools import wraps
+from flask import Flask, Response, request, jsonify, render_template, redirect, url_for, flash, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from flask_migrate import Migrate
-import pickle
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from diet_planner import generate_diet_plan
 from health_checkup import generate_health_checkup_plan
-from health_assistant_ai import get_health_advice_ai as get_health_advice
+from health_assistant_ai import get_health_advice_ai as get_health_advice, stream_health_advice_ai as stream_health_advice
+from commands import register_commands
+from model_artifact import to_feature_matrix
+from model_registry import LiveModel, ModelRegistry
+from request_coalescer import RequestCoalescer
+from prediction_cache import PredictionCache, make_prediction_key
+from drift_monitor import DriftMonitor
+from fragment_cache import FragmentCache
+from llm_client import LLMClient
+from answer_cache import AnswerCache
+from assistant_jobs import AssistantJobRunner
+from llm_resilience import CircuitBreaker, LLMGuard
+from llm_limiter import LLMLimiter
+from knowledge_base import KnowledgeBase
 from models import db, User, HealthRecord, UserGamification, UserPreferences, Friendship
-from missions_manager import (
-    create_weekly_missions, get_user_mission_progress, 
-    update_mission_progress
-)
-from challenges_manager import (
-    create_seasonal_challenges, get_user_challenge_progress,
-    update_challenge_progress, get_current_season
-)
-from marketplace_manager import (
-    initialize_marketplace, get_available_items,
-    get_user_purchases, purchase_item
-)
+from bootstrap import bootstrap, ensure_current_period
+from missions_manager import get_user_mission_progress, update_mission_progress
+from challenges_manager import get_user_challenge_progress, update_challenge_progress
+from marketplace_manager import get_available_items, get_user_purchases, purchase_item
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY") or "dev-secret-key-change-in-production"
@@ -35,43 +39,178 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
+# Bearer token for the operational endpoints (/api/metrics, /api/drift); unset disables them
+app.config["INTERNAL_API_TOKEN"] = os.environ.get("INTERNAL_API_TOKEN") or None
+app.config["BATCH_PREDICT_MAX_ROWS"] = int(os.environ.get("BATCH_PREDICT_MAX_ROWS", "10000"))
+app.config["PREDICTION_CACHE_SIZE"] = int(os.environ.get("PREDICTION_CACHE_SIZE", "2048"))
+app.config["PREDICTION_CACHE_TTL"] = int(os.environ.get("PREDICTION_CACHE_TTL", "3600"))
+app.config["FRAGMENT_CACHE_SIZE"] = int(os.environ.get("FRAGMENT_CACHE_SIZE", "256"))
+app.config["MODEL_RELOAD_INTERVAL"] = float(os.environ.get("MODEL_RELOAD_INTERVAL", "5"))
+app.config["PREDICT_COALESCE_ENABLED"] = os.environ.get("PREDICT_COALESCE_ENABLED", "").lower() in ("1", "true", "yes")
+app.config["PREDICT_COALESCE_MAX_WAIT_MS"] = float(os.environ.get("PREDICT_COALESCE_MAX_WAIT_MS", "2"))
+app.config["PREDICT_COALESCE_MAX_BATCH"] = int(os.environ.get("PREDICT_COALESCE_MAX_BATCH", "64"))
+app.config["PREDICT_COALESCE_BYPASS_BELOW"] = int(os.environ.get("PREDICT_COALESCE_BYPASS_BELOW", "2"))
+app.config["PREDICT_COALESCE_TIMEOUT_MS"] = float(os.environ.get("PREDICT_COALESCE_TIMEOUT_MS", "100"))
+app.config["DRIFT_MONITOR_ENABLED"] = os.environ.get("DRIFT_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+app.config["DRIFT_FLUSH_INTERVAL"] = float(os.environ.get("DRIFT_FLUSH_INTERVAL", "60"))
+app.config["LLM_CONNECT_TIMEOUT"] = float(os.environ.get("LLM_CONNECT_TIMEOUT", "5"))
+app.config["LLM_READ_TIMEOUT"] = float(os.environ.get("LLM_READ_TIMEOUT", "30"))
+app.config["LLM_MAX_RETRIES"] = int(os.environ.get("LLM_MAX_RETRIES", "1"))
+app.config["LLM_MAX_CONNECTIONS"] = int(os.environ.get("LLM_MAX_CONNECTIONS", "20"))
+app.config["LLM_LATENCY_BUDGET"] = float(os.environ.get("LLM_LATENCY_BUDGET", "4"))
+app.config["LLM_MAX_INFLIGHT"] = int(os.environ.get("LLM_MAX_INFLIGHT", "32"))
+app.config["LLM_BREAKER_ERROR_RATE"] = float(os.environ.get("LLM_BREAKER_ERROR_RATE", "0.5"))
+app.config["LLM_BREAKER_P95_LATENCY"] = float(os.environ.get("LLM_BREAKER_P95_LATENCY", "8"))
+app.config["LLM_BREAKER_MIN_CALLS"] = int(os.environ.get("LLM_BREAKER_MIN_CALLS", "10"))
+app.config["LLM_BREAKER_WINDOW"] = float(os.environ.get("LLM_BREAKER_WINDOW", "60"))
+app.config["LLM_BREAKER_COOLDOWN"] = float(os.environ.get("LLM_BREAKER_COOLDOWN", "30"))
+app.config["LLM_MAX_CONCURRENT"] = int(os.environ.get("LLM_MAX_CONCURRENT", "8"))
+app.config["LLM_RATE_LIMIT"] = float(os.environ.get("LLM_RATE_LIMIT", "0"))
+app.config["LLM_RATE_BURST"] = int(os.environ.get("LLM_RATE_BURST", "0"))
+app.config["LLM_QUEUE_SIZE"] = int(os.environ.get("LLM_QUEUE_SIZE", "16"))
+app.config["LLM_QUEUE_TIMEOUT"] = float(os.environ.get("LLM_QUEUE_TIMEOUT", "2"))
+# Directory shared by all workers on the host; unset keeps the limits per worker
+app.config["LLM_LIMITER_DIR"] = os.environ.get("LLM_LIMITER_DIR") or None
+app.config["ASSISTANT_CACHE_SIZE"] = int(os.environ.get("ASSISTANT_CACHE_SIZE", "512"))
+app.config["ASSISTANT_CACHE_TTL"] = int(os.environ.get("ASSISTANT_CACHE_TTL", str(7 * 24 * 3600)))
+app.config["ASSISTANT_CACHE_MAX_ROWS"] = int(os.environ.get("ASSISTANT_CACHE_MAX_ROWS", "5000"))
+app.config["ASSISTANT_CACHE_PERSIST"] = os.environ.get("ASSISTANT_CACHE_PERSIST", "true").lower() in ("1", "true", "yes")
+app.config["ASSISTANT_CACHE_FLUSH_INTERVAL"] = float(os.environ.get("ASSISTANT_CACHE_FLUSH_INTERVAL", "60"))
+app.config["ASSISTANT_KB_ENABLED"] = os.environ.get("ASSISTANT_KB_ENABLED", "true").lower() in ("1", "true", "yes")
+app.config["ASSISTANT_KB_MIN_SCORE"] = float(os.environ.get("ASSISTANT_KB_MIN_SCORE", "0.2"))
+# Unset: always ask the LLM when a key is configured, the knowledge base only answers offline
+app.config["ASSISTANT_KB_CONFIDENT_SCORE"] = (
+    float(os.environ["ASSISTANT_KB_CONFIDENT_SCORE"]) if os.environ.get("ASSISTANT_KB_CONFIDENT_SCORE") else None
+)
+app.config["ASSISTANT_JOB_WORKERS"] = int(os.environ.get("ASSISTANT_JOB_WORKERS", "4"))
+app.config["ASSISTANT_JOB_MAX_PENDING"] = int(os.environ.get("ASSISTANT_JOB_MAX_PENDING", "32"))
+app.config["ASSISTANT_JOB_TIMEOUT"] = int(os.environ.get("ASSISTANT_JOB_TIMEOUT", "120"))
+# Web workers only: skip Flask-Migrate, which only the `flask db` commands need
+app.config["SLIM_STARTUP"] = os.environ.get("SLIM_STARTUP", "").lower() in ("1", "true", "yes")
 
 db.init_app(app)
-migrate = Migrate(app, db)
+migrate = None
+if not app.config["SLIM_STARTUP"]:
+    # Only the `flask db` commands need it, and alembic is slow to import
+    from flask_migrate import Migrate
+    migrate = Migrate(app, db)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
+register_commands(app)
 
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
 
-with app.app_context():
-    db.create_all()
-    initialize_marketplace()
-    create_weekly_missions()
-    from datetime import timedelta
-    season = get_current_season()
-    today = date.today()
-    season_starts = {
-        'winter': date(today.year if today.month == 12 else today.year - 1, 12, 1),
-        'spring': date(today.year, 3, 1),
-        'summer': date(today.year, 6, 1),
-        'fall': date(today.year, 9, 1)
-    }
-    season_start = season_starts.get(season, today)
-    season_end = season_start + timedelta(days=89)
-    create_seasonal_challenges(season, season_start, season_end)
+def internal_only(view):
+    '''
+    Serve view only to callers presenting INTERNAL_API_TOKEN as a bearer token; 404 while no token is configured
+    '''
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = app.config["INTERNAL_API_TOKEN"]
+        if not token:
+            return jsonify({'error': 'Not found'}), 404
+        presented = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(presented.encode(), f"Bearer {token}".encode()):
+            return jsonify({'error': 'Unauthorized'}), 401, {'WWW-Authenticate': 'Bearer'}
+        return view(*args, **kwargs)
+    return wrapper
+
+# Endpoints that never read or credit missions and challenges, so they skip the period check
+PERIOD_FREE_ENDPOINTS = frozenset(('static', 'predict_batch', 'metrics', 'drift', 'assistant_job_status'))
+
+@app.before_request
+def seed_new_period():
+    # Tables and seed data come from `flask bootstrap`; this only rolls over weeks and seasons
+    if request.endpoint is None or request.endpoint in PERIOD_FREE_ENDPOINTS:
+        return
+    ensure_current_period()
+
+# Active scaler + classifier from the model registry, hot-swapped when ACTIVE changes.
+# Linear models are scored as one dot product; anything else uses the estimator.
+live_model = LiveModel(ModelRegistry(), poll_interval=app.config["MODEL_RELOAD_INTERVAL"])
+
+# Optional micro-batching of concurrent single-row predictions
+request_coalescer = None
+if app.config["PREDICT_COALESCE_ENABLED"]:
+    request_coalescer = RequestCoalescer(
+        max_wait=app.config["PREDICT_COALESCE_MAX_WAIT_MS"] / 1000,
+        max_batch_size=app.config["PREDICT_COALESCE_MAX_BATCH"],
+        bypass_below=app.config["PREDICT_COALESCE_BYPASS_BELOW"],
+        result_timeout=app.config["PREDICT_COALESCE_TIMEOUT_MS"] / 1000
+    )
+
+prediction_cache = PredictionCache(
+    maxsize=app.config["PREDICTION_CACHE_SIZE"],
+    ttl=app.config["PREDICTION_CACHE_TTL"]
+)
+
+# Rendered HTML of the plan sections that depend only on the plan variant
+fragment_cache = FragmentCache(maxsize=app.config["FRAGMENT_CACHE_SIZE"])
+app.jinja_env.globals['cached_fragment'] = fragment_cache.render
+
+# Streaming input/prediction statistics compared against the training data at /api/drift
+drift_monitor = None
+if app.config["DRIFT_MONITOR_ENABLED"]:
+    drift_monitor = DriftMonitor(flush_interval=app.config["DRIFT_FLUSH_INTERVAL"])
+
+# One keep-alive OpenAI connection pool per worker for the health assistant
+llm_client = LLMClient(
+    connect_timeout=app.config["LLM_CONNECT_TIMEOUT"],
+    read_timeout=app.config["LLM_READ_TIMEOUT"],
+    max_retries=app.config["LLM_MAX_RETRIES"],
+    max_connections=app.config["LLM_MAX_CONNECTIONS"]
+)
+
+# Rule-based answers when the LLM is over its latency budget or the breaker is open
+llm_guard = LLMGuard(
+    budget=app.config["LLM_LATENCY_BUDGET"],
+    max_inflight=app.config["LLM_MAX_INFLIGHT"],
+    breaker=CircuitBreaker(
+        error_rate=app.config["LLM_BREAKER_ERROR_RATE"],
+        p95_latency=app.config["LLM_BREAKER_P95_LATENCY"],
+        min_calls=app.config["LLM_BREAKER_MIN_CALLS"],
+        window=app.config["LLM_BREAKER_WINDOW"],
+        cooldown=app.config["LLM_BREAKER_COOLDOWN"]
+    )
+)
 
-model = pickle.load(open('model.pkl', 'rb'))
+# Caps concurrent and per-second OpenAI requests; the overflow gets rule-based answers
+llm_limiter = LLMLimiter(
+    max_concurrent=app.config["LLM_MAX_CONCURRENT"],
+    rate=app.config["LLM_RATE_LIMIT"],
+    burst=app.config["LLM_RATE_BURST"],
+    max_queue=app.config["LLM_QUEUE_SIZE"],
+    max_wait=app.config["LLM_QUEUE_TIMEOUT"],
+    shared_dir=app.config["LLM_LIMITER_DIR"]
+)
 
-dataset = pd.read_csv('diabetes.csv')
+# Local retrieval over the built-in diabetes guidance: answers without an API
+# key or when the LLM is unavailable, and instead of the LLM on a close match
+knowledge_base = None
+if app.config["ASSISTANT_KB_ENABLED"]:
+    knowledge_base = KnowledgeBase(
+        min_score=app.config["ASSISTANT_KB_MIN_SCORE"],
+        confident_score=app.config["ASSISTANT_KB_CONFIDENT_SCORE"]
+    )
 
-dataset_X = dataset.iloc[:,[1, 2, 5, 7]].values
+# LLM answers by normalized question, in memory and in assistant_answers
+answer_cache = AnswerCache(
+    maxsize=app.config["ASSISTANT_CACHE_SIZE"],
+    ttl=app.config["ASSISTANT_CACHE_TTL"],
+    max_rows=app.config["ASSISTANT_CACHE_MAX_ROWS"],
+    persist=app.config["ASSISTANT_CACHE_PERSIST"],
+    flush_interval=app.config["ASSISTANT_CACHE_FLUSH_INTERVAL"]
+)
 
-from sklearn.preprocessing import MinMaxScaler
-sc = MinMaxScaler(feature_range = (0,1))
-dataset_scaled = sc.fit_transform(dataset_X)
+# Background answers for /health-assistant/jobs, off the request workers
+assistant_jobs = AssistantJobRunner(
+    max_workers=app.config["ASSISTANT_JOB_WORKERS"],
+    max_pending=app.config["ASSISTANT_JOB_MAX_PENDING"],
+    job_timeout=app.config["ASSISTANT_JOB_TIMEOUT"]
+)
 
 
 @app.route('/')
@@ -183,7 +322,8 @@ def dashboard():
 @login_required
 def health_assistant():
     question = request.json.get('question', '')
-    advice = get_health_advice(question)
+    advice = get_health_advice(question, llm_client, answer_cache, llm_guard, llm_limiter=llm_limiter,
+                               knowledge_base=knowledge_base)
     
     if current_user.is_authenticated:
         update_mission_progress(current_user.id, 'assistant_queries')
@@ -191,131 +331,232 @@ def health_assistant():
     
     return jsonify(advice)
 
-@app.route('/predict',methods=['POST'])
-def predict():
+def answer_assistant_question(question):
     '''
-    For rendering results on HTML GUI
+    Assistant answer for background jobs, which wait out slow LLM calls instead of hedging
+    '''
+    return get_health_advice(question, llm_client, answer_cache, llm_guard, hedge=False, llm_limiter=llm_limiter,
+                             knowledge_base=knowledge_base)
+
+@app.route('/health-assistant/stream', methods=['POST'])
+@login_required
+def health_assistant_stream():
+    '''
+    Stream the assistant's answer as Server-Sent Events.
+
+    Takes a JSON body as for /health-assistant. "token" events carry
+    {"text": ...} as the model generates it; a final "done" event carries the
+    parsed {"answer", "tips"}, after which the response ends. Read it with
+    fetch(); being POST-only it cannot be opened, or reopened, by EventSource
+    or a cross-site GET. Missions and challenges are credited once "done" has
+    been sent.
+
+    The response holds its worker until the answer is complete, so this only
+    relieves sync workers if the app runs threaded or async ones (e.g.
+    gunicorn --worker-class gthread); otherwise use /health-assistant/jobs.
+    '''
+    question = (request.get_json(silent=True) or {}).get('question', '')
+    user_id = current_user.id
+    
+    def events():
+        for event, data in stream_health_advice(question, llm_client, answer_cache, llm_guard, llm_limiter, knowledge_base):
+            payload = {'text': data} if event == 'token' else data
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        update_mission_progress(user_id, 'assistant_queries')
+        update_challenge_progress(user_id, 'assistant_queries')
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/health-assistant/jobs', methods=['POST'])
+@login_required
+def create_assistant_job():
+    '''
+    Answer a question in the background instead of holding this worker.
+
+    Returns 202 with a job ID and status URL to poll, or 503 when this
+    worker's job queue is full.
+    '''
+    question = request.json.get('question', '')
+    job_id = assistant_jobs.submit(current_user.id, question, answer_assistant_question)
+    if job_id is None:
+        return jsonify({'error': 'The assistant is busy, please try again shortly'}), 503, {'Retry-After': '2'}
+    
+    update_mission_progress(current_user.id, 'assistant_queries')
+    update_challenge_progress(current_user.id, 'assistant_queries')
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': 'pending',
+        'status_url': url_for('assistant_job_status', job_id=job_id)
+    }), 202
+
+@app.route('/health-assistant/jobs/<job_id>')
+@login_required
+def assistant_job_status(job_id):
+    '''
+    Status of a background assistant job; includes "answer" and "tips" once "done"
+    '''
+    job = assistant_jobs.status(job_id, current_user.id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+def parse_prediction_form(form):
+    '''
+    Extract the health check inputs from the /predict form
+    '''
+    glucose = float(form.get('Glucose Level'))
+    insulin = float(form.get('Insulin'))
+    bmi = float(form.get('BMI'))
+    age = float(form.get('Age'))
+    bp_systolic = float(form.get('Blood Pressure Systolic'))
+    bp_diastolic = float(form.get('Blood Pressure Diastolic'))
+    family_history = form.get('Family History') == 'yes'
+    return glucose, insulin, bmi, age, bp_systolic, bp_diastolic, family_history
+
+def record_health_check(user, glucose, insulin, bmi, age, bp_systolic, bp_diastolic,
+                        family_history, pred_value, model_version):
+    '''
+    Save a health record and apply gamification, missions and challenges
     '''
-    # Extract form values
-    glucose = float(request.form.get('Glucose Level'))
-    insulin = float(request.form.get('Insulin'))
-    bmi = float(request.form.get('BMI'))
-    age = float(request.form.get('Age'))
-    bp_systolic = float(request.form.get('Blood Pressure Systolic'))
-    bp_diastolic = float(request.form.get('Blood Pressure Diastolic'))
-    family_history = request.form.get('Family History') == 'yes'
-    
-    # Prepare features for ML model (original 4 features)
-    float_features = [glucose, insulin, bmi, age]
-    final_features = [np.array(float_features)]
-    prediction = model.predict( sc.transform(final_features) )
-    
-    pred_value = int(prediction[0])
+    record = HealthRecord(
+        user_id=user.id,
+        glucose=glucose,
+        insulin=insulin,
+        bmi=bmi,
+        age=int(age),
+        bp_systolic=bp_systolic,
+        bp_diastolic=bp_diastolic,
+        family_history=family_history,
+        prediction=pred_value,
+        model_version=model_version
+    )
+    db.session.add(record)
     
-    if pred_value == 1:
-        pred = "You have Diabetes, please consult a Doctor."
-    else:
-        pred = "You don't have Diabetes."
-    output = pred
+    # Update gamification
+    gamification = user.gamification
+    if not gamification:
+        gamification = UserGamification(user=user)
+        db.session.add(gamification)
     
-    # Save health record if user is logged in
-    if current_user.is_authenticated:
-        record = HealthRecord(
-            user_id=current_user.id,
-            glucose=glucose,
-            insulin=insulin,
-            bmi=bmi,
-            age=int(age),
-            bp_systolic=bp_systolic,
-            bp_diastolic=bp_diastolic,
-            family_history=family_history,
-            prediction=pred_value
-        )
-        db.session.add(record)
-        
-        # Update gamification
-        gamification = current_user.gamification
-        if not gamification:
-            gamification = UserGamification(user=current_user)
-            db.session.add(gamification)
-        
-        # Update health points and XP
-        gamification.health_points += 10
-        gamification.add_xp(20)
-        gamification.total_checks += 1
-        
-        # Update streak
-        today = date.today()
-        if gamification.last_check_date == today:
-            pass
-        elif gamification.last_check_date == date.fromordinal(today.toordinal() - 1):
-            gamification.current_streak += 1
-            gamification.add_xp(5)
-            if gamification.current_streak > gamification.longest_streak:
-                gamification.longest_streak = gamification.current_streak
-            
-            streak_missions = update_mission_progress(current_user.id, 'streak')
-            for mission in streak_missions:
-                gamification.add_xp(mission.xp_reward)
-                gamification.health_points += mission.points_reward
-                flash(f'Streak mission completed: {mission.title}!', 'success')
-            
-            streak_challenges = update_challenge_progress(current_user.id, 'streak')
-            for challenge in streak_challenges:
-                gamification.add_xp(challenge.xp_reward)
-                gamification.health_points += challenge.points_reward
-                if challenge.badge_reward:
-                    gamification.add_badge(challenge.badge_reward)
-                flash(f'Streak challenge completed: {challenge.title}!', 'success')
-        else:
-            gamification.current_streak = 1
-        
-        gamification.last_check_date = today
-        
-        # Award badges and XP bonuses
-        if gamification.total_checks == 1:
-            gamification.add_badge('First Check')
-            gamification.add_xp(50)
-        if gamification.total_checks == 5:
-            gamification.add_badge('Health Enthusiast')
-            gamification.add_xp(100)
-        if gamification.total_checks == 10:
-            gamification.add_badge('Committed')
-            gamification.add_xp(200)
-        if gamification.current_streak >= 7:
-            gamification.add_badge('Week Warrior')
-            gamification.add_xp(150)
-        if gamification.current_streak >= 30:
-            gamification.add_badge('Monthly Master')
-            gamification.add_xp(500)
-        
-        db.session.commit()
+    # Update health points and XP
+    gamification.health_points += 10
+    gamification.add_xp(20)
+    gamification.total_checks += 1
+    
+    # Update streak
+    today = date.today()
+    if gamification.last_check_date == today:
+        pass
+    elif gamification.last_check_date == date.fromordinal(today.toordinal() - 1):
+        gamification.current_streak += 1
+        gamification.add_xp(5)
+        if gamification.current_streak > gamification.longest_streak:
+            gamification.longest_streak = gamification.current_streak
         
-        completed_missions = update_mission_progress(current_user.id, 'health_checks')
-        for mission in completed_missions:
+        streak_missions = update_mission_progress(user.id, 'streak')
+        for mission in streak_missions:
             gamification.add_xp(mission.xp_reward)
             gamification.health_points += mission.points_reward
-            flash(f'Mission completed: {mission.title}! +{mission.xp_reward} XP, +{mission.points_reward} points', 'success')
+            flash(f'Streak mission completed: {mission.title}!', 'success')
         
-        completed_challenges = update_challenge_progress(current_user.id, 'health_checks')
-        for challenge in completed_challenges:
+        streak_challenges = update_challenge_progress(user.id, 'streak')
+        for challenge in streak_challenges:
             gamification.add_xp(challenge.xp_reward)
             gamification.health_points += challenge.points_reward
             if challenge.badge_reward:
                 gamification.add_badge(challenge.badge_reward)
-            flash(f'Challenge completed: {challenge.title}! +{challenge.xp_reward} XP, +{challenge.points_reward} points', 'success')
+            flash(f'Streak challenge completed: {challenge.title}!', 'success')
+    else:
+        gamification.current_streak = 1
+    
+    gamification.last_check_date = today
+    
+    # Award badges and XP bonuses
+    if gamification.total_checks == 1:
+        gamification.add_badge('First Check')
+        gamification.add_xp(50)
+    if gamification.total_checks == 5:
+        gamification.add_badge('Health Enthusiast')
+        gamification.add_xp(100)
+    if gamification.total_checks == 10:
+        gamification.add_badge('Committed')
+        gamification.add_xp(200)
+    if gamification.current_streak >= 7:
+        gamification.add_badge('Week Warrior')
+        gamification.add_xp(150)
+    if gamification.current_streak >= 30:
+        gamification.add_badge('Monthly Master')
+        gamification.add_xp(500)
+    
+    db.session.commit()
+    
+    completed_missions = update_mission_progress(user.id, 'health_checks')
+    for mission in completed_missions:
+        gamification.add_xp(mission.xp_reward)
+        gamification.health_points += mission.points_reward
+        flash(f'Mission completed: {mission.title}! +{mission.xp_reward} XP, +{mission.points_reward} points', 'success')
+    
+    completed_challenges = update_challenge_progress(user.id, 'health_checks')
+    for challenge in completed_challenges:
+        gamification.add_xp(challenge.xp_reward)
+        gamification.health_points += challenge.points_reward
+        if challenge.badge_reward:
+            gamification.add_badge(challenge.badge_reward)
+        flash(f'Challenge completed: {challenge.title}! +{challenge.xp_reward} XP, +{challenge.points_reward} points', 'success')
+    
+    db.session.commit()
+    flash('Health record saved successfully!', 'success')
+
+@app.route('/predict',methods=['POST'])
+def predict():
+    '''
+    For rendering results on HTML GUI
+    '''
+    glucose, insulin, bmi, age, bp_systolic, bp_diastolic, family_history = parse_prediction_form(request.form)
+    
+    # One snapshot of the model for the whole request
+    loaded_model = live_model.current
+    
+    # Prediction and both plans depend only on the inputs and the model version
+    cache_key = make_prediction_key(glucose, insulin, bmi, age, bp_systolic, bp_diastolic, family_history)
+    cached = prediction_cache.get(cache_key, loaded_model.version)
+    if cached:
+        pred_value, diet_plan, checkup_plan = cached
+    else:
+        # Prepare features for ML model (original 4 features)
+        float_features = [glucose, insulin, bmi, age]
+        if request_coalescer:
+            pred_value = int(request_coalescer.predict_one(loaded_model, float_features))
+        else:
+            pred_value = int(loaded_model.scorer.predict_one(float_features))
         
-        db.session.commit()
-        flash('Health record saved successfully!', 'success')
+        # Generate diet plan
+        diet_plan = generate_diet_plan(glucose, insulin, bmi, age, pred_value)
+        
+        # Generate health checkup plan
+        checkup_plan = generate_health_checkup_plan(
+            age, bmi, glucose, bp_systolic, bp_diastolic, 
+            pred_value, family_history
+        )
+        prediction_cache.put(cache_key, loaded_model.version, (pred_value, diet_plan, checkup_plan))
     
-    # Generate diet plan
-    diet_plan = generate_diet_plan(glucose, insulin, bmi, age, pred_value)
+    if drift_monitor:
+        drift_monitor.observe(loaded_model, (glucose, insulin, bmi, age), pred_value)
     
-    # Generate health checkup plan
-    checkup_plan = generate_health_checkup_plan(
-        age, bmi, glucose, bp_systolic, bp_diastolic, 
-        pred_value, family_history
-    )
+    if pred_value == 1:
+        pred = "You have Diabetes, please consult a Doctor."
+    else:
+        pred = "You don't have Diabetes."
+    output = pred
+    
+    # Save health record if user is logged in
+    if current_user.is_authenticated:
+        record_health_check(
+            current_user, glucose, insulin, bmi, age, bp_systolic, bp_diastolic,
+            family_history, pred_value, loaded_model.version
+        )
     
     # Prepare chart data for visualizations
     chart_data = {
@@ -335,6 +576,72 @@ def predict():
                          checkup_plan=checkup_plan,
                          chart_data=chart_data)
 
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    '''
+    Score many feature rows in one vectorized call.
+
+    Expects JSON: {"rows": [[glucose, insulin, bmi, age], ...], "include_scores": false}
+    Rows may also be objects keyed by Glucose, Insulin, BMI and Age.
+    Results are returned in input order.
+    '''
+    payload = request.get_json(silent=True) or {}
+    
+    try:
+        features = to_feature_matrix(payload.get('rows'), max_rows=app.config["BATCH_PREDICT_MAX_ROWS"])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    loaded_model = live_model.current
+    if payload.get('include_scores') and not loaded_model.scorer.has_scores:
+        return jsonify({'error': 'Scores unavailable for this model'}), 400
+    result = {
+        'model_version': loaded_model.version,
+        'count': len(features),
+        'predictions': loaded_model.scorer.predict(features).tolist()
+    }
+    if payload.get('include_scores'):
+        result['scores'] = loaded_model.scorer.decision_function(features).tolist()
+    
+    return jsonify(result)
+
+@app.route('/api/metrics')
+@internal_only
+def metrics():
+    '''
+    Internal cache, model and LLM counters; requires the INTERNAL_API_TOKEN bearer token
+    '''
+    return jsonify({
+        'model': live_model.stats(),
+        'prediction_cache': prediction_cache.stats(),
+        'fragment_cache': fragment_cache.stats(),
+        'request_coalescer': request_coalescer.stats() if request_coalescer else None,
+        'drift_monitor': drift_monitor.stats() if drift_monitor else None,
+        'llm_client': llm_client.stats(),
+        'llm_guard': llm_guard.stats(),
+        'llm_limiter': llm_limiter.stats(),
+        'knowledge_base': knowledge_base.stats() if knowledge_base else None,
+        'answer_cache': answer_cache.stats(),
+        'assistant_jobs': assistant_jobs.stats()
+    })
+
+@app.route('/api/drift')
+@internal_only
+def drift():
+    '''
+    Compare recent /predict inputs and predictions with the active model's training data.
+
+    ?minutes=N sets how far back flushed snapshots are included (default 60).
+    Per feature: PSI, KS distance, live vs reference mean/std and out-of-range counts.
+    Requires the INTERNAL_API_TOKEN bearer token.
+    '''
+    if not drift_monitor:
+        return jsonify({'error': 'Drift monitoring is disabled'}), 404
+    
+    minutes = request.args.get('minutes', 60, type=int)
+    since = datetime.utcnow() - timedelta(minutes=minutes)
+    return jsonify(drift_monitor.report(live_model.current, since))
+
 @app.route('/missions')
 @login_required
 def missions():
@@ -511,4 +818,7 @@ def preferences():
     return render_template('preferences.html', preferences=user_prefs)
 
 if __name__ == "__main__":
+    # The dev server sets itself up; deployments run `flask bootstrap` once instead
+    with app.app_context():
+        bootstrap()
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,176 @@
+"""
+Assistant Jobs
+Answers health assistant questions in the background so a slow LLM call
+does not hold a web worker; job state lives in assistant_jobs so any
+worker can answer a status poll
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models import db, AssistantJob
+
+logger = logging.getLogger(__name__)
+
+
+class AssistantJobRunner:
+    """
+    Bounded per-process thread pool for assistant questions
+
+    submit() stores a pending job and returns its ID straight away; a pool
+    thread answers it inside an app context and stores the result. Each
+    process queues or runs at most max_pending jobs and refuses more.
+    A job has job_timeout seconds to finish: one still queued at its
+    deadline is never started, and a result stored after it is dropped, so
+    a job reported as expired stays expired. Jobs are deleted after
+    `retention` seconds.
+    """
+
+    def __init__(self, max_workers=4, max_pending=32, job_timeout=120, retention=3600, prune_every=50):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.job_timeout = job_timeout
+        self.retention = retention
+        self.prune_every = prune_every
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+        self.rejected = 0
+        self._pending = 0
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Pool threads do not survive fork, so each process starts its own
+        if self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='assistant-job')
+            self._executor_pid = os.getpid()
+            self._pending = 0
+        return self._executor
+
+    def submit(self, user_id, question, answer):
+        """
+        Queue answer(question) for user_id
+
+        Args:
+            user_id: Owner of the job; only they can read its status
+            question: Question text
+            answer: Callable returning the {'answer', 'tips'} dict, run in an app context
+
+        Returns:
+            str: Job ID, or None when this process already has max_pending jobs
+        """
+        from flask import current_app
+
+        with self._lock:
+            executor = self._get_executor()
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                return None
+            self._pending += 1
+            self.submitted += 1
+            prune = self.prune_every > 0 and self.submitted % self.prune_every == 0
+
+        job_id = uuid.uuid4().hex
+        try:
+            db.session.add(AssistantJob(id=job_id, user_id=user_id, question=question, status='pending'))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        deadline = time.monotonic() + self.job_timeout
+        executor.submit(self._run, current_app._get_current_object(), job_id, question, answer, deadline)
+        if prune:
+            self.prune()
+        return job_id
+
+    def _run(self, app, job_id, question, answer, deadline):
+        status = 'error'
+        try:
+            with app.app_context():
+                result = None
+                if time.monotonic() >= deadline:
+                    # Already reported as expired; do not spend an LLM call on it
+                    status = 'expired'
+                else:
+                    try:
+                        result = json.dumps(answer(question))
+                        status = 'done'
+                    except Exception:
+                        logger.exception("Assistant job %s failed", job_id)
+                now = datetime.utcnow()
+                # Same cutoff as status(): a result that lands after the deadline is dropped
+                stored = db.session.execute(
+                    db.update(AssistantJob)
+                    .where(AssistantJob.id == job_id, AssistantJob.status == 'pending')
+                    .where(AssistantJob.created_at >= now - timedelta(seconds=self.job_timeout))
+                    .values(status=status, result=result, finished_at=now)
+                ).rowcount
+                if not stored:
+                    status = 'expired'
+                    db.session.execute(
+                        db.update(AssistantJob)
+                        .where(AssistantJob.id == job_id, AssistantJob.status == 'pending')
+                        .values(status=status, finished_at=now)
+                    )
+                db.session.commit()
+        except Exception:
+            status = 'error'
+            logger.exception("Failed to store the result of assistant job %s", job_id)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                if status == 'done':
+                    self.completed += 1
+                elif status == 'expired':
+                    self.expired += 1
+                else:
+                    self.failed += 1
+
+    def status(self, job_id, user_id):
+        """The job's status, plus 'answer' and 'tips' once done; None if unknown or not user_id's"""
+        job = db.session.get(AssistantJob, job_id)
+        if job is None or job.user_id != user_id:
+            return None
+
+        body = {'job_id': job.id, 'status': job.status}
+        if job.status == 'pending' and job.created_at < datetime.utcnow() - timedelta(seconds=self.job_timeout):
+            body['status'] = 'expired'
+        elif job.status == 'done':
+            body.update(json.loads(job.result))
+        return body
+
+    def prune(self):
+        """Delete jobs older than the retention period; returns rows deleted"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention)
+        try:
+            deleted = db.session.execute(db.delete(AssistantJob).where(AssistantJob.created_at < cutoff)).rowcount
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Failed to prune assistant jobs")
+            return 0
+        return deleted
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'pending': self._pending if self._executor_pid == os.getpid() else 0,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'expired': self.expired,
+                'rejected': self.rejected,
+            }
@@ -0,0 +1,216 @@
+"""
+Batch Scoring
+Streams large patient extracts in diabetes.csv format through the model
+in fixed-size chunks, so memory stays bounded regardless of file size
+
+Identifier and other non-feature columns can be carried through to the
+output, so results can be joined back to patients without relying on
+row position.
+"""
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from model_artifact import FEATURE_NAMES
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Columns score_file() adds; kept input columns may not reuse these names
+RESULT_COLUMNS = ('prediction', 'score', 'model_version')
+
+_worker_scorer = None
+
+
+def _init_worker(scorer):
+    global _worker_scorer
+    _worker_scorer = scorer
+
+
+def _score_in_worker(features):
+    return score_chunk(_worker_scorer, features)
+
+
+def score_chunk(scorer, features):
+    """
+    Score one chunk of raw features
+
+    Rows with missing or non-finite values are not scored; their
+    prediction comes back as -1 and their score as NaN.
+
+    Returns:
+        tuple: (predictions, scores) arrays aligned with the input rows
+    """
+    valid = np.isfinite(features).all(axis=1)
+    predictions = np.full(len(features), -1, dtype=np.int8)
+    scores = np.full(len(features), np.nan)
+    if valid.any():
+        predictions[valid] = scorer.predict(features[valid])
+        scores[valid] = scorer.decision_function(features[valid])
+    return predictions, scores
+
+
+def resolve_keep_columns(input_path, keep_columns):
+    """
+    Check the input columns to carry through to the output
+
+    Args:
+        input_path: CSV to be scored
+        keep_columns: Column names, or ['*'] for every non-feature column
+
+    Returns:
+        list: Column names in input order
+
+    Raises:
+        ValueError: A column is missing from the input or clashes with an output column
+    """
+    import pandas as pd
+
+    if not keep_columns:
+        return []
+    header = list(pd.read_csv(input_path, nrows=0).columns)
+    if list(keep_columns) == ['*']:
+        keep_columns = [name for name in header if name not in FEATURE_NAMES]
+
+    missing = [name for name in keep_columns if name not in header]
+    if missing:
+        raise ValueError(f"Columns not found in {input_path}: {', '.join(missing)}")
+    clashing = [name for name in keep_columns if name in FEATURE_NAMES or name in RESULT_COLUMNS]
+    if clashing:
+        raise ValueError(f"Columns already in the output: {', '.join(clashing)}")
+    return [name for name in header if name in keep_columns]
+
+
+def iter_feature_chunks(input_path, chunk_size=DEFAULT_CHUNK_SIZE, keep_columns=()):
+    """
+    Yield (features, kept) per chunk, reading only the model's and the kept columns
+
+    features is a float array in FEATURE_NAMES order; kept is a DataFrame
+    of the keep_columns, read as strings so identifiers such as "00123"
+    survive and every chunk has the same column types, or None.
+    """
+    import pandas as pd
+
+    keep_columns = list(keep_columns)
+    reader = pd.read_csv(
+        input_path, usecols=FEATURE_NAMES + keep_columns, chunksize=chunk_size,
+        dtype={name: 'string' for name in keep_columns}
+    )
+    for frame in reader:
+        kept = frame[keep_columns].reset_index(drop=True) if keep_columns else None
+        features = frame[FEATURE_NAMES].apply(pd.to_numeric, errors='coerce')
+        yield features.to_numpy(dtype=np.float64), kept
+
+
+class _CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode='w' if self.header else 'a', header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        pass
+
+
+class _ParquetSink:
+    def __init__(self, path):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow: pip install pyarrow")
+        self.path = path
+        self.writer = None
+
+    def write(self, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _open_sink(output_path, output_format):
+    if output_format is None:
+        output_format = 'parquet' if output_path.endswith(('.parquet', '.pq')) else 'csv'
+    if output_format == 'parquet':
+        return _ParquetSink(output_path)
+    return _CsvSink(output_path)
+
+
+def score_file(input_path, output_path, scorer, chunk_size=DEFAULT_CHUNK_SIZE,
+               workers=1, output_format=None, model_version=None, keep_columns=()):
+    """
+    Score a CSV file chunk by chunk and write results incrementally
+
+    Args:
+        input_path: CSV with at least the Glucose, Insulin, BMI and Age columns
+        output_path: Destination .csv or .parquet file
+        scorer: Scorer from inference.build_scorer()
+        chunk_size: Rows read and scored at a time
+        workers: Processes to spread chunks across; 0 uses every core
+        output_format: 'csv' or 'parquet'; inferred from output_path if None
+        model_version: Written into each output row when given
+        keep_columns: Input columns copied into the output ahead of the
+            features, e.g. a patient ID; ['*'] keeps every non-feature column
+
+    Returns:
+        dict: Summary with row, invalid row and chunk counts and elapsed time
+    """
+    import pandas as pd
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    keep_columns = resolve_keep_columns(input_path, keep_columns)
+    sink = _open_sink(output_path, output_format)
+    summary = {'rows': 0, 'invalid_rows': 0, 'chunks': 0, 'kept_columns': keep_columns}
+
+    def write(features, kept, predictions, scores):
+        # Built from the parsed floats so every chunk has the same column types
+        frame = pd.DataFrame(features, columns=FEATURE_NAMES)
+        if kept is not None:
+            frame = pd.concat([kept, frame], axis=1)
+        frame['prediction'] = predictions
+        frame['score'] = scores
+        if model_version:
+            frame['model_version'] = model_version
+        sink.write(frame)
+        summary['rows'] += len(frame)
+        summary['invalid_rows'] += int((predictions < 0).sum())
+        summary['chunks'] += 1
+
+    try:
+        chunks = iter_feature_chunks(input_path, chunk_size, keep_columns)
+        if workers == 1:
+            for features, kept in chunks:
+                write(features, kept, *score_chunk(scorer, features))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Keep a bounded number of chunks in flight and write them back in input order;
+            # only the features go to the workers, kept columns wait here
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scorer,)) as pool:
+                for features, kept in chunks:
+                    pending.append((features, kept, pool.submit(_score_in_worker, features)))
+                    if len(pending) >= workers * 2:
+                        features, kept, future = pending.popleft()
+                        write(features, kept, *future.result())
+                while pending:
+                    features, kept, future = pending.popleft()
+                    write(features, kept, *future.result())
+    finally:
+        sink.close()
+
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    return summary
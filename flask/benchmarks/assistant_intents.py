@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Intent matching cost for the rule-based health assistant
+
+Times the compiled Aho-Corasick matcher against a plain substring scan of
+the same rule table over a corpus of realistic questions, first with the
+shipped rules and then with synthetic intents appended, to show how each
+scales with the size of the table. Every question's intent is checked
+against the substring scan.
+
+Usage (from the flask/ directory):
+    python benchmarks/assistant_intents.py --repeat 2000 --extra-intents 0 50 200
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUESTIONS = (
+    "What should I eat for breakfast if I have type 2 diabetes?",
+    "Is a keto diet safe with high blood sugar?",
+    "Which foods raise my sugar the fastest?",
+    "Can I eat fruit every day?",
+    "What is a healthy diet for weight loss?",
+    "Are there any foods I should avoid completely?",
+    "How much exercise do I need each week?",
+    "Is it better to work out in the morning or the evening?",
+    "What kind of physical activity is safe for bad knees?",
+    "Should I check my blood sugar after a workout?",
+    "How often should I check my blood sugar?",
+    "What is a normal fasting glucose level?",
+    "Do I need a continuous glucose monitor?",
+    "My readings are high in the morning, why?",
+    "How does stress affect my blood sugar levels?",
+    "I have a lot of anxiety about my diagnosis, what can I do?",
+    "Does mental health matter for managing diabetes?",
+    "How many hours of sleep should I get?",
+    "I wake up tired even after a full night of rest",
+    "Can poor sleep make my diabetes worse?",
+    "When should I take my metformin medication?",
+    "What happens if I miss a dose of my medicine?",
+    "How do I store insulin when travelling?",
+    "Can I drink alcohol with diabetes?",
+    "What are the early symptoms of diabetes?",
+    "Is diabetes hereditary?",
+    "How do I lower my A1C?",
+    "What is prediabetes and can it be reversed?",
+    "Why do my feet tingle at night?",
+    "Is it normal to feel thirsty all the time?",
+    "How do I talk to my family about my condition?",
+    "What questions should I ask my doctor at my next appointment?",
+    "I'm interested in joining a support group, where do I start?",
+    "Are artificial sweeteners okay?",
+    "Hello",
+    "Thanks for the great advice!",
+    "What is the best snack before bed to keep my levels steady overnight?",
+    "Can I still enjoy a slice of birthday cake occasionally without a big spike?",
+    "My doctor wants me to lose weight but I have trouble staying motivated, any ideas?",
+    "How should I adjust my routine around Ramadan fasting with diabetes?",
+)
+
+
+def synthetic_rules(count, seed):
+    """Extra single-group intents with random keywords that real questions rarely contain"""
+    rng = random.Random(seed)
+    return tuple(
+        (f'synthetic_{i}', (tuple(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9)))
+                                  for _ in range(3)),))
+        for i in range(count)
+    )
+
+
+def time_matcher(match, questions, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for question in questions:
+            match(question)
+    return (time.perf_counter() - started) / (repeat * len(questions))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000, help='Passes over the question corpus')
+    parser.add_argument('--extra-intents', type=int, nargs='+', default=[0, 50, 200])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, BASE_DIR)
+    from health_assistant import INTENT_RULES, IntentMatcher, match_intent_reference
+
+    chars = sum(len(question) for question in QUESTIONS) / len(QUESTIONS)
+    print(f"{len(QUESTIONS)} questions, {chars:.0f} characters on average, {args.repeat} passes")
+    print(f"{'intents':>8} {'keywords':>9} {'substring us':>13} {'compiled us':>12} {'speedup':>8}")
+
+    mismatches = 0
+    for extra in args.extra_intents:
+        rules = INTENT_RULES + synthetic_rules(extra, args.seed)
+        match = IntentMatcher(rules).match
+
+        def reference(question):
+            return match_intent_reference(question, rules)
+
+        mismatches += sum(match(question) != reference(question) for question in QUESTIONS)
+        substring_seconds = time_matcher(reference, QUESTIONS, args.repeat)
+        compiled_seconds = time_matcher(match, QUESTIONS, args.repeat)
+        keywords = len({keyword for _, groups in rules for group in groups for keyword in group})
+        print(f"{len(rules):>8} {keywords:>9} {substring_seconds * 1e6:>13.2f} {compiled_seconds * 1e6:>12.2f} "
+              f"{substring_seconds / compiled_seconds:>7.1f}x")
+
+    if mismatches:
+        print(f"{mismatches} questions matched a different intent than the substring scan")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
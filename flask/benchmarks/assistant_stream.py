@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""
+Latency of the blocking, streamed and background health assistant endpoints
+
+Starts a fake OpenAI-compatible server on localhost. It produces a canned
+answer one token every --token-ms, either as a single JSON body or as a
+chat.completion.chunk event stream. It then drives the app through
+Flask's test client against a throwaway SQLite database and reports:
+- /health-assistant: time until the full answer
+- /health-assistant/stream: time to the first token and to the final event
+- /health-assistant/jobs: time until the 202, and until a poll sees the answer
+All three final answers must parse to the same {'answer', 'tips'}.
+
+Usage (from the flask/ directory):
+    python benchmarks/assistant_stream.py --token-ms 20 --runs 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ANSWER = (
+    "Managing diabetes through diet is about consistency and balance. Build meals around "
+    "vegetables, lean protein and whole grains, and keep portions steady from day to day.\n"
+    "Tips:\n"
+    "1. Fill half your plate with non-starchy vegetables\n"
+    "2. Choose whole grains over refined carbohydrates\n"
+    "3. Pair carbohydrates with protein or healthy fat\n"
+    "4. Drink water instead of sugary drinks\n"
+    "5. Check with your doctor before major diet changes"
+)
+
+
+def tokenize(text):
+    """Split text into word-sized pieces that join back to text exactly"""
+    pieces, current = [], ''
+    for char in text:
+        current += char
+        if char in ' \n':
+            pieces.append(current)
+            current = ''
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, token_delay):
+        super().__init__(('127.0.0.1', 0), FakeLLMHandler)
+        self.token_delay = token_delay
+        self.tokens = tokenize(ANSWER)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        if request.get('stream'):
+            self.stream_completion()
+        else:
+            self.full_completion()
+
+    def full_completion(self):
+        time.sleep(self.server.token_delay * len(self.server.tokens))
+        body = json.dumps({
+            'id': 'chatcmpl-fake', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+            'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': ANSWER}}],
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_completion(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for token in self.server.tokens:
+            time.sleep(self.server.token_delay)
+            self.send_chunk({'content': token}, None)
+        self.send_chunk({}, 'stop')
+        self.write_chunk(b'data: [DONE]\n\n')
+        self.write_chunk(b'')
+
+    def send_chunk(self, delta, finish_reason):
+        chunk = {
+            'id': 'chatcmpl-fake', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'gpt-4o-mini',
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+        }
+        self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_events(chunks, started):
+    """Yield (seconds since started, event, data) from an iterable of SSE byte chunks"""
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk.decode() if isinstance(chunk, bytes) else chunk
+        while '\n\n' in buffer:
+            block, buffer = buffer.split('\n\n', 1)
+            fields = dict(line.split(': ', 1) for line in block.splitlines())
+            yield time.perf_counter() - started, fields['event'], json.loads(fields['data'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--token-ms', type=float, default=20.0, help='Delay before each generated token')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    server = FakeLLMServer(args.token_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    workdir = tempfile.mkdtemp(prefix='assistant-stream-')
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'assistant.db')}",
+        'OPENAI_API_KEY': 'sk-fake',
+        'OPENAI_BASE_URL': server.base_url,
+        'ASSISTANT_CACHE_SIZE': '0',
+    })
+    sys.path.insert(0, BASE_DIR)
+    import app as app_module
+    from models import db, User
+
+    with app_module.app.app_context():
+        app_module.bootstrap()
+        user = User(username='bench', email='bench@example.com')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+
+    question = {'question': 'What should I eat to manage my diabetes?'}
+    timings = {name: [] for name in ('blocking', 'stream_first_token', 'stream_done', 'job_accepted', 'job_done')}
+    answers = set()
+    print(f"fake LLM: {len(server.tokens)} tokens, {args.token_ms:.0f} ms apart; {args.runs} runs each")
+
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        response = client.post('/health-assistant', json=question)
+        timings['blocking'].append(time.perf_counter() - started)
+        answers.add(json.dumps(response.get_json(), sort_keys=True))
+
+        # The test client runs the view up to its first chunk inside post()
+        started = time.perf_counter()
+        response = client.post('/health-assistant/stream', json=question, buffered=False)
+        first_token = None
+        for elapsed, event, data in parse_events(response.response, started):
+            if event == 'token' and first_token is None:
+                first_token = elapsed
+            elif event == 'done':
+                timings['stream_done'].append(elapsed)
+                answers.add(json.dumps(data, sort_keys=True))
+        timings['stream_first_token'].append(first_token)
+        response.close()
+
+        started = time.perf_counter()
+        response = client.post('/health-assistant/jobs', json=question)
+        timings['job_accepted'].append(time.perf_counter() - started)
+        status_url = response.get_json()['status_url']
+        while True:
+            job = client.get(status_url).get_json()
+            if job['status'] != 'pending':
+                break
+            time.sleep(0.005)
+        timings['job_done'].append(time.perf_counter() - started)
+        answers.add(json.dumps({'answer': job.get('answer'), 'tips': job.get('tips')}, sort_keys=True))
+
+    print(f"{'measurement':40} {'median ms':>10} {'max ms':>10}")
+    labels = {
+        'blocking': '/health-assistant full answer',
+        'stream_first_token': '/stream first token',
+        'stream_done': '/stream final event',
+        'job_accepted': '/jobs 202 response',
+        'job_done': '/jobs answer visible to poll',
+    }
+    for name, label in labels.items():
+        values = timings[name]
+        print(f"{label:40} {statistics.median(values) * 1000:>10.1f} {max(values) * 1000:>10.1f}")
+
+    server.shutdown()
+    if len(answers) != 1:
+        print("Endpoints returned different answers:")
+        for answer in answers:
+            print(f"  {answer}")
+        sys.exit(1)
+    print("all endpoints returned the same parsed answer")
+
+
+if __name__ == '__main__':
+    main()
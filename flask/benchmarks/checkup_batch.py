@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Throughput of the batch checkup rules against the scalar plan generator
+
+Generates a random cohort, times evaluate_checkup_rules over all of it and
+generate_health_checkup_plan over a sample, and checks a sample of
+expanded plans against the scalar output.
+
+Usage (from the flask/ directory):
+    python benchmarks/checkup_batch.py --patients 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def random_cohort(n, seed):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return (
+        rng.integers(18, 90, n).astype(np.float64),  # age
+        rng.uniform(15, 50, n).round(1),             # bmi
+        rng.uniform(60, 250, n).round(0),            # glucose
+        rng.integers(90, 180, n).astype(np.float64), # bp_systolic
+        rng.integers(55, 110, n).astype(np.float64), # bp_diastolic
+        rng.integers(0, 2, n),                       # has_diabetes
+        rng.integers(0, 2, n).astype(bool),          # family_history
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patients', type=int, default=1_000_000)
+    parser.add_argument('--scalar-sample', type=int, default=20_000, help='Patients timed through the scalar function')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, BASE_DIR)
+    from checkup_batch import evaluate_checkup_rules, expand_checkup_plan
+    from health_checkup import generate_health_checkup_plan
+
+    cohort = random_cohort(args.patients, args.seed)
+    started = time.perf_counter()
+    rules = evaluate_checkup_rules(*cohort)
+    batch_seconds = time.perf_counter() - started
+
+    sample = min(args.scalar_sample, args.patients)
+    rows = [[column[i].item() for column in cohort] for i in range(sample)]
+    started = time.perf_counter()
+    plans = [generate_health_checkup_plan(*row) for row in rows]
+    scalar_seconds = (time.perf_counter() - started) * args.patients / sample
+
+    mismatches = sum(
+        expand_checkup_plan(rules.tests[i], rules.lifestyle[i], rules.frequency[i], rules.bp_category[i],
+                            row[3], row[4], row[6]) != plan
+        for i, (row, plan) in enumerate(zip(rows, plans))
+    )
+
+    print(f"batch rules:   {args.patients:,} patients in {batch_seconds:.3f} s")
+    print(f"scalar plans:  {scalar_seconds:.2f} s estimated from {sample:,} patients")
+    print(f"speedup:       {scalar_seconds / batch_seconds:.0f}x")
+    print(f"mismatches:    {mismatches} of {sample:,} expanded plans")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Cold-start import profile for the web app
+
+Imports app.py in a fresh interpreter under `python -X importtime`,
+against a throwaway SQLite database, and reports the wall-clock time of
+the import, the slowest modules (cumulative and self time) and which
+heavy optional libraries got loaded. Runs the default and SLIM_STARTUP
+modes side by side unless told otherwise.
+
+Usage (from the flask/ directory):
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --mode slim --budget 1.0 --output imports.json
+
+Exits non-zero when a slim import exceeds the budget or loads a module
+the serving path should not need.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only needed by training, exports, the AI assistant or the CLI
+HEAVY_MODULES = ('pandas', 'sklearn', 'scipy', 'pyarrow', 'reportlab', 'openai', 'flask_migrate', 'alembic')
+
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'modules': len(sys.modules),
+                  'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Return [(name, depth, self_us, cumulative_us)] from -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((stripped, depth, int(fields[0]), int(fields[1])))
+    return entries
+
+
+def profile(module, slim, workdir):
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, f'import-{int(slim)}.db')}"
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    env.pop('SLIM_STARTUP', None)
+    if slim:
+        env['SLIM_STARTUP'] = '1'
+
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result['imports'] = parse_importtime(proc.stderr)
+    return result
+
+
+def summarize(result, top):
+    imports = result['imports']
+    direct = [entry for entry in imports if entry[1] == 1]
+    return {
+        'seconds': round(result['seconds'], 4),
+        'modules': result['modules'],
+        'import_seconds': round(sum(entry[2] for entry in imports) / 1e6, 4),
+        'heavy_modules': result['heavy'],
+        'top_direct_imports': [
+            {'module': name, 'cumulative_ms': round(cumulative / 1000, 2)}
+            for name, _, _, cumulative in sorted(direct, key=lambda e: e[3], reverse=True)[:top]
+        ],
+        'top_self': [
+            {'module': name, 'self_ms': round(self_us / 1000, 2)}
+            for name, _, self_us, _ in sorted(imports, key=lambda e: e[2], reverse=True)[:top]
+        ],
+    }
+
+
+def print_summary(mode, summary, budget):
+    status = 'ok' if summary['seconds'] <= budget else 'OVER BUDGET'
+    print(f"== {mode}: {summary['seconds'] * 1000:.0f} ms to import "
+          f"({summary['import_seconds'] * 1000:.0f} ms in module imports, {summary['modules']} modules) [{status}]")
+    print(f"   heavy modules loaded: {', '.join(summary['heavy_modules']) or 'none'}")
+    print(f"   {'slowest direct imports':40} {'cumulative ms':>14}")
+    for entry in summary['top_direct_imports']:
+        print(f"   {entry['module']:40} {entry['cumulative_ms']:>14.1f}")
+    print(f"   {'slowest modules (self)':40} {'self ms':>14}")
+    for entry in summary['top_self']:
+        print(f"   {entry['module']:40} {entry['self_ms']:>14.1f}")
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='app', help='Module to import')
+    parser.add_argument('--mode', choices=['both', 'default', 'slim'], default='both')
+    parser.add_argument('--top', type=int, default=10, help='Rows per table')
+    parser.add_argument('--budget', type=float, default=1.0, help='Target seconds for a slim import')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    args = parser.parse_args(argv)
+
+    modes = ['default', 'slim'] if args.mode == 'both' else [args.mode]
+    workdir = tempfile.mkdtemp(prefix='import-profile-')
+    results = {}
+    for mode in modes:
+        results[mode] = summarize(profile(args.module, mode == 'slim', workdir), args.top)
+        print_summary(mode, results[mode], args.budget)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+    slim = results.get('slim')
+    if slim and (slim['seconds'] > args.budget or slim['heavy_modules']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
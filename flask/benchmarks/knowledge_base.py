@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Retrieval quality and latency of the local knowledge base
+
+Builds the seeded KnowledgeBase, then runs a set of typical assistant
+questions through it. For each it prints the best document and score and
+whether the answer would be served locally (a rule-answer document at
+--confident-score, so no LLM call) or only as the offline fallback (at the
+minimum score). It then
+reports the share of questions whose best document is the expected one,
+and the search latency next to the keyword rule matcher's.
+
+Usage (from the flask/ directory):
+    python benchmarks/knowledge_base.py --repeat 2000 --confident-score 0.5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (question, word expected in the best document's title)
+QUESTIONS = (
+    ("What should I eat to manage my diabetes?", "diabetes"),
+    ("How often should I check my blood sugar?", "monitor"),
+    ("Is it ok to drink soda?", "high sugar"),
+    ("How can I sleep better?", "sleep"),
+    ("What is HbA1c?", "HbA1c"),
+    ("What is a normal HbA1c?", "HbA1c"),
+    ("Should I get my eyes checked?", "Eye"),
+    ("How do I deal with stress and anxiety?", "stress"),
+    ("Good breakfast for diabetics", "breakfast"),
+    ("How many carbs should I eat?", "carb"),
+    ("Can I skip my insulin dose?", "medication"),
+    ("What snacks are healthy?", "snacks"),
+    ("Which fruits can I eat?", "fruits"),
+    ("How much water should I drink?", "hydration"),
+    ("Should I stop smoking?", "habits"),
+    ("What vegetables are good for diabetes?", "vegetables"),
+    ("How often should I see my doctor?", "doctor"),
+    ("Do I need a kidney test?", "Kidney"),
+    ("What workout should I do?", "exercise"),
+)
+
+
+def time_per_call(function, question, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(question)
+    return (time.perf_counter() - started) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000, help='Searches per question when timing')
+    parser.add_argument('--confident-score', type=float, default=None,
+                        help='Threshold for answering without the LLM (default: disabled, as in the app)')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, BASE_DIR)
+    from health_assistant import match_intent
+    from knowledge_base import CONFIDENT_SOURCES, KnowledgeBase
+
+    started = time.perf_counter()
+    kb = KnowledgeBase(confident_score=args.confident_score)
+    build = time.perf_counter() - started
+    stats = kb.stats()
+    print(f"{stats['documents']} documents, {stats['vocabulary']} terms, {stats['matrix_bytes'] / 1024:.0f} KiB matrix, "
+          f"built in {build * 1000:.1f} ms")
+
+    correct = local = offline = 0
+    print(f"{'question':42} {'score':>5}  {'served':8} best document")
+    for question, expected in QUESTIONS:
+        score, document = kb.search(question, k=1)[0]
+        correct += expected.lower() in document.title.lower()
+        confident = (kb.confident_score is not None and score >= kb.confident_score
+                     and document.source in CONFIDENT_SOURCES)
+        served = 'local' if confident else 'offline' if score >= kb.min_score else 'rules'
+        local += served == 'local'
+        offline += served != 'rules'
+        print(f"{question:42} {score:5.2f}  {served:8} {document.title}")
+
+    print(f"best document as expected for {correct}/{len(QUESTIONS)} questions; "
+          f"{local} answered without the LLM, {offline} answerable offline")
+    kb_times = [time_per_call(kb.search, question, args.repeat) for question, _ in QUESTIONS]
+    rule_times = [time_per_call(match_intent, question, args.repeat) for question, _ in QUESTIONS]
+    print(f"search p50 {statistics.median(kb_times) * 1e6:.1f} us, max {max(kb_times) * 1e6:.1f} us "
+          f"(keyword rules p50 {statistics.median(rule_times) * 1e6:.1f} us)")
+
+
+if __name__ == '__main__':
+    main()
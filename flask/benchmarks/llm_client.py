@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+Per-request overhead of the health assistant's OpenAI client
+
+Starts a local stand-in for the chat completions API and sends the same
+request through the OpenAI SDK two ways. The first builds a new client
+for every request, as get_health_advice_ai used to. The second reuses
+one LLMClient connection pool, from one thread or several. Reports
+latency percentiles and how many TCP connections the server accepted.
+Finishes by checking that a server slower than the read timeout fails
+within the timeout and retry budget instead of hanging.
+
+No OpenAI key or network access is needed; --latency-ms adds simulated
+server time to each response.
+
+Usage (from the flask/ directory):
+    python benchmarks/llm_client.py --requests 300 --threads 8
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMPLETION = {
+    'id': 'chatcmpl-standin',
+    'object': 'chat.completion',
+    'created': 0,
+    'model': 'gpt-4o-mini',
+    'choices': [{
+        'index': 0,
+        'finish_reason': 'stop',
+        'message': {
+            'role': 'assistant',
+            'content': "Focus on whole foods and regular meals.\nTips:\n1. Choose whole grains\n2. Walk after meals\n3. Stay hydrated",
+        },
+    }],
+    'usage': {'prompt_tokens': 60, 'completion_tokens': 30, 'total_tokens': 90},
+}
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.latency = latency
+        self.connections = 0
+        self._count_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._count_lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this Nagle adds ~40 ms per response
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        # Requests under /slow/ stall for longer than any read timeout used here
+        time.sleep(5.0 if self.path.startswith('/slow/') else self.server.latency)
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def ask(client):
+    response = client.chat.completions.create(
+        model='gpt-4o-mini',
+        messages=[{'role': 'user', 'content': 'What should I eat for breakfast?'}],
+        max_tokens=500
+    )
+    return response.choices[0].message.content
+
+
+def timed(call):
+    started = time.perf_counter()
+    call()
+    return time.perf_counter() - started
+
+
+def summarize(name, latencies, wall, connections):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{name:22} {statistics.mean(latencies) * 1000:>9.2f} {statistics.median(latencies) * 1000:>9.2f} "
+          f"{p95 * 1000:>9.2f} {len(latencies) / wall:>9.0f} {connections:>12}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=8, help='Threads sharing one client in the concurrent run')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated server time per response')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, BASE_DIR)
+    from openai import OpenAI
+    from llm_client import LLMClient
+
+    server = StandInServer(args.latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"{server.base_url}/v1"
+    api_key = 'sk-standin'
+
+    print(f"{'mode':22} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>9} {'connections':>12}")
+
+    def fresh_client_request():
+        client = OpenAI(api_key=api_key, base_url=base_url)
+        ask(client)
+        client.close()
+
+    start_connections = server.connections
+    started = time.perf_counter()
+    latencies = [timed(fresh_client_request) for _ in range(args.requests)]
+    summarize('new client per request', latencies, time.perf_counter() - started,
+              server.connections - start_connections)
+
+    shared = LLMClient(base_url=base_url)
+    start_connections = server.connections
+    started = time.perf_counter()
+    latencies = [timed(lambda: ask(shared.get(api_key))) for _ in range(args.requests)]
+    summarize('shared, 1 thread', latencies, time.perf_counter() - started,
+              server.connections - start_connections)
+
+    start_connections = server.connections
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        latencies = list(pool.map(lambda _: timed(lambda: ask(shared.get(api_key))), range(args.requests)))
+    summarize(f'shared, {args.threads} threads', latencies, time.perf_counter() - started,
+              server.connections - start_connections)
+    print(f"clients built by the shared LLMClient: {shared.clients_created}")
+    shared.close()
+
+    bounded = LLMClient(read_timeout=0.2, max_retries=1, base_url=f"{server.base_url}/slow/v1")
+    started = time.perf_counter()
+    try:
+        ask(bounded.get(api_key))
+        outcome = 'unexpectedly succeeded'
+    except Exception as e:
+        outcome = type(e).__name__
+    elapsed = time.perf_counter() - started
+    print(f"stalled server, 0.2 s read timeout and 1 retry: {outcome} after {elapsed:.2f} s")
+    bounded.close()
+    server.shutdown()
+
+    if elapsed > 4.0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
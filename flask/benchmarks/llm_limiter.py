@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Concurrency cap, rate limit and load shedding of the LLM limiter
+
+Fires bursts of simulated LLM calls at LLMLimiter and reports how many
+ran at once, the achieved call rate, how many callers were shed and how
+long admitted callers waited:
+- threads: one process, --callers threads at once
+- rate: one thread calling as fast as the token bucket allows
+- processes: --processes forked workers sharing one limiter directory
+Exits non-zero if the concurrency cap or the rate limit is exceeded.
+
+Usage (from the flask/ directory):
+    python benchmarks/llm_limiter.py --max-concurrent 4 --call-ms 50
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_overlap(intervals):
+    """Largest number of (start, end) intervals open at the same moment"""
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    current = peak = 0
+    for _, change in events:
+        current += change
+        peak = max(peak, current)
+    return peak
+
+
+def burst(limiter, callers, call_seconds):
+    """Run `callers` threads through the limiter at once; returns (call intervals, shed count)"""
+    from llm_limiter import LoadShed
+
+    intervals, shed = [], []
+    lock = threading.Lock()
+    start_gate = threading.Event()
+
+    def caller():
+        start_gate.wait()
+        try:
+            with limiter.slot():
+                started = time.time()
+                time.sleep(call_seconds)
+                with lock:
+                    intervals.append((started, time.time()))
+        except LoadShed:
+            with lock:
+                shed.append(1)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    start_gate.set()
+    for thread in threads:
+        thread.join()
+    return intervals, len(shed)
+
+
+def report(name, intervals, shed, stats):
+    wait = stats['wait_ms']
+    print(f"{name:10} admitted {len(intervals):4}  shed {shed:4} (queue full {stats['shed_queue_full']}, "
+          f"timeout {stats['shed_timeout']})  peak concurrency {peak_overlap(intervals):3}  "
+          f"max queue {stats['max_queue_depth']:3}  wait p50 {wait['p50']} ms p95 {wait['p95']} ms")
+
+
+def process_worker(shared_dir, args, results):
+    from llm_limiter import LLMLimiter
+
+    limiter = LLMLimiter(max_concurrent=args.max_concurrent, max_queue=args.max_queue,
+                         max_wait=args.max_wait, shared_dir=shared_dir)
+    intervals, shed = burst(limiter, args.callers // args.processes, args.call_ms / 1000)
+    results.put((intervals, shed, limiter.stats()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-concurrent', type=int, default=4)
+    parser.add_argument('--max-queue', type=int, default=12)
+    parser.add_argument('--max-wait', type=float, default=0.3)
+    parser.add_argument('--call-ms', type=float, default=50.0)
+    parser.add_argument('--callers', type=int, default=40)
+    parser.add_argument('--rate', type=float, default=20.0, help='Calls per second for the rate phase')
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, BASE_DIR)
+    from llm_limiter import LLMLimiter, LoadShed
+
+    call_seconds = args.call_ms / 1000
+    failed = False
+    print(f"cap {args.max_concurrent}, queue {args.max_queue}, wait {args.max_wait * 1000:.0f} ms, "
+          f"call {args.call_ms:.0f} ms, {args.callers} callers")
+
+    limiter = LLMLimiter(max_concurrent=args.max_concurrent, max_queue=args.max_queue, max_wait=args.max_wait)
+    intervals, shed = burst(limiter, args.callers, call_seconds)
+    report('threads', intervals, shed, limiter.stats())
+    failed |= peak_overlap(intervals) > args.max_concurrent
+
+    limiter = LLMLimiter(max_concurrent=args.max_concurrent, rate=args.rate, burst=1, max_wait=1.0)
+    calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < 1.0:
+        try:
+            with limiter.slot():
+                calls += 1
+        except LoadShed:
+            break
+    elapsed = time.perf_counter() - started
+    print(f"{'rate':10} {calls} calls in {elapsed:.2f} s = {calls / elapsed:.1f}/s (limit {args.rate:.0f}/s)")
+    failed |= calls / elapsed > args.rate * 1.1
+
+    shared_dir = tempfile.mkdtemp(prefix='llm-limiter-')
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    workers = [context.Process(target=process_worker, args=(shared_dir, args, results))
+               for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    intervals = [interval for outcome in outcomes for interval in outcome[0]]
+    shed = sum(outcome[1] for outcome in outcomes)
+    peak = peak_overlap(intervals)
+    print(f"{'processes':10} admitted {len(intervals):4}  shed {shed:4}  peak concurrency {peak:3} "
+          f"across {args.processes} processes")
+    failed |= peak > args.max_concurrent
+
+    if failed:
+        print("limit exceeded")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
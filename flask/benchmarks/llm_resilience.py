@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Latency budget and circuit breaker behaviour of the health assistant
+
+Drives LLMGuard with a simulated LLM call through four phases: healthy,
+slow (over the latency budget), recovered after the breaker cooldown, and
+failing. For each phase it reports the latency the user saw, how requests
+were answered and the breaker state at the end.
+
+Usage (from the flask/ directory):
+    python benchmarks/llm_resilience.py --budget-ms 50 --requests 40
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OUTCOMES = ('llm_successes', 'over_budget', 'errors', 'short_circuited', 'saturated')
+
+
+def simulated_llm(latency, fail):
+    def call(timer):
+        with timer():
+            time.sleep(latency)
+            if fail:
+                raise ConnectionError("simulated upstream failure")
+        return {'answer': 'llm', 'tips': []}
+    return call
+
+
+def fallback():
+    return {'answer': 'rules', 'tips': []}
+
+
+def run_phase(guard, name, requests, latency, fail):
+    before = guard.stats()
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        guard.call(simulated_llm(latency, fail), fallback)
+        latencies.append(time.perf_counter() - started)
+    # Let calls that overran the budget finish so their outcomes are counted
+    time.sleep(latency + 0.05)
+    after = guard.stats()
+
+    counts = ', '.join(f"{key}={after[key] - before[key]}" for key in OUTCOMES if after[key] != before[key])
+    print(f"{name:10} p50 {statistics.median(latencies) * 1000:7.1f} ms  max {max(latencies) * 1000:7.1f} ms  "
+          f"breaker {after['breaker']['state']:9}  {counts}")
+    return max(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    parser.add_argument('--requests', type=int, default=40, help='Requests per phase')
+    parser.add_argument('--cooldown', type=float, default=0.5, help='Breaker cooldown in seconds')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, BASE_DIR)
+    from llm_resilience import CircuitBreaker, LLMGuard
+
+    # One warning per failed call in the failing phase is just noise here
+    logging.getLogger('llm_resilience').setLevel(logging.ERROR)
+
+    budget = args.budget_ms / 1000
+    guard = LLMGuard(
+        budget=budget,
+        breaker=CircuitBreaker(error_rate=0.5, p95_latency=budget * 2, min_calls=5, window=5.0,
+                               cooldown=args.cooldown, max_samples=20)
+    )
+
+    print(f"budget {args.budget_ms:.0f} ms, breaker trips at 50% errors or p95 over {args.budget_ms * 2:.0f} ms")
+    worst = run_phase(guard, 'healthy', args.requests, budget / 5, False)
+    worst = max(worst, run_phase(guard, 'slow', args.requests, budget * 4, False))
+    time.sleep(args.cooldown)
+    worst = max(worst, run_phase(guard, 'recovered', args.requests, budget / 5, False))
+    worst = max(worst, run_phase(guard, 'failing', args.requests, budget / 10, True))
+    print(f"breaker trips: {guard.breaker.trips}; worst user-visible latency {worst * 1000:.1f} ms")
+
+    if worst > budget + 0.05:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+"""
+Per-stage latency benchmark for /predict
+
+Times each stage of the request separately and the whole request end to
+end, against a throwaway SQLite database, and reports p50/p95/p99 plus
+per-call allocations (tracemalloc). Results can be saved as JSON and
+compared against an earlier run to spot regressions.
+
+Usage (from the flask/ directory):
+    python benchmarks/predict_pipeline.py --iterations 500 --output bench.json
+    python benchmarks/predict_pipeline.py --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_INPUTS = [
+    # glucose, insulin, bmi, age, bp_systolic, bp_diastolic, family_history
+    (148, 0, 33.6, 50, 120, 80, False),
+    (85, 0, 26.6, 31, 118, 76, True),
+    (183, 200, 23.3, 32, 145, 95, False),
+    (89, 94, 28.1, 21, 110, 70, False),
+    (137, 168, 43.1, 33, 135, 85, True),
+    (116, 0, 25.6, 30, 128, 82, False),
+    (197, 543, 30.5, 53, 150, 92, True),
+    (110, 0, 37.6, 62, 132, 88, False),
+]
+
+
+def make_form(inputs):
+    glucose, insulin, bmi, age, bp_systolic, bp_diastolic, family_history = inputs
+    form = {
+        'Glucose Level': str(glucose),
+        'Insulin': str(insulin),
+        'BMI': str(bmi),
+        'Age': str(age),
+        'Blood Pressure Systolic': str(bp_systolic),
+        'Blood Pressure Diastolic': str(bp_diastolic),
+    }
+    if family_history:
+        form['Family History'] = 'yes'
+    return form
+
+
+def percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def measure(fn, iterations, warmup, alloc_iterations):
+    """Run fn(i) repeatedly; return latency percentiles in microseconds and allocation sizes"""
+    for i in range(warmup):
+        fn(i)
+
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter_ns()
+        fn(i)
+        samples.append((time.perf_counter_ns() - started) / 1000)
+    samples.sort()
+
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for i in range(alloc_iterations):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            fn(i)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+            retained.append(current - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'mean_us': round(sum(samples) / len(samples), 2),
+        'p50_us': round(percentile(samples, 0.50), 2),
+        'p95_us': round(percentile(samples, 0.95), 2),
+        'p99_us': round(percentile(samples, 0.99), 2),
+        'max_us': round(samples[-1], 2),
+        'alloc_peak_kb': round(sum(peaks) / len(peaks) / 1024, 2) if peaks else None,
+        'alloc_retained_kb': round(sum(retained) / len(retained) / 1024, 2) if retained else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_stages(app_module):
+    """Return an ordered dict of stage name -> callable(i)"""
+    from werkzeug.datastructures import MultiDict
+    from flask import render_template
+
+    app = app_module.app
+    db = app_module.db
+    loaded_model = app_module.live_model.current
+
+    forms = [MultiDict(make_form(inputs)) for inputs in SAMPLE_INPUTS]
+    parsed = [app_module.parse_prediction_form(form) for form in forms]
+
+    def pick(i):
+        return parsed[i % len(parsed)]
+
+    with app.app_context():
+        app_module.bootstrap()
+        user = app_module.User(username='bench-user', email='bench@example.com')
+        user.set_password('benchmark')
+        db.session.add(user)
+        db.session.add(app_module.UserGamification(user=user))
+        db.session.commit()
+        user_id = user.id
+
+    stages = {}
+    stages['parse_form'] = lambda i: app_module.parse_prediction_form(forms[i % len(forms)])
+
+    # Legacy path: sklearn transform then predict, when the pickled pipeline is importable
+    try:
+        pipeline = app_module.live_model.registry.load(loaded_model.version)['pipeline']
+        scaler, estimator = pipeline.steps[0][1], pipeline.steps[-1][1]
+        import numpy as np
+
+        rows = [np.array([p[:4]]) for p in parsed]
+        scaled = [scaler.transform(r) for r in rows]
+        stages['sklearn_transform'] = lambda i: scaler.transform(rows[i % len(rows)])
+        stages['sklearn_predict'] = lambda i: estimator.predict(scaled[i % len(scaled)])
+    except Exception as e:
+        print(f"Skipping sklearn stages: {e}", file=sys.stderr)
+
+    stages['scorer_predict'] = lambda i: loaded_model.scorer.predict_one(pick(i)[:4])
+
+    def db_writes(i):
+        glucose, insulin, bmi, age, bp_systolic, bp_diastolic, family_history = pick(i)
+        with app.test_request_context('/predict', method='POST'):
+            bench_user = db.session.get(app_module.User, user_id)
+            app_module.record_health_check(
+                bench_user, glucose, insulin, bmi, age, bp_systolic, bp_diastolic,
+                family_history, 0, loaded_model.version
+            )
+    stages['db_writes_and_missions'] = db_writes
+
+    def diet_plan(i):
+        glucose, insulin, bmi, age, _, _, _ = pick(i)
+        return app_module.generate_diet_plan(glucose, insulin, bmi, age, i % 2)
+    stages['generate_diet_plan'] = diet_plan
+
+    def checkup_plan(i):
+        glucose, insulin, bmi, age, bp_systolic, bp_diastolic, family_history = pick(i)
+        return app_module.generate_health_checkup_plan(
+            age, bmi, glucose, bp_systolic, bp_diastolic, i % 2, family_history
+        )
+    stages['generate_health_checkup_plan'] = checkup_plan
+
+    contexts = []
+    for i in range(len(parsed)):
+        glucose, insulin, bmi, age, _, _, _ = parsed[i]
+        contexts.append({
+            'prediction_text': "You don't have Diabetes.",
+            'diet_plan': diet_plan(i),
+            'checkup_plan': checkup_plan(i),
+            'chart_data': {'bmi': bmi, 'glucose': glucose, 'risk': i % 2,
+                           'nutrition': {'carbs': 45, 'protein': 30, 'fats': 25}},
+        })
+
+    def render(i):
+        with app.test_request_context('/predict', method='POST'):
+            return render_template('index.html', **contexts[i % len(contexts)])
+    stages['render_index_html'] = render
+
+    anonymous = app.test_client()
+    stages['end_to_end_anonymous'] = lambda i: anonymous.post('/predict', data=forms[i % len(forms)])
+
+    logged_in = app.test_client()
+    with logged_in.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    stages['end_to_end_logged_in'] = lambda i: logged_in.post('/predict', data=forms[i % len(forms)])
+
+    return stages
+
+
+def print_table(results, baseline=None):
+    header = f"{'stage':32} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} {'peak KB':>9}"
+    if baseline:
+        header += f" {'p50 vs base':>12}"
+    print(header)
+    print('-' * len(header))
+    for name, stats in results['stages'].items():
+        line = (f"{name:32} {stats['p50_us']:>10.1f} {stats['p95_us']:>10.1f} {stats['p99_us']:>10.1f} "
+                f"{stats['alloc_peak_kb'] if stats['alloc_peak_kb'] is not None else '-':>9}")
+        base = (baseline or {}).get('stages', {}).get(name)
+        if base:
+            change = (stats['p50_us'] - base['p50_us']) / base['p50_us'] * 100 if base['p50_us'] else 0.0
+            line += f" {change:>+11.1f}%"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--alloc-iterations', type=int, default=30,
+                        help='Calls per stage run under tracemalloc (slower, measured separately)')
+    parser.add_argument('--stage', action='append', help='Only run the named stage(s)')
+    parser.add_argument('--with-cache', action='store_true',
+                        help='Keep the prediction cache enabled for the end-to-end stages')
+    parser.add_argument('--output', help='Write results as JSON to this path')
+    parser.add_argument('--compare', help='Earlier JSON results to compare p50 against')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    workdir = tempfile.mkdtemp(prefix='predict-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['MODEL_RELOAD_INTERVAL'] = '0'
+    if not args.with_cache:
+        os.environ['PREDICTION_CACHE_SIZE'] = '0'
+    sys.path.insert(0, BASE_DIR)
+    os.chdir(BASE_DIR)
+
+    import app as app_module
+
+    stages = build_stages(app_module)
+    selected = args.stage or list(stages)
+    unknown = [name for name in selected if name not in stages]
+    if unknown:
+        parser.error(f"Unknown stage(s) {', '.join(unknown)}; choose from {', '.join(stages)}")
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'model_version': app_module.live_model.current.version,
+            'scorer': app_module.live_model.current.scorer.kind,
+            'prediction_cache': bool(args.with_cache),
+            'iterations': args.iterations,
+        },
+        'stages': {},
+    }
+    for name in selected:
+        results['stages'][name] = measure(stages[name], args.iterations, args.warmup, args.alloc_iterations)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Set-based versus per-row mission and challenge progress updates
+
+Bootstraps a throwaway SQLite database with this week's missions and this
+season's challenges, then records the same sequence of events (health
+checks, streak days, assistant questions) for two users: one through the
+ON CONFLICT upsert, one through the per-row fallback. Both users must end
+with identical progress rows and the same missions and challenges
+reported as completed at the same step. Reports SQL statements and time
+per update_*_progress call for each path.
+
+Usage (from the flask/ directory):
+    python benchmarks/progress_upsert.py --events 40
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EVENT_TYPES = ('health_checks', 'streak', 'assistant_queries')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=40, help='Events recorded per user')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='progress-upsert-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'progress.db')}"
+    sys.path.insert(0, BASE_DIR)
+    from sqlalchemy import event
+
+    import app as app_module
+    import progress_upsert
+    from challenges_manager import get_user_challenge_progress, update_challenge_progress
+    from missions_manager import get_user_mission_progress, update_mission_progress
+    from models import db, User
+
+    statements = []
+
+    with app_module.app.app_context():
+        app_module.bootstrap()
+        user_ids = []
+        for name in ('upsert', 'rowwise'):
+            user = User(username=name, email=f"{name}@example.com")
+            user.set_password(name)
+            db.session.add(user)
+            db.session.commit()
+            user_ids.append(user.id)
+
+        event.listen(db.engine, 'before_cursor_execute', lambda *_: statements.append(1))
+        upsert_inserts = progress_upsert.UPSERT_INSERTS
+        results = {}
+        for name, user_id in zip(('upsert', 'rowwise'), user_ids):
+            progress_upsert.UPSERT_INSERTS = upsert_inserts if name == 'upsert' else {}
+            completions, counts, timings = [], [], []
+            for step in range(args.events):
+                event_type = EVENT_TYPES[step % len(EVENT_TYPES)]
+                before = len(statements)
+                started = time.perf_counter()
+                missions = update_mission_progress(user_id, event_type)
+                challenges = update_challenge_progress(user_id, event_type)
+                timings.append(time.perf_counter() - started)
+                counts.append(len(statements) - before)
+                completions += [(step, m.title) for m in missions] + [(step, c.title) for c in challenges]
+
+            state = sorted(
+                [(row['mission'].title, row['progress'].current_progress, row['progress'].completed,
+                  row['progress'].completed_at is not None) for row in get_user_mission_progress(user_id)] +
+                [(row['challenge'].title, row['progress'].current_progress, row['progress'].completed,
+                  row['progress'].completed_at is not None) for row in get_user_challenge_progress(user_id)]
+            )
+            results[name] = (completions, state)
+            print(f"{name:8} {statistics.mean(counts):5.1f} statements and {statistics.median(timings) * 1000:6.2f} ms "
+                  f"per event (missions + challenges); completed: {', '.join(title for _, title in completions) or 'none'}")
+        progress_upsert.UPSERT_INSERTS = upsert_inserts
+
+    if results['upsert'] != results['rowwise']:
+        print("Paths disagree:")
+        for name, result in results.items():
+            print(f"  {name}: {result}")
+        sys.exit(1)
+    print(f"both paths agree on {len(results['upsert'][1])} progress rows and {len(results['upsert'][0])} completions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Bootstrap
+One-time schema and seed data setup, run by `flask bootstrap` once per
+deploy instead of in every worker process at import
+"""
+import contextlib
+import os
+from datetime import date
+
+from flask import current_app
+from sqlalchemy import text
+
+from models import db
+from missions_manager import create_weekly_missions
+from challenges_manager import create_seasonal_challenges, get_season_window
+from marketplace_manager import initialize_marketplace
+
+# Application-wide key for pg_advisory_lock, shared by every bootstrap run
+ADVISORY_LOCK_KEY = 4817265
+
+_seeded_on = None
+
+
+@contextlib.contextmanager
+def bootstrap_lock():
+    """
+    Serialize concurrent bootstrap runs against the same database
+
+    PostgreSQL uses a session advisory lock held on its own connection;
+    file-backed SQLite uses an flock on a file next to the database the
+    engine opened, with relative paths resolved under the instance folder
+    as Flask-SQLAlchemy does. Other databases fall back to the unique
+    constraints on the seeded tables.
+    """
+    engine = db.engine
+    database = engine.url.database
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as conn:
+            conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+                conn.commit()
+    elif engine.dialect.name == 'sqlite' and database and database != ':memory:':
+        import fcntl
+
+        if not os.path.isabs(database):
+            database = os.path.join(current_app.instance_path, database)
+        with open(f"{database}.bootstrap.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        yield
+
+
+def seed_current_period():
+    """Create this week's missions and this season's challenges if they are missing"""
+    create_weekly_missions()
+    create_seasonal_challenges(*get_season_window())
+
+
+def bootstrap():
+    """Create missing tables and seed data; safe to run repeatedly and concurrently"""
+    global _seeded_on
+    with bootstrap_lock():
+        db.create_all()
+        initialize_marketplace()
+        seed_current_period()
+    _seeded_on = date.today()
+
+
+def ensure_current_period():
+    """
+    Seed a new week or season the first time a worker sees a new day
+
+    Workers run for longer than a week, so missions and challenges for a
+    new period are created lazily. Costs one date comparison per request
+    and two existence queries per worker per day.
+    """
+    global _seeded_on
+    today = date.today()
+    if _seeded_on != today:
+        seed_current_period()
+        _seeded_on = today
@@ -1,8 +1,22 @@
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
 from models import db, SeasonalChallenge, UserChallengeProgress
+from progress_upsert import ProgressUpsert
 
-def get_current_season():
-    month = date.today().month
+# Progress on the active challenges of one type running on a given day
+challenge_progress = ProgressUpsert(
+    UserChallengeProgress, SeasonalChallenge, 'challenge_id',
+    [
+        SeasonalChallenge.challenge_type == bindparam('challenge_type'),
+        SeasonalChallenge.is_active == True,
+        SeasonalChallenge.start_date <= bindparam('today'),
+        SeasonalChallenge.end_date >= bindparam('today')
+    ]
+)
+
+def get_current_season(today=None):
+    month = (today or date.today()).month
     if month in [12, 1, 2]:
         return 'winter'
     elif month in [3, 4, 5]:
@@ -12,6 +26,22 @@ def get_current_season():
     else:
         return 'fall'
 
+def get_season_window(today=None):
+    '''
+    Current season with its start date and the 90-day window challenges run for
+    '''
+    today = today or date.today()
+    season = get_current_season(today)
+    season_starts = {
+        'winter': date(today.year if today.month == 12 else today.year - 1, 12, 1),
+        'spring': date(today.year, 3, 1),
+        'summer': date(today.year, 6, 1),
+        'fall': date(today.year, 9, 1)
+    }
+    season_start = season_starts.get(season, today)
+    season_end = season_start + timedelta(days=89)
+    return season, season_start, season_end
+
 def create_seasonal_challenges(season, start_date, end_date):
     existing = SeasonalChallenge.query.filter_by(season=season, start_date=start_date).first()
     if existing:
@@ -88,7 +118,11 @@ def create_seasonal_challenges(season, start_date, end_date):
         )
         db.session.add(challenge)
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another process created this season's challenges first; the unique constraint kept one copy
+        db.session.rollback()
 
 def get_active_challenges():
     today = date.today()
@@ -100,23 +134,11 @@ def get_active_challenges():
 
 def get_user_challenge_progress(user_id):
     active_challenges = get_active_challenges()
+    progress_rows = challenge_progress.rows(user_id, [challenge.id for challenge in active_challenges])
     progress_list = []
     
     for challenge in active_challenges:
-        progress = UserChallengeProgress.query.filter_by(
-            user_id=user_id,
-            challenge_id=challenge.id
-        ).first()
-        
-        if not progress:
-            progress = UserChallengeProgress(
-                user_id=user_id,
-                challenge_id=challenge.id,
-                current_progress=0
-            )
-            db.session.add(progress)
-            db.session.commit()
-        
+        progress = progress_rows[challenge.id]
         progress_list.append({
             'challenge': challenge,
             'progress': progress,
@@ -126,37 +148,9 @@ def get_user_challenge_progress(user_id):
     return progress_list
 
 def update_challenge_progress(user_id, challenge_type, increment=1):
-    active_challenges = SeasonalChallenge.query.filter_by(
-        challenge_type=challenge_type,
-        is_active=True
-    ).filter(
-        SeasonalChallenge.start_date <= date.today(),
-        SeasonalChallenge.end_date >= date.today()
-    ).all()
-    
-    completed_challenges = []
-    
-    for challenge in active_challenges:
-        progress = UserChallengeProgress.query.filter_by(
-            user_id=user_id,
-            challenge_id=challenge.id
-        ).first()
-        
-        if not progress:
-            progress = UserChallengeProgress(
-                user_id=user_id,
-                challenge_id=challenge.id,
-                current_progress=0
-            )
-            db.session.add(progress)
-        
-        if not progress.completed:
-            progress.current_progress += increment
-            
-            if progress.current_progress >= challenge.target_value:
-                progress.completed = True
-                progress.completed_at = datetime.utcnow()
-                completed_challenges.append(challenge)
-    
-    db.session.commit()
-    return completed_challenges
+    '''
+    Add increment to the user's progress on today's active challenges of challenge_type
+
+    Returns the challenges this update completed.
+    '''
+    return challenge_progress.increment(user_id, increment, challenge_type=challenge_type, today=date.today())
@@ -0,0 +1,234 @@
+"""
+Checkup Batch
+Evaluates the health_checkup rules for whole cohorts at once with NumPy
+masks, returning compact per-patient rule codes instead of plan dicts
+
+Each patient gets a blood-test bitmask, a lifestyle-tip bitmask, a
+checkup-frequency ID and a BP-category ID. expand_checkup_plan() turns
+one patient's codes back into exactly what generate_health_checkup_plan
+returns.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from health_checkup import checkup_plan_variant, generate_health_checkup_plan
+
+# Bit i of the `tests` mask is set when BLOOD_TEST_RULES[i] applies. Rules
+# are listed in the order the scalar function appends them, so expanding
+# set bits in ascending order rebuilds each tier's list.
+BLOOD_TEST_RULES = (
+    ('essential', 'Fasting Blood Glucose (FBG)', 'Monitor blood sugar levels', 'Every 6 months'),
+    ('essential', 'Fasting Blood Glucose (FBG)', 'Monitor blood sugar levels', 'Annually'),
+    ('essential', 'HbA1c (Glycated Hemoglobin)', '3-month average blood sugar indicator', 'Every 3 months'),
+    ('essential', 'HbA1c (Glycated Hemoglobin)', '3-month average blood sugar indicator', 'Every 6 months'),
+    ('essential', 'HbA1c (Glycated Hemoglobin)', '3-month average blood sugar indicator', 'Annually'),
+    ('essential', 'Lipid Panel (Cholesterol)', 'Check heart health and cholesterol levels', 'Every 6 months'),
+    ('essential', 'Lipid Panel (Cholesterol)', 'Check heart health and cholesterol levels', 'Annually'),
+    ('essential', 'Blood Pressure Monitoring', 'Your BP is elevated - monitor regularly', 'Weekly at home, monthly with doctor'),
+    ('essential', 'Urine Microalbumin', 'Screen for kidney damage from diabetes', 'Annually'),
+    ('recommended', 'Kidney Function Tests (Creatinine, BUN)', 'High BP can affect kidney function', 'Every 6 months'),
+    ('recommended', 'Comprehensive Metabolic Panel', 'Monitor kidney and liver function', 'Every 6 months'),
+    ('recommended', 'Eye Examination (Dilated)', 'Screen for diabetic retinopathy', 'Annually'),
+    ('recommended', 'Foot Examination', 'Check for diabetic neuropathy', 'Every 6 months'),
+    ('recommended', 'Thyroid Function Tests (TSH)', 'Screen for thyroid disorders (common after 40)', 'Every 2-3 years'),
+    ('recommended', 'Vitamin D Levels', 'Important for bone health', 'Annually'),
+    ('recommended', 'Liver Function Tests', 'Higher BMI can affect liver health', 'Annually'),
+    ('recommended', 'Insulin Levels (Fasting)', 'Family history increases diabetes risk', 'Annually'),
+    ('recommended', 'C-Peptide Test', 'Assess insulin production', 'Every 2 years'),
+    ('optional', 'Bone Density Scan', 'Screen for osteoporosis risk', 'Every 2 years'),
+    ('optional', 'Complete Blood Count (CBC)', 'General health screening', 'Annually'),
+    ('optional', 'Vitamin B12', 'Important for nerve function (especially for diabetics)', 'Annually'),
+    ('optional', 'Vitamin B12', 'Important for nerve function (especially for diabetics)', 'Every 2 years'),
+)
+
+# Bit i of the `lifestyle` mask is set when LIFESTYLE_RULES[i] applies, in output order
+LIFESTYLE_RULES = (
+    ('Sleep', '🛌', 'Aim for 7-9 hours of quality sleep each night', 'Good sleep helps regulate blood sugar and blood pressure'),
+    ('Sleep', '🛌', 'Aim for 7-8 hours of sleep each night', 'Quality sleep is crucial for metabolic health'),
+    ('Exercise', '🏃', 'Start with 20-30 minutes of walking daily', 'Gradually increase to 150 minutes of moderate activity per week'),
+    ('Exercise', '🏃', 'Exercise 30-45 minutes daily, 5 days a week', 'Mix cardio and strength training to improve insulin sensitivity'),
+    ('Exercise', '🏃', 'Exercise 30 minutes daily, at least 5 days a week', 'Regular physical activity prevents chronic diseases'),
+    ('Hydration', '💧', 'Drink 8-10 glasses of water daily', 'Proper hydration helps kidney function and blood sugar regulation'),
+    ('Stress Management', '🧘', 'Practice stress reduction techniques daily', 'Try meditation, deep breathing, or yoga to lower blood pressure'),
+    ('Stress Management', '🧘', 'Manage stress through relaxation techniques', 'Chronic stress can raise blood sugar and blood pressure'),
+    ('Monitoring', '📊', 'Monitor blood sugar regularly', 'Check fasting glucose and track patterns with your doctor'),
+    ('Weight Management', '⚖️', 'Work towards a healthy weight gradually', 'Even 5-10% weight loss can significantly improve health markers'),
+    ('Avoid Harmful Habits', '🚭', 'Avoid smoking and limit alcohol consumption', 'Both can worsen diabetes and cardiovascular health'),
+)
+
+# Indexed by the `frequency` code
+CHECKUP_FREQUENCIES = (
+    ('Every 3 months', 'Active diabetes management requires frequent monitoring'),
+    ('Every 3-4 months', 'Hypertension requires close monitoring and management'),
+    ('Every 4-6 months', 'Pre-diabetic or elevated BP requires regular monitoring'),
+    ('Every 6 months', 'Regular checkups important for seniors'),
+    ('Annually', 'Maintain regular health screening'),
+)
+
+# Indexed by the `bp_category` code
+BP_CATEGORIES = (
+    ('High (Hypertension)', 'concerning'),
+    ('Elevated', 'attention'),
+    ('Normal', 'good'),
+)
+
+NEXT_STEPS = (
+    "Schedule an appointment with your primary care physician",
+    "Discuss these test recommendations with your doctor",
+    "Get baseline tests done if you haven't had them recently",
+    "Create a health tracking log for blood sugar and blood pressure",
+    "Follow up on any abnormal results promptly",
+)
+
+CheckupRules = namedtuple('CheckupRules', ['tests', 'lifestyle', 'frequency', 'bp_category'])
+
+
+def _bitmask(conditions, dtype):
+    mask = np.zeros(len(conditions[0]), dtype=dtype)
+    for bit, condition in enumerate(conditions):
+        mask |= condition.astype(dtype) << dtype(bit)
+    return mask
+
+
+def evaluate_checkup_rules(age, bmi, glucose, bp_systolic, bp_diastolic, has_diabetes, family_history):
+    """
+    Evaluate the checkup rules for many patients at once
+
+    Args:
+        age, bmi, glucose, bp_systolic, bp_diastolic: Numeric array-likes, one value per patient
+        has_diabetes, family_history: Array-likes interpreted as booleans
+
+    Returns:
+        CheckupRules: uint32 `tests` and uint16 `lifestyle` bitmasks plus
+        uint8 `frequency` and `bp_category` codes, one entry per patient
+    """
+    age = np.asarray(age, dtype=np.float64)
+    bmi = np.asarray(bmi, dtype=np.float64)
+    glucose = np.asarray(glucose, dtype=np.float64)
+    bp_systolic = np.asarray(bp_systolic, dtype=np.float64)
+    bp_diastolic = np.asarray(bp_diastolic, dtype=np.float64)
+    diabetes = np.asarray(has_diabetes).astype(bool)
+    family = np.asarray(family_history).astype(bool)
+
+    hypertension = (bp_systolic >= 140) | (bp_diastolic >= 90)
+    elevated_bp = (bp_systolic >= 130) | (bp_diastolic >= 80)
+    glucose_over_100 = glucose > 100
+    diabetic_range = diabetes | (glucose > 125)
+    obese = bmi > 30
+    over_50 = age > 50
+    lipid_often = (age > 45) | obese
+    always = np.ones(len(age), dtype=bool)
+
+    tests = _bitmask([
+        diabetes | glucose_over_100, ~(diabetes | glucose_over_100),
+        diabetes, ~diabetes & glucose_over_100, ~diabetes & ~glucose_over_100,
+        lipid_often, ~lipid_often,
+        hypertension,
+        diabetic_range,
+        hypertension,
+        diabetic_range, diabetic_range, diabetic_range,
+        age > 40,
+        over_50,
+        obese,
+        family, family,
+        over_50,
+        always,
+        diabetes, ~diabetes,
+    ], np.uint32)
+
+    sleep_under_65 = age < 65
+    stressed = bp_systolic >= 140
+    lifestyle = _bitmask([
+        sleep_under_65, ~sleep_under_65,
+        obese, ~obese & diabetes, ~obese & ~diabetes,
+        always,
+        stressed, ~stressed,
+        diabetic_range,
+        bmi > 25,
+        always,
+    ], np.uint16)
+
+    frequency = np.select(
+        [diabetes, hypertension, (glucose > 125) | elevated_bp, age > 60], [0, 1, 2, 3], default=4
+    ).astype(np.uint8)
+    bp_category = np.select([hypertension, elevated_bp], [0, 1], default=2).astype(np.uint8)
+
+    return CheckupRules(tests, lifestyle, frequency, bp_category)
+
+
+def blood_test_names(tests):
+    """Names of the tests set in one patient's `tests` mask, in plan order"""
+    tests = int(tests)
+    return [rule[1] for bit, rule in enumerate(BLOOD_TEST_RULES) if tests >> bit & 1]
+
+
+def expand_checkup_plan(tests, lifestyle, frequency, bp_category, bp_systolic, bp_diastolic, family_history):
+    """
+    Rebuild generate_health_checkup_plan's dict from one patient's rule codes
+
+    The BP reading is formatted from the values passed in, so pass them as
+    the scalar function would have received them.
+    """
+    tests, lifestyle = int(tests), int(lifestyle)
+    blood_tests = {"essential": [], "recommended": [], "optional": []}
+    for bit, (tier, name, reason, test_frequency) in enumerate(BLOOD_TEST_RULES):
+        if tests >> bit & 1:
+            blood_tests[tier].append({"name": name, "reason": reason, "frequency": test_frequency})
+
+    lifestyle_tips = [
+        {"category": category, "icon": icon, "recommendation": recommendation, "details": details}
+        for bit, (category, icon, recommendation, details) in enumerate(LIFESTYLE_RULES)
+        if lifestyle >> bit & 1
+    ]
+
+    doctor_visits, reason = CHECKUP_FREQUENCIES[frequency]
+    category, status = BP_CATEGORIES[bp_category]
+    checkup_plan = {
+        "blood_pressure_info": {
+            "reading": f"{bp_systolic}/{bp_diastolic} mmHg",
+            "category": category,
+            "status": status
+        },
+        "blood_tests": blood_tests,
+        "checkup_frequency": {"doctor_visits": doctor_visits, "reason": reason},
+        "lifestyle_tips": lifestyle_tips,
+        "family_history": family_history,
+        "next_steps": list(NEXT_STEPS)
+    }
+    checkup_plan["variant"] = checkup_plan_variant(checkup_plan)
+    return checkup_plan
+
+
+def verify_checkup_rules():
+    """
+    Compare the batch rules with generate_health_checkup_plan on a grid of
+    values on and either side of every threshold
+
+    Returns:
+        tuple: (number of input combinations checked, list of mismatching inputs)
+    """
+    import itertools
+
+    grid = list(itertools.product(
+        (20, 40, 40.5, 41, 45, 45.5, 46, 50, 51, 60, 61, 64.5, 65, 70),  # age
+        (22, 25, 25.1, 30, 30.1),                                        # BMI
+        (90, 100, 100.5, 101, 125, 125.5, 126),                          # glucose
+        (120, 129.5, 130, 139.5, 140),                                   # systolic
+        (70, 79.5, 80, 89.5, 90),                                        # diastolic
+        (0, 1),                                                          # has_diabetes
+        (False, True)                                                    # family_history
+    ))
+    columns = list(zip(*grid))
+    rules = evaluate_checkup_rules(*columns)
+
+    mismatches = []
+    for i, inputs in enumerate(grid):
+        age, bmi, glucose, bp_systolic, bp_diastolic, has_diabetes, family_history = inputs
+        expanded = expand_checkup_plan(
+            rules.tests[i], rules.lifestyle[i], rules.frequency[i], rules.bp_category[i],
+            bp_systolic, bp_diastolic, family_history
+        )
+        if expanded != generate_health_checkup_plan(*inputs):
+            mismatches.append(inputs)
+    return len(grid), mismatches
@@ -0,0 +1,179 @@
+"""
+CLI Commands
+Registers the `flask ...` maintenance commands on the application
+"""
+import click
+
+
+def register_commands(app):
+    from training import train_command
+
+    app.cli.add_command(train_command)
+
+    @app.cli.command('bootstrap')
+    def bootstrap_command():
+        """Create tables and seed the marketplace, missions and challenges (safe to re-run)."""
+        from bootstrap import bootstrap
+
+        bootstrap()
+        click.echo('Database bootstrapped')
+
+    @app.cli.command('verify-plans')
+    def verify_plans_command():
+        """Check the compiled plan tables and batch checkup rules against the reference implementations."""
+        from checkup_batch import verify_checkup_rules
+        from diet_planner import verify_diet_plan_table
+
+        failed = False
+        for label, verify, fields in [
+            ('Diet plans', verify_diet_plan_table, 'glucose, insulin, bmi, age, has_diabetes'),
+            ('Checkup rules', verify_checkup_rules,
+             'age, bmi, glucose, bp_systolic, bp_diastolic, has_diabetes, family_history'),
+        ]:
+            checked, mismatches = verify()
+            click.echo(f"{label}: {checked} input combinations checked, {len(mismatches)} mismatches")
+            for inputs in mismatches[:20]:
+                click.echo(f"  mismatch for {fields} = {inputs}")
+            failed = failed or bool(mismatches)
+        if failed:
+            raise SystemExit(1)
+
+    @app.cli.command('score-file')
+    @click.argument('input_path', type=click.Path(exists=True, dir_okay=False))
+    @click.argument('output_path', type=click.Path(dir_okay=False))
+    @click.option('--chunk-size', default=100_000, show_default=True, help='Rows read and scored per chunk')
+    @click.option('--workers', default=1, show_default=True, help='Worker processes; 0 uses every core')
+    @click.option('--format', 'output_format', type=click.Choice(['csv', 'parquet']), default=None,
+                  help='Output format (default: from the output file extension)')
+    @click.option('--keep-columns', default='', metavar='COLUMNS',
+                  help='Comma-separated input columns to copy into the output, e.g. a patient ID; '
+                       '"*" keeps every non-feature column')
+    def score_file_command(input_path, output_path, chunk_size, workers, output_format, keep_columns):
+        """Score a diabetes.csv-format file with the served model."""
+        from batch_scoring import score_file
+        from model_artifact import ArtifactError
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry()
+        version = registry.active_version()
+        try:
+            metadata, scorer = registry.load_scorer(version)
+        except (ArtifactError, OSError) as e:
+            raise click.ClickException(f"Cannot load active model {version}: {e}")
+        try:
+            summary = score_file(
+                input_path, output_path, scorer,
+                chunk_size=chunk_size, workers=workers,
+                output_format=output_format, model_version=version,
+                keep_columns=[name.strip() for name in keep_columns.split(',') if name.strip()]
+            )
+        except (RuntimeError, ValueError) as e:
+            raise click.ClickException(str(e))
+
+        click.echo(
+            f"Scored {summary['rows']} rows in {summary['chunks']} chunks "
+            f"({summary['invalid_rows']} invalid) in {summary['seconds']}s with model {version}"
+        )
+        if summary['kept_columns']:
+            click.echo(f"Kept columns: {', '.join(summary['kept_columns'])}")
+
+    @app.cli.group('model')
+    def model_group():
+        """Inspect and switch versions in the model registry."""
+
+    @model_group.command('list')
+    def list_models_command():
+        """List registered model versions."""
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry()
+        active = registry.active_version()
+        for version in registry.versions():
+            click.echo(f"{'*' if version == active else ' '} {version}")
+
+    @model_group.command('activate')
+    @click.argument('version')
+    def activate_model_command(version):
+        """Make VERSION the served model; running workers switch within the reload interval."""
+        from model_artifact import ArtifactError
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry()
+        try:
+            registry.load(version)
+            registry.activate(version)
+        except ArtifactError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Activated model {version}")
+
+    @model_group.command('export-numeric')
+    @click.argument('version', required=False)
+    def export_numeric_command(version):
+        """Write the memory-mappable numeric export for VERSION (default: active)."""
+        from model_artifact import ArtifactError
+        from model_registry import ModelRegistry
+
+        registry = ModelRegistry()
+        version = version or registry.active_version()
+        try:
+            exported = registry.export_linear(registry.load(version))
+        except ArtifactError as e:
+            raise click.ClickException(str(e))
+        if not exported:
+            raise click.ClickException(f"Model {version} is not linear; it can only be served from its pickle")
+        click.echo(f"Exported {', '.join(registry.linear_paths(version))}")
+
+    @model_group.command('add-reference')
+    @click.argument('version', required=False)
+    @click.option('--data', 'data_path', default=None, type=click.Path(exists=True, dir_okay=False),
+                  help='Training CSV the version was fitted on (default: diabetes.csv)')
+    def add_reference_command(version, data_path):
+        """Store the drift reference for VERSION (default: active), built from its training split."""
+        from model_artifact import ArtifactError, build_reference
+        from model_registry import ModelRegistry
+        from training import DEFAULT_DATA_PATH, holdout_split, load_training_data
+
+        registry = ModelRegistry()
+        version = version or registry.active_version()
+        try:
+            artifact = registry.load(version)
+        except ArtifactError as e:
+            raise click.ClickException(str(e))
+        X, y = load_training_data(data_path or DEFAULT_DATA_PATH)
+        X_train, _, _, _ = holdout_split(X, y)
+        artifact['reference'] = build_reference(X_train, artifact['pipeline'].predict(X_train))
+        registry.publish(artifact, activate=False)
+        click.echo(f"Added a drift reference of {len(X_train)} rows to model {version}")
+
+    @app.cli.command('retrain-online')
+    @click.option('--batch-size', default=1000, show_default=True, help='Records per partial_fit batch')
+    @click.option('--seed-csv', default='diabetes.csv', show_default=True,
+                  help='Labelled CSV fitted first when no checkpoint exists ("" to skip)')
+    @click.option('--reset', is_flag=True, help='Discard the checkpoint and start a new model')
+    @click.option('--publish/--no-publish', default=False, show_default=True,
+                  help='Publish the updated model to the registry')
+    @click.option('--activate', is_flag=True,
+                  help='Make the published model the served version, if it scores at least as well as the '
+                       'active one on the labelled holdout')
+    @click.option('--settle-seconds', default=60, show_default=True,
+                  help='Leave records younger than this for the next run, so ones still being committed are not skipped')
+    def retrain_online_command(batch_size, seed_csv, reset, publish, activate, settle_seconds):
+        """Update the online model with health records added since the last run."""
+        from online_training import HoldoutRegression, publish_state, update
+
+        state, processed = update(batch_size=batch_size, seed_csv=seed_csv or None, reset=reset,
+                                  settle_seconds=settle_seconds)
+        click.echo(
+            f"Processed {processed} new records (watermark {state['watermark']}, "
+            f"{state['rows_seen']} rows seen in total)"
+        )
+        if publish:
+            try:
+                version, metrics = publish_state(state, activate=activate)
+            except HoldoutRegression as e:
+                raise click.ClickException(str(e))
+            click.echo(
+                f"Published model {version}{' (active)' if activate else ''}: holdout ROC AUC "
+                f"{metrics['holdout']['roc_auc']:.4f} (active {metrics['active_holdout']['version']}: "
+                f"{metrics['active_holdout']['roc_auc']:.4f})"
+            )
@@ -1,7 +1,17 @@
 """
 Diet Plan Generator for Diabetes Predictor
 Generates personalized diet plans based on user data and prediction results
+
+A plan only depends on which side of a few thresholds the inputs fall,
+apart from the formatted readings, so every combination is compiled once
+at import into an immutable template and each request just overlays the
+personal tips and health metrics. Each template also keeps a marshalled
+plain-data snapshot, so every caller gets its own ordinary dicts and lists
+for a fraction of the cost of copying the template.
 """
+import marshal
+from collections import namedtuple
+from types import MappingProxyType
 
 def calculate_daily_calories(age, bmi, glucose, has_diabetes):
     """Calculate personalized daily calorie target"""
@@ -238,19 +248,12 @@ def generate_weekly_schedule(calories, has_diabetes):
     return schedule
 
 
-def generate_diet_plan(glucose, insulin, bmi, age, has_diabetes):
+def generate_diet_plan_reference(glucose, insulin, bmi, age, has_diabetes):
     """
-    Generate complete diet plan based on user data and prediction
-    
-    Args:
-        glucose: Glucose level (mg/dL)
-        insulin: Insulin level (μU/mL)
-        bmi: Body Mass Index
-        age: Patient age
-        has_diabetes: Whether patient has diabetes (1) or not (0)
-    
-    Returns:
-        dict: Complete diet plan with all components
+    Build a diet plan from scratch on every call
+
+    The original implementation, kept as the specification the compiled
+    table is verified against (see verify_diet_plan_table).
     """
     has_diabetes_bool = bool(has_diabetes)
     
@@ -303,3 +306,200 @@ def generate_diet_plan(glucose, insulin, bmi, age, has_diabetes):
     }
     
     return diet_plan
+
+
+# Decision table
+# ---------------
+# Bucket indices follow the same comparisons, in the same order, as the
+# reference implementation, so boundary values (BMI exactly 30, glucose
+# exactly 140, ...) land where they always did.
+
+BASE_TIPS = (
+    "Eat at regular intervals to maintain stable blood sugar",
+    "Stay hydrated - drink 8-10 glasses of water daily",
+    "Monitor portion sizes carefully",
+    "Choose whole grains over refined carbohydrates",
+    "Include fiber-rich foods in every meal",
+    "Limit saturated fats and avoid trans fats",
+    "Exercise regularly for at least 30 minutes daily"
+)
+AVOID_SUGAR_TIP = "Avoid sugary drinks and desserts completely until glucose levels stabilize"
+WEIGHT_TIP = "Weight management is crucial - combine diet with regular physical activity"
+
+# One value inside each bucket, used to compile that bucket's template
+BMI_SAMPLES = (18.0, 22.0, 27.0, 30.0, 35.0)
+AGE_SAMPLES = (25, 45, 65)
+GLUCOSE_SAMPLES = (100, 160, 200)
+INSULIN_SAMPLES = (100, 200)
+
+DietPlanTemplate = namedtuple('DietPlanTemplate', ['variant', 'fields', 'tips', 'snapshot'])
+
+
+def bmi_bucket(bmi):
+    """0: <18.5, 1: <25, 2: <30, 3: exactly 30, 4: >30"""
+    if bmi < 18.5:
+        return 0
+    if bmi < 25:
+        return 1
+    if bmi < 30:
+        return 2
+    if bmi > 30:
+        return 4
+    return 3
+
+
+def age_bucket(age):
+    """0: <30, 1: 30-60, 2: >60"""
+    if age > 60:
+        return 2
+    if age < 30:
+        return 0
+    return 1
+
+
+def glucose_bucket(glucose):
+    """0: <=140, 1: <=180, 2: >180"""
+    if glucose > 180:
+        return 2
+    if glucose > 140:
+        return 1
+    return 0
+
+
+def freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Inverse of freeze(), giving plain dicts and lists"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+def compile_diet_plan_table():
+    """
+    Build the immutable template for every bucket combination
+
+    Returns:
+        dict: (bmi bucket, age bucket, glucose bucket, high insulin, has diabetes) -> DietPlanTemplate
+    """
+    friendly_foods = freeze(get_diabetic_friendly_foods())
+    foods_avoid = freeze(get_foods_to_avoid())
+    meals_by_calories = {}
+
+    table = {}
+    for b, bmi in enumerate(BMI_SAMPLES):
+        for a, age in enumerate(AGE_SAMPLES):
+            for g, glucose in enumerate(GLUCOSE_SAMPLES):
+                for insulin in INSULIN_SAMPLES:
+                    for has_diabetes in (False, True):
+                        high_insulin = insulin > 150
+                        calories = calculate_daily_calories(age, bmi, glucose, has_diabetes)
+                        meals_key = (calories, has_diabetes)
+                        if meals_key not in meals_by_calories:
+                            meals_by_calories[meals_key] = (
+                                freeze(generate_meal_suggestions(calories, has_diabetes)),
+                                freeze(generate_weekly_schedule(calories, has_diabetes))
+                            )
+                        meal_suggestions, weekly_schedule = meals_by_calories[meals_key]
+
+                        # Tips after the two that quote the user's readings
+                        tips = list(BASE_TIPS)
+                        if g == 2:
+                            tips.insert(0, AVOID_SUGAR_TIP)
+                        if b == 4:
+                            tips.append(WEIGHT_TIP)
+
+                        variant = f"b{b}a{a}g{g}i{int(high_insulin)}d{int(has_diabetes)}"
+                        fields = MappingProxyType({
+                            "daily_calories": calories,
+                            "macronutrients": freeze(get_macronutrient_breakdown(glucose, insulin, has_diabetes)),
+                            "diabetic_friendly_foods": friendly_foods,
+                            "foods_to_avoid": foods_avoid,
+                            "meal_suggestions": meal_suggestions,
+                            "weekly_schedule": weekly_schedule,
+                        })
+                        table[(b, a, g, high_insulin, has_diabetes)] = DietPlanTemplate(
+                            variant, fields, tuple(tips), marshal.dumps(thaw(fields))
+                        )
+    return table
+
+
+DIET_PLAN_TABLE = compile_diet_plan_table()
+
+
+def generate_diet_plan(glucose, insulin, bmi, age, has_diabetes):
+    """
+    Generate complete diet plan based on user data and prediction
+    
+    Args:
+        glucose: Glucose level (mg/dL)
+        insulin: Insulin level (μU/mL)
+        bmi: Body Mass Index
+        age: Patient age
+        has_diabetes: Whether patient has diabetes (1) or not (0)
+    
+    Returns:
+        dict: Complete diet plan with all components, as plain dicts and
+        lists the caller may modify or serialize; `variant` identifies the
+        template the plan came from.
+    """
+    high_insulin = insulin > 150
+    template = DIET_PLAN_TABLE[
+        (bmi_bucket(bmi), age_bucket(age), glucose_bucket(glucose), high_insulin, bool(has_diabetes))
+    ]
+    
+    tips = []
+    if high_insulin:
+        tips.append(f"Your insulin level ({insulin:.0f} μU/mL) suggests possible insulin resistance. Reduce simple carbs")
+    if glucose > 140:
+        tips.append(f"Your glucose level ({glucose:.0f} mg/dL) is elevated. Focus on low glycemic index foods")
+    tips.extend(template.tips)
+    
+    diet_plan = marshal.loads(template.snapshot)
+    diet_plan["tips"] = tips
+    diet_plan["health_metrics"] = {
+        "glucose": f"{glucose:.0f} mg/dL",
+        "insulin": f"{insulin:.0f} μU/mL",
+        "bmi": f"{bmi:.1f}",
+        "age": int(age)
+    }
+    diet_plan["variant"] = template.variant
+    
+    return diet_plan
+
+
+def verify_diet_plan_table():
+    """
+    Compare generate_diet_plan with the reference implementation on a grid
+    of values on, just inside and just outside every threshold
+
+    Returns:
+        tuple: (number of input combinations checked, list of mismatching inputs)
+    """
+    import itertools
+
+    grid = itertools.product(
+        (0, 140, 140.4, 140.6, 141, 179.6, 180, 180.4, 181, 250),           # glucose
+        (0, 149.6, 150, 150.4, 151, 600),                                   # insulin
+        (10, 18.4, 18.5, 18.6, 24.9, 25, 25.1, 29.9, 30, 30.04, 30.1, 45),  # BMI
+        (18, 29, 29.5, 30, 45, 60, 60.5, 61, 85),                           # age
+        (0, 1)                                                              # has_diabetes
+    )
+    checked = 0
+    mismatches = []
+    for inputs in grid:
+        checked += 1
+        compiled = generate_diet_plan(*inputs)
+        compiled.pop("variant")
+        if compiled != generate_diet_plan_reference(*inputs):
+            mismatches.append(inputs)
+    return checked, mismatches
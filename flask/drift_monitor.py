@@ -0,0 +1,335 @@
+"""
+Drift Monitor
+Streaming summaries of /predict inputs and predictions, compared against
+the training reference stored with each model version
+
+Each request updates a running mean/variance (Welford), fixed-bin counts
+and out-of-range counters per feature, so the cost per request and the
+memory held do not grow with traffic. Workers periodically flush their
+counts to drift_snapshots; /api/drift merges the recent snapshots and
+reports PSI and KS per feature against the training distribution.
+Model versions published without a reference are not monitored; nothing
+is rebuilt from the training CSV while serving.
+"""
+import bisect
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+
+from model_artifact import FEATURE_NAMES
+from models import db, DriftSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Usual PSI rules of thumb: below 0.1 stable, 0.1-0.25 moderate shift, above 0.25 major shift
+PSI_WARN = 0.1
+PSI_ALERT = 0.25
+PSI_EPSILON = 1e-4
+
+
+class FeatureStats:
+    """Running mean/variance, fixed-bin histogram and out-of-range counts for one feature"""
+
+    __slots__ = ('edges', 'count', 'mean', 'm2', 'bins', 'below', 'above')
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.bins = [0] * (len(edges) - 1)
+        self.below = 0
+        self.above = 0
+
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if value < self.edges[0]:
+            self.below += 1
+        elif value > self.edges[-1]:
+            self.above += 1
+        else:
+            # Same convention as numpy.histogram: the last bin includes its right edge
+            self.bins[min(bisect.bisect_right(self.edges, value) - 1, len(self.bins) - 1)] += 1
+
+    def to_dict(self):
+        return {
+            'count': self.count, 'mean': self.mean, 'm2': self.m2,
+            'bins': list(self.bins), 'below': self.below, 'above': self.above,
+        }
+
+
+def merge_feature_stats(a, b):
+    """Combine two FeatureStats.to_dict() results (Chan et al. parallel variance)"""
+    if not a or not a['count']:
+        return dict(b)
+    if not b['count']:
+        return dict(a)
+    count = a['count'] + b['count']
+    delta = b['mean'] - a['mean']
+    return {
+        'count': count,
+        'mean': a['mean'] + delta * b['count'] / count,
+        'm2': a['m2'] + b['m2'] + delta * delta * a['count'] * b['count'] / count,
+        'bins': [x + y for x, y in zip(a['bins'], b['bins'])],
+        'below': a['below'] + b['below'],
+        'above': a['above'] + b['above'],
+    }
+
+
+def merge_window_stats(a, b):
+    """Combine two DriftWindow.to_dict() results for the same model version"""
+    if not a:
+        return b
+    return {
+        'observations': a['observations'] + b['observations'],
+        'positives': a['positives'] + b['positives'],
+        'features': {
+            name: merge_feature_stats(a['features'].get(name), b['features'][name])
+            for name in b['features']
+        },
+    }
+
+
+class DriftWindow:
+    """Everything observed for one model version since the last flush"""
+
+    def __init__(self, reference):
+        self.features = [FeatureStats(reference['features'][name]['edges']) for name in FEATURE_NAMES]
+        self.observations = 0
+        self.positives = 0
+
+    def observe(self, features, prediction):
+        for stats, value in zip(self.features, features):
+            stats.update(float(value))
+        self.observations += 1
+        if prediction == 1:
+            self.positives += 1
+
+    def to_dict(self):
+        return {
+            'observations': self.observations,
+            'positives': self.positives,
+            'features': {name: stats.to_dict() for name, stats in zip(FEATURE_NAMES, self.features)},
+        }
+
+
+def psi(expected, actual):
+    """Population stability index between two lists of proportions"""
+    total = 0.0
+    for e, a in zip(expected, actual):
+        e = max(e, PSI_EPSILON)
+        a = max(a, PSI_EPSILON)
+        total += (a - e) * math.log(a / e)
+    return total
+
+
+def ks_statistic(expected, actual):
+    """Kolmogorov-Smirnov distance between two binned distributions"""
+    largest = cumulative_e = cumulative_a = 0.0
+    for e, a in zip(expected, actual):
+        cumulative_e += e
+        cumulative_a += a
+        largest = max(largest, abs(cumulative_e - cumulative_a))
+    return largest
+
+
+def drift_status(value):
+    if value >= PSI_ALERT:
+        return 'alert'
+    if value >= PSI_WARN:
+        return 'warn'
+    return 'ok'
+
+
+def compare(reference, stats):
+    """
+    Compare merged live statistics with a training reference
+
+    Values outside the training range are counted in extra bins on either
+    side, which the reference has (almost) no mass in, so extrapolation
+    shows up directly in PSI and KS.
+
+    Args:
+        reference: Reference dict from model_artifact.build_reference()
+        stats: Merged DriftWindow.to_dict() results, or None
+
+    Returns:
+        dict: Per-feature and prediction-rate comparison
+    """
+    observations = stats['observations'] if stats else 0
+    report = {'observations': observations, 'reference_samples': reference['n_samples'], 'features': {}}
+
+    for name in FEATURE_NAMES:
+        ref = reference['features'][name]
+        entry = {
+            'reference': {'mean': ref['mean'], 'std': ref['std'], 'min': ref['edges'][0], 'max': ref['edges'][-1]},
+        }
+        live = stats['features'][name] if stats else None
+        if live and live['count']:
+            count = live['count']
+            expected = [0.0] + list(ref['proportions']) + [0.0]
+            actual = [c / count for c in [live['below']] + live['bins'] + [live['above']]]
+            entry['live'] = {
+                'count': count,
+                'mean': live['mean'],
+                'std': math.sqrt(live['m2'] / count),
+            }
+            entry['out_of_range'] = {
+                'below_min': live['below'],
+                'above_max': live['above'],
+                'rate': (live['below'] + live['above']) / count,
+            }
+            entry['psi'] = psi(expected, actual)
+            entry['ks'] = ks_statistic(expected, actual)
+            entry['status'] = drift_status(entry['psi'])
+        report['features'][name] = entry
+
+    prediction = {'reference_positive_rate': reference['positive_rate']}
+    if observations:
+        rate = stats['positives'] / observations
+        expected = [1 - reference['positive_rate'], reference['positive_rate']]
+        prediction['positive_rate'] = rate
+        prediction['psi'] = psi(expected, [1 - rate, rate])
+        prediction['status'] = drift_status(prediction['psi'])
+    report['prediction'] = prediction
+    return report
+
+
+class DriftMonitor:
+    """
+    Per-process drift counters with a background flush to the database
+
+    observe() only touches in-memory counters under a short lock. A daemon
+    thread writes one DriftSnapshot per model version every flush_interval
+    seconds and starts a fresh window; counts not yet flushed when a worker
+    exits are lost, and other workers' unflushed counts are not visible to
+    report() until their next flush.
+    """
+
+    def __init__(self, flush_interval=60.0):
+        self.flush_interval = flush_interval
+        self.observed = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self._windows = {}
+        self._references = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._flusher_pid = None
+        self._start_lock = threading.Lock()
+
+    def reference_for(self, loaded_model):
+        """The version's training reference, or None (logged once) if it was published without one"""
+        version = loaded_model.version
+        if version not in self._references:
+            reference = loaded_model.metadata.get('reference')
+            if reference is None:
+                logger.warning("Model %s has no drift reference; drift checks are off for it. "
+                               "Run `flask model add-reference %s` to add one.", version, version)
+            self._references[version] = reference
+        return self._references[version]
+
+    def observe(self, loaded_model, features, prediction):
+        """Record one request's inputs and prediction against its model snapshot"""
+        reference = self.reference_for(loaded_model)
+        if reference is None:
+            return
+        with self._lock:
+            window = self._windows.get(loaded_model.version)
+            if window is None:
+                window = self._windows[loaded_model.version] = DriftWindow(reference)
+            window.observe(features, prediction)
+            self.observed += 1
+
+        # The flush thread does not survive fork, so start one per process
+        if self._flusher_pid != os.getpid() and self.flush_interval > 0:
+            self._start_flusher()
+
+    def _start_flusher(self):
+        from flask import current_app
+
+        with self._start_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._app = current_app._get_current_object()
+            thread = threading.Thread(target=self._run, name='drift-monitor-flush', daemon=True)
+            thread.start()
+            self._flusher_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            with self._app.app_context():
+                self.flush()
+
+    def flush(self):
+        """Write the current windows as snapshots and start new ones; returns rows written"""
+        with self._lock:
+            windows, self._windows = self._windows, {}
+        if not windows:
+            return 0
+
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        try:
+            db.session.add_all([
+                DriftSnapshot(
+                    model_version=version,
+                    worker=worker,
+                    observations=window.observations,
+                    stats=json.dumps(window.to_dict(), separators=(',', ':'))
+                )
+                for version, window in windows.items()
+            ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self.flush_errors += 1
+            logger.exception("Failed to write drift snapshots; dropping %d windows", len(windows))
+            return 0
+        self.flushes += 1
+        return len(windows)
+
+    def report(self, loaded_model, since):
+        """Compare snapshots written since `since` plus this worker's open window with the reference"""
+        version = loaded_model.version
+        reference = self.reference_for(loaded_model)
+        if reference is None:
+            return {'model_version': version, 'since': since.isoformat(), 'status': 'no_reference'}
+        snapshots = db.session.execute(
+            db.select(DriftSnapshot.stats)
+            .where(DriftSnapshot.model_version == version, DriftSnapshot.created_at >= since)
+        ).scalars()
+
+        merged = None
+        for stats in snapshots:
+            merged = merge_window_stats(merged, json.loads(stats))
+        with self._lock:
+            window = self._windows.get(version)
+            pending = window.to_dict() if window else None
+        if pending:
+            merged = merge_window_stats(merged, pending)
+
+        report = compare(reference, merged)
+        report['model_version'] = version
+        report['since'] = since.isoformat()
+        return report
+
+    def stats(self):
+        with self._lock:
+            pending = sum(window.observations for window in self._windows.values())
+        return {
+            'flush_interval': self.flush_interval,
+            'observed': self.observed,
+            'pending': pending,
+            'flushes': self.flushes,
+            'flush_errors': self.flush_errors,
+        }
+
@@ -0,0 +1,73 @@
+"""
+Fragment Cache
+Bounded LRU cache of rendered template fragments, for page sections whose
+HTML depends only on a small set of plan variants
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from flask import current_app, render_template
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU of rendered HTML keyed by template, variant and template mtime
+
+    The caller vouches that everything the fragment renders is determined
+    by `variant`. Editing the template changes its mtime, so stale HTML is
+    never served after a template change, even without a restart.
+    A maxsize of 0 disables caching and renders every time.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _template_mtime(self, template_name):
+        template = current_app.jinja_env.get_template(template_name)
+        return os.path.getmtime(template.filename) if template.filename else None
+
+    def render(self, template_name, variant, **context):
+        """Render template_name with context, reusing earlier HTML for the same variant"""
+        if self.maxsize <= 0:
+            return Markup(render_template(template_name, **context))
+
+        key = (template_name, variant, self._template_mtime(template_name))
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        html = Markup(render_template(template_name, **context))
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
@@ -1,103 +1,222 @@
-def get_health_advice(question):
-    question_lower = question.lower()
-    
-    # Diet-related questions
-    if 'diet' in question_lower or 'eat' in question_lower or 'food' in question_lower:
-        if 'diabetes' in question_lower or 'sugar' in question_lower:
-            return {
-                'answer': "For diabetes management, focus on low glycemic index foods like whole grains, lean proteins, non-starchy vegetables, and healthy fats. Avoid refined sugars, white bread, and sugary drinks.",
-                'tips': [
-                    "Choose whole grains over refined grains",
-                    "Include plenty of vegetables in every meal",
-                    "Opt for lean proteins like chicken, fish, and legumes",
-                    "Limit processed and packaged foods",
-                    "Monitor portion sizes"
-                ]
-            }
-        return {
-            'answer': "A balanced diet should include plenty of fruits, vegetables, whole grains, lean proteins, and healthy fats. Aim for variety and moderation.",
-            'tips': [
-                "Eat a rainbow of colorful fruits and vegetables",
-                "Stay hydrated with water",
-                "Limit processed foods and added sugars",
-                "Include fiber-rich foods",
-                "Practice mindful eating"
-            ]
-        }
-    
-    # Exercise-related questions
-    elif 'exercise' in question_lower or 'workout' in question_lower or 'physical' in question_lower:
-        return {
-            'answer': "Regular physical activity is crucial for managing blood sugar levels and overall health. Aim for at least 150 minutes of moderate aerobic activity per week.",
-            'tips': [
-                "Start with 30 minutes of walking daily",
-                "Include strength training twice a week",
-                "Try activities you enjoy like dancing, swimming, or cycling",
-                "Check blood sugar before and after exercise",
-                "Stay consistent with your routine"
-            ]
-        }
-    
-    # Blood sugar monitoring
-    elif 'blood sugar' in question_lower or 'glucose' in question_lower or 'monitor' in question_lower:
-        return {
-            'answer': "Regular blood sugar monitoring helps you understand how food, activity, and stress affect your levels. Keep a log and look for patterns.",
-            'tips': [
-                "Monitor at consistent times daily",
-                "Track your readings in a journal",
-                "Note what you ate before each reading",
-                "Check before and 2 hours after meals",
-                "Share your log with your healthcare provider"
-            ]
-        }
-    
-    # Stress management
-    elif 'stress' in question_lower or 'anxiety' in question_lower or 'mental' in question_lower:
-        return {
-            'answer': "Stress can significantly impact blood sugar levels. Managing stress through relaxation techniques and mindfulness is important for diabetes management.",
-            'tips': [
-                "Practice deep breathing exercises daily",
-                "Try meditation or yoga",
-                "Ensure 7-8 hours of quality sleep",
-                "Connect with friends and family",
-                "Consider professional counseling if needed"
-            ]
-        }
-    
-    # Sleep-related questions
-    elif 'sleep' in question_lower or 'rest' in question_lower:
-        return {
-            'answer': "Quality sleep is essential for blood sugar regulation and overall health. Poor sleep can increase insulin resistance.",
-            'tips': [
-                "Maintain a consistent sleep schedule",
-                "Create a relaxing bedtime routine",
-                "Keep your bedroom cool and dark",
-                "Avoid screens 1 hour before bed",
-                "Limit caffeine in the afternoon"
-            ]
-        }
-    
-    # Medication-related questions
-    elif 'medication' in question_lower or 'medicine' in question_lower or 'insulin' in question_lower:
-        return {
-            'answer': "Always take medications as prescribed by your healthcare provider. Never adjust doses without consulting them first.",
-            'tips': [
-                "Take medications at the same time daily",
-                "Set reminders on your phone",
-                "Keep a medication log",
-                "Report any side effects to your doctor",
-                "Never skip doses"
-            ]
-        }
-    
-    # Default response
-    return {
+"""
+Health Assistant
+Rule-based answers to health questions, matched on keywords in the question
+
+Intents are tried in INTENT_RULES order and the first one whose keyword
+groups all occur as substrings of the lowercased question wins. Every
+keyword is compiled at import into one Aho-Corasick automaton, so a
+question is scanned once, at constant cost per character, however many
+intents and keywords there are.
+"""
+from collections import deque
+
+# (intent, keyword groups): an intent matches when every group has at least
+# one keyword in the question. Order is priority, as in an if/elif chain.
+INTENT_RULES = (
+    ('diabetes_diet', (('diet', 'eat', 'food'), ('diabetes', 'sugar'))),
+    ('diet', (('diet', 'eat', 'food'),)),
+    ('exercise', (('exercise', 'workout', 'physical'),)),
+    ('blood_sugar', (('blood sugar', 'glucose', 'monitor'),)),
+    ('stress', (('stress', 'anxiety', 'mental'),)),
+    ('sleep', (('sleep', 'rest'),)),
+    ('medication', (('medication', 'medicine', 'insulin'),)),
+)
+
+DEFAULT_INTENT = 'general'
+
+RESPONSES = {
+    'diabetes_diet': {
+        'answer': "For diabetes management, focus on low glycemic index foods like whole grains, lean proteins, non-starchy vegetables, and healthy fats. Avoid refined sugars, white bread, and sugary drinks.",
+        'tips': (
+            "Choose whole grains over refined grains",
+            "Include plenty of vegetables in every meal",
+            "Opt for lean proteins like chicken, fish, and legumes",
+            "Limit processed and packaged foods",
+            "Monitor portion sizes"
+        )
+    },
+    'diet': {
+        'answer': "A balanced diet should include plenty of fruits, vegetables, whole grains, lean proteins, and healthy fats. Aim for variety and moderation.",
+        'tips': (
+            "Eat a rainbow of colorful fruits and vegetables",
+            "Stay hydrated with water",
+            "Limit processed foods and added sugars",
+            "Include fiber-rich foods",
+            "Practice mindful eating"
+        )
+    },
+    'exercise': {
+        'answer': "Regular physical activity is crucial for managing blood sugar levels and overall health. Aim for at least 150 minutes of moderate aerobic activity per week.",
+        'tips': (
+            "Start with 30 minutes of walking daily",
+            "Include strength training twice a week",
+            "Try activities you enjoy like dancing, swimming, or cycling",
+            "Check blood sugar before and after exercise",
+            "Stay consistent with your routine"
+        )
+    },
+    'blood_sugar': {
+        'answer': "Regular blood sugar monitoring helps you understand how food, activity, and stress affect your levels. Keep a log and look for patterns.",
+        'tips': (
+            "Monitor at consistent times daily",
+            "Track your readings in a journal",
+            "Note what you ate before each reading",
+            "Check before and 2 hours after meals",
+            "Share your log with your healthcare provider"
+        )
+    },
+    'stress': {
+        'answer': "Stress can significantly impact blood sugar levels. Managing stress through relaxation techniques and mindfulness is important for diabetes management.",
+        'tips': (
+            "Practice deep breathing exercises daily",
+            "Try meditation or yoga",
+            "Ensure 7-8 hours of quality sleep",
+            "Connect with friends and family",
+            "Consider professional counseling if needed"
+        )
+    },
+    'sleep': {
+        'answer': "Quality sleep is essential for blood sugar regulation and overall health. Poor sleep can increase insulin resistance.",
+        'tips': (
+            "Maintain a consistent sleep schedule",
+            "Create a relaxing bedtime routine",
+            "Keep your bedroom cool and dark",
+            "Avoid screens 1 hour before bed",
+            "Limit caffeine in the afternoon"
+        )
+    },
+    'medication': {
+        'answer': "Always take medications as prescribed by your healthcare provider. Never adjust doses without consulting them first.",
+        'tips': (
+            "Take medications at the same time daily",
+            "Set reminders on your phone",
+            "Keep a medication log",
+            "Report any side effects to your doctor",
+            "Never skip doses"
+        )
+    },
+    DEFAULT_INTENT: {
         'answer': "I can help with questions about diet, exercise, blood sugar monitoring, stress management, sleep, and general diabetes care. What would you like to know?",
-        'tips': [
+        'tips': (
             "Ask about healthy eating habits",
             "Learn about exercise recommendations",
             "Get tips on blood sugar monitoring",
             "Understand stress management",
             "Discover sleep improvement strategies"
-        ]
-    }
+        )
+    },
+}
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton reporting which keyword groups occur in a text
+
+    Each keyword carries a bitmask of the groups it belongs to. Failure
+    links are folded into the transition tables when the automaton is
+    built, so scanning is one dict lookup and one OR per character, and
+    overlapping matches ("blood sugar" and "sugar") are all reported.
+    """
+
+    def __init__(self, keyword_masks):
+        goto = [{}]
+        output = [0]
+        for keyword, mask in keyword_masks.items():
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    output.append(0)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            output[state] |= mask
+
+        # Breadth-first, so a state's failure target is finished before it
+        transitions = [None] * len(goto)
+        transitions[0] = dict(goto[0])
+        failure = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions[state] = {**transitions[failure[state]], **goto[state]}
+            output[state] |= output[failure[state]]
+            for char, child in goto[state].items():
+                failure[child] = transitions[failure[state]].get(char, 0)
+                queue.append(child)
+
+        self.transitions = transitions
+        self.output = output
+
+    def scan(self, text):
+        """Bitwise OR of the masks of every keyword occurring in text"""
+        transitions, output = self.transitions, self.output
+        state = found = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            found |= output[state]
+        return found
+
+
+class IntentMatcher:
+    """
+    Priority-ordered intent rules compiled into a KeywordAutomaton
+
+    Each keyword group gets one bit. After the scan, only rules whose first
+    group was found are candidates, so resolving the intent costs per group
+    found rather than per rule in the table.
+    """
+
+    def __init__(self, rules=INTENT_RULES, default=DEFAULT_INTENT):
+        group_bits = {}
+        keyword_masks = {}
+        compiled = []
+        by_first_group = {}
+        for index, (intent, groups) in enumerate(rules):
+            masks = []
+            for group in groups:
+                if group not in group_bits:
+                    group_bits[group] = 1 << len(group_bits)
+                    for keyword in group:
+                        keyword_masks[keyword] = keyword_masks.get(keyword, 0) | group_bits[group]
+                masks.append(group_bits[group])
+            compiled.append((intent, tuple(masks)))
+            by_first_group.setdefault(masks[0], []).append(index)
+
+        self.automaton = KeywordAutomaton(keyword_masks)
+        self.rules = tuple(compiled)
+        self.default = default
+        self._by_first_group = {bit: tuple(indexes) for bit, indexes in by_first_group.items()}
+
+    def match(self, question):
+        """Name of the highest-priority intent matching question, or the default"""
+        found = self.automaton.scan(question.lower())
+        best = len(self.rules)
+        remaining = found
+        while remaining:
+            bit = remaining & -remaining
+            remaining ^= bit
+            for index in self._by_first_group.get(bit, ()):
+                if index >= best:
+                    break
+                if all(found & mask for mask in self.rules[index][1]):
+                    best = index
+                    break
+        return self.rules[best][0] if best < len(self.rules) else self.default
+
+
+INTENT_MATCHER = IntentMatcher()
+match_intent = INTENT_MATCHER.match
+
+
+def match_intent_reference(question, rules=INTENT_RULES):
+    """Straightforward substring scan of the rule table; kept to verify match_intent"""
+    question_lower = question.lower()
+    for intent, groups in rules:
+        if all(any(keyword in question_lower for keyword in group) for group in groups):
+            return intent
+    return DEFAULT_INTENT
+
+
+def get_health_advice(question):
+    response = RESPONSES[match_intent(question)]
+    return {'answer': response['answer'], 'tips': list(response['tips'])}
@@ -1,63 +1,207 @@
+import contextlib
+import hashlib
 import os
+import time
 from health_assistant import get_health_advice as get_rule_based_advice
+from llm_client import LLMClient
+from llm_limiter import LoadShed
 
-def get_health_advice_ai(question):
-    openai_api_key = os.environ.get("OPENAI_API_KEY")
-    
-    if not openai_api_key:
-        return get_rule_based_advice(question)
-    
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=openai_api_key)
-        
-        system_prompt = """You are a knowledgeable and empathetic health assistant specializing in diabetes management and general wellness. 
+ASSISTANT_MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = """You are a knowledgeable and empathetic health assistant specializing in diabetes management and general wellness. 
         Provide helpful, evidence-based advice about diet, exercise, blood sugar monitoring, stress management, and lifestyle choices.
         Always remind users to consult healthcare professionals for medical decisions.
         Keep responses concise (2-3 paragraphs) and include 3-5 actionable tips."""
+
+# Cached answers belong to one model and prompt; changing either starts a fresh cache
+ANSWER_CACHE_MODEL = f"{ASSISTANT_MODEL}:{hashlib.blake2b(SYSTEM_PROMPT.encode(), digest_size=6).hexdigest()}"
+
+# Used when the caller does not pass the app's configured client
+default_llm_client = LLMClient()
+
+def parse_ai_answer(ai_answer):
+    """
+    Split a completion into the answer paragraph(s) and a list of tips
+
+    Args:
+        ai_answer: Full completion text
+
+    Returns:
+        dict: {'answer': str, 'tips': list of str}
+    """
+    lines = ai_answer.split('\n')
+    answer_text = []
+    tips_list = []
+    
+    in_tips = False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.lower().startswith('tips:') or '1.' in line or '2.' in line:
+            in_tips = True
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": question}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
-        
-        ai_answer = response.choices[0].message.content
-        
-        lines = ai_answer.split('\n')
-        answer_text = []
-        tips_list = []
-        
-        in_tips = False
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            if line.lower().startswith('tips:') or '1.' in line or '2.' in line:
-                in_tips = True
-            
-            if in_tips and (line.startswith('-') or line.startswith('•') or any(line.startswith(f'{i}.') for i in range(1,10))):
-                tip = line.lstrip('-•0123456789. ')
-                if tip:
-                    tips_list.append(tip)
-            elif not in_tips:
-                answer_text.append(line)
+        if in_tips and (line.startswith('-') or line.startswith('•') or any(line.startswith(f'{i}.') for i in range(1,10))):
+            tip = line.lstrip('-•0123456789. ')
+            if tip:
+                tips_list.append(tip)
+        elif not in_tips:
+            answer_text.append(line)
+    
+    if not tips_list:
+        sentences = ' '.join(answer_text).split('. ')
+        if len(sentences) > 3:
+            tips_list = sentences[-3:]
+            answer_text = sentences[:-3]
+    
+    return {
+        'answer': ' '.join(answer_text) if answer_text else ai_answer,
+        'tips': tips_list if tips_list else []
+    }
+
+def get_local_advice(question, knowledge_base=None):
+    """Offline answer: the knowledge base's best match if it scores high enough, else the keyword rules"""
+    if knowledge_base:
+        advice = knowledge_base.answer(question)
+        if advice:
+            return advice
+    return get_rule_based_advice(question)
+
+def completion_request(question):
+    return {
+        'model': ASSISTANT_MODEL,
+        'messages': [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": question}
+        ],
+        'temperature': 0.7,
+        'max_tokens': 500
+    }
+
+def get_health_advice_ai(question, llm_client=None, answer_cache=None, llm_guard=None, hedge=True, llm_limiter=None,
+                         knowledge_base=None):
+    openai_api_key = os.environ.get("OPENAI_API_KEY")
+    
+    if not openai_api_key:
+        return get_local_advice(question, knowledge_base)
+    
+    if answer_cache:
+        cached = answer_cache.get(question, ANSWER_CACHE_MODEL)
+        if cached:
+            return cached
+    
+    # A close knowledge base match answers common questions without an LLM call
+    if knowledge_base:
+        local = knowledge_base.confident_answer(question)
+        if local:
+            return local
+    
+    def ask_llm(timer=None):
+        client = (llm_client or default_llm_client).get(openai_api_key)
+        # Only the provider's response time is reported to the breaker, not the
+        # wait for a limiter slot or the cache write
+        timed = timer or contextlib.nullcontext
+        with llm_limiter.slot() if llm_limiter else contextlib.nullcontext():
+            with timed():
+                response = client.chat.completions.create(**completion_request(question))
         
-        if not tips_list:
-            sentences = ' '.join(answer_text).split('. ')
-            if len(sentences) > 3:
-                tips_list = sentences[-3:]
-                answer_text = sentences[:-3]
+        advice = parse_ai_answer(response.choices[0].message.content)
+        if answer_cache:
+            answer_cache.put(question, ANSWER_CACHE_MODEL, advice)
+        return advice
+    
+    # With a guard, a slow or failing LLM is answered by the rules instead
+    if llm_guard:
+        return llm_guard.call(ask_llm, lambda: get_local_advice(question, knowledge_base), hedge=hedge)
+    
+    try:
+        return ask_llm()
+    except LoadShed:
+        return get_local_advice(question, knowledge_base)
+    except Exception as e:
+        print(f"OpenAI Error: {e}")
+        return get_local_advice(question, knowledge_base)
+
+def stream_health_advice_ai(question, llm_client=None, answer_cache=None, llm_guard=None, llm_limiter=None,
+                            knowledge_base=None):
+    """
+    Stream a completion as it is generated
+    
+    Yields ('token', text) for each piece of the completion, then exactly
+    one ('done', advice) with the parsed {'answer', 'tips'}. Local,
+    cached and fallback answers arrive as a single 'done' event. With a
+    guard, an open circuit skips the LLM and the time to the first token
+    is reported as the call's latency; the clock starts once a limiter slot
+    is held, as for the blocking path. With a limiter, the completion holds
+    a slot until it has been read to the end, and a shed request gets the
+    rule-based answer.
+    """
+    openai_api_key = os.environ.get("OPENAI_API_KEY")
+    
+    if not openai_api_key:
+        yield 'done', get_local_advice(question, knowledge_base)
+        return
+    
+    if answer_cache:
+        cached = answer_cache.get(question, ANSWER_CACHE_MODEL)
+        if cached:
+            yield 'done', cached
+            return
+    
+    if knowledge_base:
+        local = knowledge_base.confident_answer(question)
+        if local:
+            yield 'done', local
+            return
+    
+    if llm_guard and not llm_guard.admit():
+        yield 'done', get_local_advice(question, knowledge_base)
+        return
+    
+    release = None
+    if llm_limiter:
+        try:
+            release = llm_limiter.acquire()
+        except LoadShed:
+            if llm_guard:
+                llm_guard.cancel()
+            yield 'done', get_local_advice(question, knowledge_base)
+            return
+    
+    started = time.perf_counter()
+    first_token_latency = None
+    recorded = False
+    try:
+        client = (llm_client or default_llm_client).get(openai_api_key)
+        parts = []
+        with client.chat.completions.create(stream=True, **completion_request(question)) as stream:
+            for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    if first_token_latency is None:
+                        first_token_latency = time.perf_counter() - started
+                    parts.append(text)
+                    yield 'token', text
         
-        return {
-            'answer': ' '.join(answer_text) if answer_text else ai_answer,
-            'tips': tips_list if tips_list else []
-        }
+        if llm_guard:
+            llm_guard.record(True, first_token_latency or time.perf_counter() - started)
+            recorded = True
+        advice = parse_ai_answer(''.join(parts))
+        if answer_cache:
+            answer_cache.put(question, ANSWER_CACHE_MODEL, advice)
         
     except Exception as e:
         print(f"OpenAI Error: {e}")
-        return get_rule_based_advice(question)
+        if llm_guard and not recorded:
+            llm_guard.record(False, time.perf_counter() - started)
+            recorded = True
+        advice = get_local_advice(question, knowledge_base)
+    finally:
+        # A client that disconnects mid-stream closes this generator without
+        # an outcome; give the admission back rather than hold a probe
+        if llm_guard and not recorded:
+            llm_guard.cancel()
+        if release:
+            release()
+    
+    yield 'done', advice
@@ -2,6 +2,7 @@
 Health Checkup Recommendation Tool
 Generates personalized health checkup recommendations based on patient data
 """
+import hashlib
 
 def get_blood_test_recommendations(age, bmi, glucose, blood_pressure_systolic, blood_pressure_diastolic, has_diabetes, family_history):
     """
@@ -272,6 +273,20 @@ def get_lifestyle_recommendations(age, bmi, glucose, blood_pressure_systolic, ha
     return tips
 
 
+def checkup_plan_variant(checkup_plan):
+    """
+    Short key for a plan's recommendation content
+
+    Plans with the same key render identical frequency, test, lifestyle and
+    next-step sections, so that HTML can be cached and shared between them.
+    """
+    content = (
+        checkup_plan["blood_tests"], checkup_plan["checkup_frequency"],
+        checkup_plan["lifestyle_tips"], checkup_plan["next_steps"]
+    )
+    return hashlib.blake2b(repr(content).encode(), digest_size=8).hexdigest()
+
+
 def generate_health_checkup_plan(age, bmi, glucose, blood_pressure_systolic, blood_pressure_diastolic, has_diabetes, family_history):
     """
     Generate complete health checkup recommendation plan
@@ -327,5 +342,6 @@ def generate_health_checkup_plan(age, bmi, glucose, blood_pressure_systolic, blo
             "Follow up on any abnormal results promptly"
         ]
     }
+    checkup_plan["variant"] = checkup_plan_variant(checkup_plan)
     
     return checkup_plan
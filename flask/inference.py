@@ -0,0 +1,101 @@
+"""
+Inference Engine
+Scores feature rows without going through sklearn's per-call validation
+when the model is linear, falling back to the real estimator otherwise
+"""
+import numpy as np
+
+# Classifiers whose decision function is coef_ . x + intercept_
+LINEAR_ESTIMATORS = ('SVC', 'LinearSVC', 'LogisticRegression', 'SGDClassifier', 'RidgeClassifier', 'Perceptron')
+
+
+class LinearScorer:
+    """
+    Binary linear classifier with the MinMax scaling folded into its weights
+
+    For a scaler x' = x * scale + min and a model w . x' + b, the combined
+    decision function is (w * scale) . x + (w . min + b), so a prediction
+    is a single dot product on the raw features.
+    """
+    kind = 'linear'
+    has_scores = True
+
+    def __init__(self, weights, bias, classes):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.classes = np.asarray(classes)
+        # Plain Python copies for the single-row path, avoiding numpy call overhead
+        self._weights_list = self.weights.tolist()
+        self._classes_list = self.classes.tolist()
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Build a scorer from a fitted scaler + linear model pipeline, or return None"""
+        steps = [step for _, step in pipeline.steps] if hasattr(pipeline, 'steps') else [pipeline]
+        steps = [step for step in steps if step is not None and step != 'passthrough']
+        if not steps:
+            return None
+
+        *transforms, estimator = steps
+        if type(estimator).__name__ not in LINEAR_ESTIMATORS:
+            return None
+        if getattr(estimator, 'kernel', 'linear') != 'linear':
+            return None
+        if len(getattr(estimator, 'classes_', ())) != 2:
+            return None
+
+        coef = np.asarray(estimator.coef_, dtype=np.float64).ravel()
+        intercept = float(np.ravel(estimator.intercept_)[0])
+        scale = np.ones_like(coef)
+        offset = np.zeros_like(coef)
+
+        for transform in transforms:
+            if type(transform).__name__ != 'MinMaxScaler' or getattr(transform, 'clip', False):
+                return None
+            # Compose x -> x * s + m on top of the transforms already folded in
+            offset = offset * transform.scale_ + transform.min_
+            scale = scale * transform.scale_
+
+        return cls(coef * scale, float(coef @ offset) + intercept, estimator.classes_)
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.weights + self.bias
+
+    def predict(self, X):
+        return self.classes[(self.decision_function(X) > 0).astype(np.intp)]
+
+    def score_one(self, features):
+        score = self.bias
+        for weight, value in zip(self._weights_list, features):
+            score += weight * value
+        return score
+
+    def predict_one(self, features):
+        return self._classes_list[1] if self.score_one(features) > 0 else self._classes_list[0]
+
+
+class EstimatorScorer:
+    """Scorer backed by the fitted estimator itself, for models that are not linear"""
+    kind = 'estimator'
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+        # Pipelines only expose decision_function when their final step does
+        self.has_scores = hasattr(estimator, 'decision_function')
+
+    def decision_function(self, X):
+        return self.estimator.decision_function(X)
+
+    def predict(self, X):
+        return self.estimator.predict(X)
+
+    def score_one(self, features):
+        return float(self.decision_function(np.array([features], dtype=np.float64))[0])
+
+    def predict_one(self, features):
+        return self.predict(np.array([features], dtype=np.float64))[0].item()
+
+
+def build_scorer(pipeline):
+    """Return the fastest scorer that reproduces the pipeline's predictions"""
+    return LinearScorer.from_pipeline(pipeline) or EstimatorScorer(pipeline)
@@ -0,0 +1,243 @@
+"""
+Knowledge Base
+Local retrieval over curated diabetes guidance, answering common health
+assistant questions without a network call
+
+Documents are seeded from the rule-based assistant's answers, the diet
+planner's food and meal lists and the checkup planner's tests and
+lifestyle advice. Each is embedded as a TF-IDF vector (word unigrams and
+bigrams, lightly stemmed) in one L2-normalized NumPy matrix, so retrieval
+is a single matrix-vector product and a cosine top-k.
+"""
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from answer_cache import APOSTROPHES, NON_WORD, STOPWORDS
+from diet_planner import BASE_TIPS, get_diabetic_friendly_foods, get_foods_to_avoid, get_macronutrient_breakdown, generate_meal_suggestions
+from health_assistant import INTENT_RULES, RESPONSES
+from health_checkup import generate_health_checkup_plan, get_checkup_frequency, get_lifestyle_recommendations
+
+Document = namedtuple('Document', 'title answer tips source')
+
+SUFFIXES = ('ments', 'ment', 'ings', 'ing', 'ies', 'ed', 'ly', 's')
+
+# Sources whose documents are full answers to a question. The diet and
+# checkup documents are one-line summaries with generic tips: useful
+# offline, but no substitute for the LLM when it is available.
+CONFIDENT_SOURCES = frozenset(('health_assistant',))
+
+# Patient profiles whose checkup plans between them cover every test,
+# lifestyle tip and checkup frequency the planner can recommend:
+# (age, bmi, glucose, systolic, diastolic, has_diabetes, family_history)
+CHECKUP_PROFILES = (
+    (35, 22.0, 90, 115, 75, False, False),
+    (50, 27.0, 130, 135, 85, False, True),
+    (68, 33.0, 180, 150, 95, True, True),
+    (70, 24.0, 95, 120, 75, False, False),
+    (45, 24.0, 95, 145, 92, False, False),
+)
+
+
+def stem(word):
+    """Strip one common suffix and a trailing 'e', so "exercising" and "exercise" share a stem"""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith('ss'):
+            word = word[:-len(suffix)]
+            break
+    return word[:-1] if word.endswith('e') and len(word) > 3 else word
+
+
+def terms(text):
+    """Stemmed non-stopword unigrams of text, followed by their adjacent bigrams"""
+    words = NON_WORD.sub(' ', APOSTROPHES.sub('', text.casefold())).split()
+    unigrams = [stem(word) for word in words if word not in STOPWORDS]
+    return unigrams + [f"{a} {b}" for a, b in zip(unigrams, unigrams[1:])]
+
+
+def seed_documents():
+    """
+    Knowledge base documents built from the assistant, diet and checkup content
+
+    Returns:
+        list of Document: title, answer text, tips and the module it came from
+    """
+    documents = []
+    # The rule-based answers, titled with the keywords that select them;
+    # the default answer is a menu of topics, not guidance, so it is left out
+    for intent, groups in INTENT_RULES:
+        response = RESPONSES[intent]
+        keywords = ' '.join(keyword for group in groups for keyword in group)
+        documents.append(Document(keywords, response['answer'], tuple(response['tips']), 'health_assistant'))
+
+    for category, foods in get_diabetic_friendly_foods().items():
+        label = category.replace('_', ' ')
+        documents.append(Document(
+            f"diabetes-friendly {label}",
+            f"Good {label} to eat with diabetes or high blood sugar include {', '.join(foods[:3]).lower()}.",
+            tuple(foods), 'diet_planner'
+        ))
+    for category, foods in get_foods_to_avoid().items():
+        label = category.replace('_', ' ')
+        documents.append(Document(
+            f"foods to avoid: {label}",
+            f"Limit or avoid {label} foods, such as {', '.join(foods[:3]).lower()}; they make blood sugar harder to control.",
+            tuple(foods), 'diet_planner'
+        ))
+    for meal, suggestion in generate_meal_suggestions(1800, True).items():
+        documents.append(Document(
+            f"{meal} ideas",
+            f"Diabetes-friendly {meal} ideas combine fiber, lean protein and healthy fats, for example {suggestion['options'][0].lower()}.",
+            tuple(suggestion['options']), 'diet_planner'
+        ))
+    macros = get_macronutrient_breakdown(160, 100, True)
+    documents.append(Document(
+        "carbohydrates protein fat macronutrients",
+        f"With diabetes, aim for about {macros['carbohydrates']} of calories from carbohydrates, {macros['protein']} from protein "
+        f"and {macros['healthy_fats']} from healthy fats, with {macros['fiber']} of fiber. {macros['details']}.",
+        BASE_TIPS, 'diet_planner'
+    ))
+
+    tests, lifestyle, frequencies = {}, {}, {}
+    next_steps = ()
+    for age, bmi, glucose, systolic, diastolic, has_diabetes, family_history in CHECKUP_PROFILES:
+        plan = generate_health_checkup_plan(age, bmi, glucose, systolic, diastolic, has_diabetes, family_history)
+        next_steps = tuple(plan['next_steps'])
+        for tier in plan['blood_tests'].values():
+            for test in tier:
+                tests.setdefault(test['name'], test['reason'])
+        for tip in get_lifestyle_recommendations(age, bmi, glucose, systolic, has_diabetes):
+            lifestyle.setdefault(tip['category'], {}).setdefault(tip['recommendation'], tip['details'])
+        frequency = get_checkup_frequency(age, has_diabetes, glucose, systolic, diastolic)
+        frequencies.setdefault(frequency['doctor_visits'], frequency['reason'])
+
+    for name, reason in tests.items():
+        documents.append(Document(f"{name} test", f"{name}: {reason}.", next_steps, 'health_checkup'))
+    for category, recommendations in lifestyle.items():
+        (first, details), *_ = recommendations.items()
+        documents.append(Document(
+            category.lower(), f"{first}. {details}.",
+            tuple(f"{recommendation} - {details}" for recommendation, details in recommendations.items()),
+            'health_checkup'
+        ))
+    documents.append(Document(
+        "how often checkup doctor visit",
+        "How often to see your doctor depends on your health: every 3 months with diabetes, more often with high "
+        "blood pressure or glucose, and at least once a year otherwise.",
+        tuple(f"{visits}: {reason}" for visits, reason in frequencies.items()), 'health_checkup'
+    ))
+    return documents
+
+
+class KnowledgeBase:
+    """
+    Cosine top-k search over documents embedded as TF-IDF vectors
+
+    The vocabulary is every term in the documents; question terms outside
+    it carry no information about which document fits and are ignored.
+    Titles are counted twice, so a document is found by what it is about
+    more than by words that happen to appear in its tips. answer()
+    returns the best document as an {'answer', 'tips'} dict when it
+    scores at least min_score. confident_answer(), for callers that would
+    otherwise pay for an LLM call, only returns documents from
+    CONFIDENT_SOURCES scoring at least confident_score, and nothing while
+    confident_score is None (the default, until it has been tuned).
+    """
+
+    def __init__(self, documents=None, min_score=0.2, confident_score=None):
+        self.documents = tuple(seed_documents() if documents is None else documents)
+        self.min_score = min_score
+        self.confident_score = confident_score
+        self.queries = 0
+        self.answered = 0
+        self._lock = threading.Lock()
+
+        document_terms = [
+            terms(' '.join((document.title, document.title, document.answer) + tuple(document.tips)))
+            for document in self.documents
+        ]
+        self.vocabulary = {}
+        for doc_terms in document_terms:
+            for term in doc_terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        counts = np.zeros((len(self.documents), len(self.vocabulary)), dtype=np.float32)
+        for row, doc_terms in enumerate(document_terms):
+            np.add.at(counts[row], [self.vocabulary[term] for term in doc_terms], 1)
+
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(self.documents)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.matrix = self._weigh(counts)
+
+    def _weigh(self, counts):
+        # Sublinear term frequency times IDF, scaled to unit length
+        weights = np.zeros_like(counts)
+        np.log(counts, out=weights, where=counts > 0)
+        weights = np.where(counts > 0, weights + 1, 0) * self.idf
+        norms = np.linalg.norm(weights, axis=-1, keepdims=True)
+        return np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+
+    def vectorize(self, text):
+        """Unit-length TF-IDF vector of text (all zeros if it has no known terms)"""
+        columns = [self.vocabulary[term] for term in terms(text) if term in self.vocabulary]
+        counts = np.bincount(columns, minlength=len(self.vocabulary)).astype(np.float32)
+        return self._weigh(counts)
+
+    def search(self, question, k=3):
+        """
+        Documents most similar to question
+
+        Args:
+            question: Question text
+            k: Number of results
+
+        Returns:
+            list of (score, Document), best first; empty if the question has no usable terms
+        """
+        query = self.vectorize(question)
+        if not query.any():
+            return []
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.documents[i]) for i in top]
+
+    def answer(self, question, min_score=None, sources=None):
+        """
+        The best document's {'answer', 'tips'} if it scores at least min_score, else None
+
+        Args:
+            question: Question text
+            min_score: Threshold; self.min_score if None
+            sources: Only answer if the best document came from one of these
+        """
+        threshold = self.min_score if min_score is None else min_score
+        hits = self.search(question, k=1)
+        found = bool(hits) and hits[0][0] >= threshold and (sources is None or hits[0][1].source in sources)
+        with self._lock:
+            self.queries += 1
+            self.answered += found
+        if not found:
+            return None
+        document = hits[0][1]
+        return {'answer': document.answer, 'tips': list(document.tips)}
+
+    def confident_answer(self, question):
+        if self.confident_score is None:
+            return None
+        return self.answer(question, self.confident_score, CONFIDENT_SOURCES)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'documents': len(self.documents),
+                'vocabulary': len(self.vocabulary),
+                'matrix_bytes': self.matrix.nbytes,
+                'min_score': self.min_score,
+                'confident_score': self.confident_score,
+                'queries': self.queries,
+                'answered': self.answered,
+                'hit_rate': round(self.answered / self.queries, 4) if self.queries else 0.0,
+            }
@@ -0,0 +1,80 @@
+"""
+LLM Client
+One pooled OpenAI client per worker process, with explicit connect/read
+timeouts and a bounded retry budget for the health assistant
+"""
+import os
+import threading
+
+
+class LLMClient:
+    """
+    Lazily built, process-wide OpenAI client shared by all request threads
+
+    The OpenAI client and its httpx connection pool are thread-safe, so one
+    instance serves every thread and keeps TLS connections alive between
+    requests. Pools do not survive fork, so a new client is built per
+    process, and again if OPENAI_API_KEY changes.
+    """
+
+    def __init__(self, connect_timeout=5.0, read_timeout=30.0, max_retries=1,
+                 max_connections=20, keepalive_expiry=30.0, base_url=None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.base_url = base_url
+        self.clients_created = 0
+        self._current = None  # (pid, api_key, client), swapped as one reference
+        self._lock = threading.Lock()
+
+    def _build(self, api_key):
+        import httpx
+        from openai import OpenAI
+
+        http_client = httpx.Client(
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=self.keepalive_expiry
+            )
+        )
+        return OpenAI(
+            api_key=api_key,
+            base_url=self.base_url,
+            max_retries=self.max_retries,
+            http_client=http_client
+        )
+
+    def get(self, api_key):
+        """The shared client for api_key in this process, built on first use"""
+        pid = os.getpid()
+        current = self._current
+        if current is not None and current[0] == pid and current[1] == api_key:
+            return current[2]
+
+        with self._lock:
+            current = self._current
+            if current is None or current[0] != pid or current[1] != api_key:
+                # The old client may still be serving other threads (or belong to
+                # the parent process), so it is dropped rather than closed
+                current = self._current = (pid, api_key, self._build(api_key))
+                self.clients_created += 1
+            return current[2]
+
+    def close(self):
+        with self._lock:
+            current, self._current = self._current, None
+            if current is not None and current[0] == os.getpid():
+                current[2].close()
+
+    def stats(self):
+        return {
+            'connect_timeout': self.connect_timeout,
+            'read_timeout': self.read_timeout,
+            'max_retries': self.max_retries,
+            'max_connections': self.max_connections,
+            'clients_created': self.clients_created,
+        }
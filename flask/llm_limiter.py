@@ -0,0 +1,268 @@
+"""
+LLM Limiter
+Caps concurrent and per-second OpenAI requests, queueing callers for a
+short while and shedding load to the rule-based answer once the queue is
+full or the wait runs out
+
+Limits are per process by default. Given a shared directory, concurrency
+slots are flock'd files and the token bucket is a SQLite row in that
+directory, so every worker on the host shares one budget; locks held by
+a worker that dies are released by the kernel.
+"""
+import contextlib
+import fcntl
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from metrics import Histogram
+
+
+class LoadShed(Exception):
+    """Raised instead of calling the LLM when the limiter cannot admit a request in time"""
+
+
+class LocalTokenBucket:
+    """Token bucket for one process"""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Take a token if one is available; returns 0, or the seconds until one will be"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class SharedTokenBucket:
+    """Token bucket kept in a SQLite file, shared by every process that opens it"""
+
+    def __init__(self, path, rate, burst):
+        self.path = path
+        self.rate = rate
+        self.burst = burst
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY CHECK (id = 1), tokens REAL, updated REAL)"
+        )
+        conn.execute("INSERT OR IGNORE INTO bucket VALUES (1, ?, ?)", (float(burst), time.time()))
+
+    def _connect(self):
+        # sqlite3 connections belong to one thread, and must not cross fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self):
+        """Take a token if one is available; returns 0, or the seconds until one will be"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated = conn.execute("SELECT tokens, updated FROM bucket WHERE id = 1").fetchone()
+            now = time.time()
+            tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            conn.execute("UPDATE bucket SET tokens = ?, updated = ? WHERE id = 1", (tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+class SlotFiles:
+    """Concurrency slots shared between processes: holding an flock on slot-N.lock holds slot N"""
+
+    def __init__(self, directory, slots):
+        self.directory = directory
+        self.slots = slots
+
+    def try_acquire(self):
+        """File descriptor of a newly held slot, or None if all are taken"""
+        start = random.randrange(self.slots)
+        for i in range(self.slots):
+            path = os.path.join(self.directory, f"slot-{(start + i) % self.slots}.lock")
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def release(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+class LLMLimiter:
+    """
+    Concurrency limit, optional rate limit and bounded wait queue for LLM calls
+
+    acquire() admits a caller once it holds a concurrency slot and, when
+    a rate is set, a token, and returns the function that gives the slot
+    back; slot() does the same as a context manager. At most max_queue callers wait at a time, each
+    for at most max_wait seconds; anyone beyond that gets LoadShed
+    straight away so the caller can answer from the rules.
+    """
+
+    def __init__(self, max_concurrent=8, rate=0.0, burst=None, max_queue=16, max_wait=2.0, shared_dir=None):
+        self.max_concurrent = max_concurrent
+        self.rate = rate
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.shared_dir = shared_dir
+        burst = burst or max(1, int(rate))
+
+        self._bucket = None
+        self._slots = None
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+            self._slots = SlotFiles(shared_dir, max_concurrent)
+            if rate > 0:
+                self._bucket = SharedTokenBucket(os.path.join(shared_dir, 'token_bucket.db'), rate, burst)
+        elif rate > 0:
+            self._bucket = LocalTokenBucket(rate, burst)
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self.max_waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.wait_ms = Histogram()
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Hold a concurrency slot (and a rate token) for the duration of one LLM call"""
+        release = self.acquire()
+        try:
+            yield
+        finally:
+            release()
+
+    def acquire(self):
+        """
+        Wait for a concurrency slot and a rate token
+
+        Returns:
+            callable: Releases the slot; extra calls are ignored
+
+        Raises:
+            LoadShed: The queue is full, or nothing freed up within max_wait
+        """
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        with self._cond:
+            if self._waiting >= self.max_queue and self._active >= self.max_concurrent:
+                self.shed_queue_full += 1
+                raise LoadShed("LLM request queue is full")
+            self._waiting += 1
+            self.max_waiting = max(self.max_waiting, self._waiting)
+
+        held_local = False
+        shared_fd = None
+        try:
+            with self._cond:
+                while self._active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LoadShed("Timed out waiting for an LLM slot")
+                    self._cond.wait(remaining)
+                self._active += 1
+                held_local = True
+
+            if self._bucket:
+                self._wait_for_token(deadline)
+            if self._slots:
+                shared_fd = self._wait_for_shared_slot(deadline)
+        except LoadShed:
+            if held_local:
+                self._release_local()
+            with self._cond:
+                self.shed_timeout += 1
+            raise
+        finally:
+            with self._cond:
+                self._waiting -= 1
+
+        self.wait_ms.observe((time.monotonic() - started) * 1000)
+        with self._cond:
+            self.admitted += 1
+
+        released = []
+
+        def release():
+            if released:
+                return
+            released.append(True)
+            if shared_fd is not None:
+                self._slots.release(shared_fd)
+            self._release_local()
+
+        return release
+
+    def _release_local(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def _wait_for_token(self, deadline):
+        while True:
+            wait = self._bucket.take()
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise LoadShed("LLM rate limit reached")
+            time.sleep(wait)
+
+    def _wait_for_shared_slot(self, deadline):
+        delay = 0.005
+        while True:
+            fd = self._slots.try_acquire()
+            if fd is not None:
+                return fd
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LoadShed("Timed out waiting for a shared LLM slot")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+
+    def stats(self):
+        with self._cond:
+            counters = {
+                'max_concurrent': self.max_concurrent,
+                'rate': self.rate,
+                'shared': bool(self.shared_dir),
+                'active': self._active,
+                'queue_depth': self._waiting,
+                'max_queue_depth': self.max_waiting,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_timeout': self.shed_timeout,
+            }
+        counters['wait_ms'] = self.wait_ms.snapshot()
+        return counters
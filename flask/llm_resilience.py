@@ -0,0 +1,294 @@
+"""
+LLM Resilience
+Latency budget and circuit breaker around the health assistant's LLM call,
+falling back to the rule-based answer when the LLM is slow or failing
+"""
+import contextlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import current_app, has_app_context
+
+from llm_limiter import LoadShed
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class CircuitBreaker:
+    """
+    Stops calling the LLM while its recent error rate or p95 latency is too high
+
+    Outcomes from the last `window` seconds (at most max_samples of them)
+    are kept. Once there are min_calls of them and either threshold is
+    exceeded, the breaker opens and refuses calls for `cooldown` seconds.
+    It then lets a single probe through (half-open): a fast success closes
+    it, anything else reopens it. A probe that never reports back is
+    replaced after another cooldown; one that is given back with cancel()
+    is replaced straight away.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, error_rate=0.5, p95_latency=8.0, min_calls=10, window=60.0, cooldown=30.0,
+                 max_samples=200, clock=time.monotonic):
+        self.error_rate = error_rate
+        self.p95_latency = p95_latency
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self._clock = clock
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.probe_started_at = None
+        self.trips = 0
+
+    def allow(self):
+        """Whether a call may go to the LLM now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = self._clock()
+            if self.state == self.OPEN and now - self.opened_at < self.cooldown:
+                return False
+            if (self.state == self.HALF_OPEN and self.probe_started_at is not None
+                    and now - self.probe_started_at < self.cooldown):
+                return False
+            self.state = self.HALF_OPEN
+            self.probe_started_at = now
+            return True
+
+    def record(self, ok, latency):
+        """Report the outcome and duration in seconds of a call that allow() let through"""
+        with self._lock:
+            now = self._clock()
+            if self.state == self.HALF_OPEN:
+                if ok and latency < self.p95_latency:
+                    self.state = self.CLOSED
+                    self._samples.clear()
+                else:
+                    self._open(now)
+                return
+
+            self._samples.append((now, ok, latency))
+            self._expire(now)
+            if self.state == self.CLOSED and self._over_threshold():
+                self._open(now)
+
+    def cancel(self):
+        """Give back a call that allow() let through but that never reached the LLM"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.probe_started_at = None
+
+    def _open(self, now):
+        self.state = self.OPEN
+        self.opened_at = now
+        self.trips += 1
+
+    def _expire(self, now):
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+    def _over_threshold(self):
+        if len(self._samples) < self.min_calls:
+            return False
+        errors = sum(1 for _, ok, _ in self._samples if not ok)
+        if errors / len(self._samples) >= self.error_rate:
+            return True
+        return percentile([latency for _, _, latency in self._samples], 0.95) >= self.p95_latency
+
+    def stats(self):
+        with self._lock:
+            self._expire(self._clock())
+            samples = list(self._samples)
+        errors = sum(1 for _, ok, _ in samples if not ok)
+        return {
+            'state': self.state,
+            'trips': self.trips,
+            'window_calls': len(samples),
+            'window_error_rate': round(errors / len(samples), 4) if samples else 0.0,
+            'window_p95_latency': round(percentile([s[2] for s in samples], 0.95), 4) if samples else None,
+            'error_rate_threshold': self.error_rate,
+            'p95_latency_threshold': self.p95_latency,
+        }
+
+
+class UpstreamTimer:
+    """
+    Times the part of an LLM call spent waiting on the provider
+
+    Queueing for a limiter slot and caching the answer are local costs;
+    reporting them as LLM latency would let a traffic spike trip the
+    breaker while the provider is healthy.
+    """
+
+    def __init__(self):
+        self.latency = None
+
+    @contextlib.contextmanager
+    def __call__(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latency = time.perf_counter() - started
+
+
+class LLMGuard:
+    """
+    Runs LLM calls under a latency budget, behind a circuit breaker
+
+    call() starts the LLM call on a per-process thread pool and waits at
+    most `budget` seconds. After that it returns the fallback answer while
+    the call carries on in the background, so its result can still warm
+    the answer cache. At most max_inflight calls run at once; beyond that,
+    and while the breaker is open, the fallback is returned without
+    calling the LLM at all.
+
+    primary is called with an UpstreamTimer; wrapping the request to the
+    provider in `with timer():` makes that the latency the breaker sees.
+    Otherwise the whole of primary is timed.
+    """
+
+    def __init__(self, budget=4.0, breaker=None, max_inflight=16):
+        self.budget = budget
+        self.breaker = breaker or CircuitBreaker()
+        self.max_inflight = max_inflight
+        self.llm_successes = 0
+        self.over_budget = 0
+        self.errors = 0
+        self.short_circuited = 0
+        self.saturated = 0
+        self.background_completed = 0
+        self._inflight = 0
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Pool threads do not survive fork, so each process starts its own
+        if self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_inflight, thread_name_prefix='llm-call')
+            self._executor_pid = os.getpid()
+            self._inflight = 0
+        return self._executor
+
+    def admit(self):
+        """Ask the breaker for permission, counting refusals; for callers that time their own calls"""
+        if self.breaker.allow():
+            return True
+        with self._lock:
+            self.short_circuited += 1
+        return False
+
+    def cancel(self):
+        """Give back an admission whose call never reached the LLM, e.g. one shed by the limiter"""
+        self.breaker.cancel()
+
+    def record(self, ok, latency):
+        self.breaker.record(ok, latency)
+        with self._lock:
+            if ok:
+                self.llm_successes += 1
+            else:
+                self.errors += 1
+
+    def call(self, primary, fallback, hedge=True):
+        """
+        Return primary(timer) if it succeeds within the budget, else fallback()
+
+        Args:
+            primary: The LLM call, given an UpstreamTimer; may raise
+            fallback: Cheap answer used when primary is skipped, slow or fails
+            hedge: False waits for primary however long it takes, for callers
+                that are already off the request path
+
+        Returns:
+            Whichever of the two answers is served
+        """
+        if not self.admit():
+            return fallback()
+        with self._lock:
+            executor = self._get_executor()
+            saturated = self._inflight >= self.max_inflight
+            if saturated:
+                self.saturated += 1
+            else:
+                self._inflight += 1
+        if saturated:
+            self.cancel()
+            return fallback()
+
+        app = current_app._get_current_object() if has_app_context() else None
+        future = executor.submit(self._run, app, primary)
+        try:
+            return future.result(timeout=self.budget if hedge else None)
+        except FutureTimeoutError:
+            with self._lock:
+                self.over_budget += 1
+            future.add_done_callback(self._finished_late)
+            return fallback()
+        except LoadShed:
+            return fallback()
+        except Exception as e:
+            logger.warning("LLM call failed, serving the rule-based answer: %s", e)
+            return fallback()
+
+    def _run(self, app, primary):
+        timer = UpstreamTimer()
+        started = time.perf_counter()
+        ok = False
+        try:
+            if app is None:
+                result = primary(timer)
+            else:
+                with app.app_context():
+                    result = primary(timer)
+            ok = True
+            return result
+        except LoadShed:
+            # Shed by the limiter before reaching the LLM: says nothing about its health
+            ok = None
+            raise
+        finally:
+            if ok is None:
+                self.cancel()
+            else:
+                self.record(ok, timer.latency if timer.latency is not None else time.perf_counter() - started)
+            with self._lock:
+                self._inflight -= 1
+
+    def _finished_late(self, future):
+        if future.exception() is None:
+            with self._lock:
+                self.background_completed += 1
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'budget': self.budget,
+                'max_inflight': self.max_inflight,
+                'inflight': self._inflight if self._executor_pid == os.getpid() else 0,
+                'llm_successes': self.llm_successes,
+                'over_budget': self.over_budget,
+                'errors': self.errors,
+                'short_circuited': self.short_circuited,
+                'saturated': self.saturated,
+                'background_completed': self.background_completed,
+            }
+        counters['breaker'] = self.breaker.stats()
+        return counters
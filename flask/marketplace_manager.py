@@ -1,3 +1,4 @@
+from sqlalchemy.exc import IntegrityError
 from models import db, MarketplaceItem, UserPurchase
 
 def initialize_marketplace():
@@ -83,7 +84,11 @@ def initialize_marketplace():
         )
         db.session.add(item)
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another process stocked the marketplace first; the unique constraint kept one copy
+        db.session.rollback()
 
 def get_available_items(user_level):
     return MarketplaceItem.query.filter(
@@ -0,0 +1,65 @@
+"""
+Metrics
+Small thread-safe in-process instruments reported through /api/metrics
+"""
+import threading
+
+# Upper bounds in milliseconds, suited to in-process request latencies
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram
+
+    Percentiles are reported as the upper bound of the bucket they fall
+    in, which is accurate enough for dashboards and costs O(buckets).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q):
+        with self._lock:
+            if not self.count:
+                return 0.0
+            threshold = q * self.count
+            seen = 0
+            for i, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= threshold:
+                    return self.buckets[i] if i < len(self.buckets) else self.max
+            return self.max
+
+    def snapshot(self):
+        with self._lock:
+            count, total, maximum = self.count, self.total, self.max
+            buckets = {str(bound): n for bound, n in zip(self.buckets, self.counts)}
+            buckets['+Inf'] = self.counts[-1]
+        return {
+            'count': count,
+            'mean': round(total / count, 4) if count else 0.0,
+            'max': round(maximum, 4),
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'buckets': buckets,
+        }
@@ -0,0 +1,26 @@
+"""Add model_version to health_records
+
+Revision ID: a1c5e2d94b17
+Revises: f3fc7b8669ac
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c5e2d94b17'
+down_revision = 'f3fc7b8669ac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('health_records', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('model_version', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('health_records', schema=None) as batch_op:
+        batch_op.drop_column('model_version')
@@ -0,0 +1,49 @@
+"""Merge duplicate mission and challenge progress rows and make them unique per user
+
+Revision ID: a7f3c91e5d28
+Revises: d1a6e3b8f420
+Create Date: 2026-10-18 16:42:07.318592
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7f3c91e5d28'
+down_revision = 'd1a6e3b8f420'
+branch_labels = None
+depends_on = None
+
+# (progress table, parent key column, unique constraint)
+PROGRESS_TABLES = [
+    ('user_mission_progress', 'mission_id', 'uq_user_mission_progress_user_mission'),
+    ('user_challenge_progress', 'challenge_id', 'uq_user_challenge_progress_user_challenge'),
+]
+
+
+def merge_duplicates(table, parent_column):
+    # The oldest row of each (user, parent) pair keeps the furthest progress
+    # and earliest completion of its copies, then the copies are dropped
+    same_pair = f"dup.user_id = {table}.user_id AND dup.{parent_column} = {table}.{parent_column}"
+    op.execute(
+        f"UPDATE {table} SET "
+        f"current_progress = (SELECT MAX(dup.current_progress) FROM {table} dup WHERE {same_pair}), "
+        f"completed = EXISTS (SELECT 1 FROM {table} dup WHERE {same_pair} AND dup.completed), "
+        f"completed_at = (SELECT MIN(dup.completed_at) FROM {table} dup WHERE {same_pair}) "
+        f"WHERE id IN (SELECT MIN(id) FROM {table} GROUP BY user_id, {parent_column} HAVING COUNT(*) > 1)"
+    )
+    op.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY user_id, {parent_column})")
+
+
+def upgrade():
+    for table, parent_column, constraint in PROGRESS_TABLES:
+        merge_duplicates(table, parent_column)
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_unique_constraint(constraint, ['user_id', parent_column])
+
+
+def downgrade():
+    for table, parent_column, constraint in reversed(PROGRESS_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(constraint, type_='unique')
@@ -0,0 +1,42 @@
+"""Add assistant_answers
+
+Revision ID: b9d4f2a7c615
+Revises: e4b8a0c3d512
+Create Date: 2026-10-18 13:02:44.318206
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d4f2a7c615'
+down_revision = 'e4b8a0c3d512'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('assistant_answers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('model', sa.String(length=64), nullable=False),
+    sa.Column('question_key', sa.String(length=255), nullable=False),
+    sa.Column('answer', sa.Text(), nullable=False),
+    sa.Column('tips', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.Column('hits', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('model', 'question_key', name='uq_assistant_answers_model_question')
+    )
+    with op.batch_alter_table('assistant_answers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_assistant_answers_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_assistant_answers_last_used_at'), ['last_used_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('assistant_answers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_assistant_answers_last_used_at'))
+        batch_op.drop_index(batch_op.f('ix_assistant_answers_created_at'))
+
+    op.drop_table('assistant_answers')
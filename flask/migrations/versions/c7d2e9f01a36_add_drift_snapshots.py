@@ -0,0 +1,37 @@
+"""Add drift_snapshots
+
+Revision ID: c7d2e9f01a36
+Revises: a1c5e2d94b17
+Create Date: 2026-10-18 10:41:07.552913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e9f01a36'
+down_revision = 'a1c5e2d94b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('drift_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('model_version', sa.String(length=64), nullable=False),
+    sa.Column('worker', sa.String(length=100), nullable=True),
+    sa.Column('observations', sa.Integer(), nullable=False),
+    sa.Column('stats', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('drift_snapshots', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_drift_snapshots_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('drift_snapshots', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_drift_snapshots_created_at'))
+
+    op.drop_table('drift_snapshots')
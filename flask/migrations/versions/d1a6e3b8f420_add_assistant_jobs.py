@@ -0,0 +1,39 @@
+"""Add assistant_jobs
+
+Revision ID: d1a6e3b8f420
+Revises: b9d4f2a7c615
+Create Date: 2026-10-18 14:10:19.640275
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1a6e3b8f420'
+down_revision = 'b9d4f2a7c615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('assistant_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('question', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('assistant_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_assistant_jobs_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('assistant_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_assistant_jobs_created_at'))
+
+    op.drop_table('assistant_jobs')
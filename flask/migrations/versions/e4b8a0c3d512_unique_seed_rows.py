@@ -0,0 +1,61 @@
+"""Deduplicate seeded missions, challenges and marketplace items and make them unique
+
+Revision ID: e4b8a0c3d512
+Revises: c7d2e9f01a36
+Create Date: 2026-10-18 11:26:52.904117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8a0c3d512'
+down_revision = 'c7d2e9f01a36'
+branch_labels = None
+depends_on = None
+
+# (table, natural key columns, referencing table, foreign key column)
+SEEDED_TABLES = [
+    ('weekly_missions', ['week_start', 'mission_type'], 'user_mission_progress', 'mission_id'),
+    ('seasonal_challenges', ['season', 'start_date', 'challenge_type'], 'user_challenge_progress', 'challenge_id'),
+    ('marketplace_items', ['name'], 'user_purchases', 'item_id'),
+]
+
+
+def deduplicate(table, key, child_table, child_column):
+    # Point references at the oldest copy of each row, then drop the newer copies
+    key_match = ' AND '.join(f"keep.{column} = dup.{column}" for column in key)
+    group_by = ', '.join(key)
+    op.execute(
+        f"UPDATE {child_table} SET {child_column} = ("
+        f"SELECT MIN(keep.id) FROM {table} keep JOIN {table} dup ON {key_match} "
+        f"WHERE dup.id = {child_table}.{child_column}) "
+        f"WHERE {child_column} NOT IN (SELECT MIN(id) FROM {table} GROUP BY {group_by})"
+    )
+    op.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY {group_by})")
+
+
+def upgrade():
+    for table, key, child_table, child_column in SEEDED_TABLES:
+        deduplicate(table, key, child_table, child_column)
+
+    with op.batch_alter_table('weekly_missions', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_weekly_missions_week_type', ['week_start', 'mission_type'])
+
+    with op.batch_alter_table('seasonal_challenges', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_seasonal_challenges_season_type', ['season', 'start_date', 'challenge_type'])
+
+    with op.batch_alter_table('marketplace_items', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_marketplace_items_name', ['name'])
+
+
+def downgrade():
+    with op.batch_alter_table('marketplace_items', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_marketplace_items_name', type_='unique')
+
+    with op.batch_alter_table('seasonal_challenges', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_seasonal_challenges_season_type', type_='unique')
+
+    with op.batch_alter_table('weekly_missions', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_weekly_missions_week_type', type_='unique')
@@ -1,5 +1,18 @@
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
 from models import db, WeeklyMission, UserMissionProgress
+from progress_upsert import ProgressUpsert
+
+# Progress on this week's active missions of one type
+mission_progress = ProgressUpsert(
+    UserMissionProgress, WeeklyMission, 'mission_id',
+    [
+        WeeklyMission.mission_type == bindparam('mission_type'),
+        WeeklyMission.week_start == bindparam('week_start'),
+        WeeklyMission.is_active == True
+    ]
+)
 
 def get_current_week_start():
     today = date.today()
@@ -57,7 +70,11 @@ def create_weekly_missions():
         )
         db.session.add(mission)
     
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another process created this week's missions first; the unique constraint kept one copy
+        db.session.rollback()
 
 def get_active_missions():
     week_start = get_current_week_start()
@@ -70,23 +87,11 @@ def get_active_missions():
 
 def get_user_mission_progress(user_id):
     active_missions = get_active_missions()
+    progress_rows = mission_progress.rows(user_id, [mission.id for mission in active_missions])
     progress_list = []
     
     for mission in active_missions:
-        progress = UserMissionProgress.query.filter_by(
-            user_id=user_id,
-            mission_id=mission.id
-        ).first()
-        
-        if not progress:
-            progress = UserMissionProgress(
-                user_id=user_id,
-                mission_id=mission.id,
-                current_progress=0
-            )
-            db.session.add(progress)
-            db.session.commit()
-        
+        progress = progress_rows[mission.id]
         progress_list.append({
             'mission': mission,
             'progress': progress,
@@ -96,35 +101,9 @@ def get_user_mission_progress(user_id):
     return progress_list
 
 def update_mission_progress(user_id, mission_type, increment=1):
-    active_missions = WeeklyMission.query.filter_by(
-        mission_type=mission_type,
-        week_start=get_current_week_start(),
-        is_active=True
-    ).all()
-    
-    completed_missions = []
-    
-    for mission in active_missions:
-        progress = UserMissionProgress.query.filter_by(
-            user_id=user_id,
-            mission_id=mission.id
-        ).first()
-        
-        if not progress:
-            progress = UserMissionProgress(
-                user_id=user_id,
-                mission_id=mission.id,
-                current_progress=0
-            )
-            db.session.add(progress)
-        
-        if not progress.completed:
-            progress.current_progress += increment
-            
-            if progress.current_progress >= mission.target_value:
-                progress.completed = True
-                progress.completed_at = datetime.utcnow()
-                completed_missions.append(mission)
-    
-    db.session.commit()
-    return completed_missions
+    '''
+    Add increment to the user's progress on this week's active missions of mission_type
+
+    Returns the missions this update completed.
+    '''
+    return mission_progress.increment(user_id, increment, mission_type=mission_type, week_start=get_current_week_start())
@@ -0,0 +1,244 @@
+"""
+Model Artifact
+Persists the fitted preprocessing + model pipeline together with the
+feature schema, so serving never refits anything from the training CSV
+"""
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime
+
+ARTIFACT_FORMAT_VERSION = 1
+LINEAR_PARAMS_FORMAT = 'linear-f64'
+
+# Metadata copied from the pickled artifact into the numeric format's header
+HEADER_FIELDS = ('format_version', 'version', 'feature_names', 'schema', 'sklearn_version', 'trained_at', 'n_samples',
+                 'reference')
+
+# Column order the model is trained and served on
+FEATURE_NAMES = ['Glucose', 'Insulin', 'BMI', 'Age']
+
+# Equal-width bins between each feature's training min and max, used for drift checks
+REFERENCE_BINS = 10
+
+
+class ArtifactError(Exception):
+    """Raised when a model artifact is missing or does not match the expected schema"""
+
+
+def version_from_digest(digest):
+    """Version string: the current UTC time plus the start of a content digest"""
+    return f"{datetime.utcnow():%Y%m%d%H%M%S}-{digest.hexdigest()[:8]}"
+
+
+def compute_version(X, y, params):
+    """Derive a version string from the training data and model parameters"""
+    digest = hashlib.sha256()
+    digest.update(repr(FEATURE_NAMES).encode())
+    digest.update(X.tobytes())
+    digest.update(y.tobytes())
+    digest.update(repr(sorted(params.items())).encode())
+    return version_from_digest(digest)
+
+
+def schema_from_bounds(low, high):
+    """Feature schema ({name: {'min', 'max'}}) from per-feature lower and upper bounds"""
+    return {
+        name: {'min': float(low[i]), 'max': float(high[i])}
+        for i, name in enumerate(FEATURE_NAMES)
+    }
+
+
+def build_reference(X, predictions, n_bins=REFERENCE_BINS):
+    """
+    Summarize the training distribution for drift monitoring
+
+    Args:
+        X: Feature matrix, columns in FEATURE_NAMES order
+        predictions: Model predictions for X (0/1)
+        n_bins: Number of equal-width bins per feature
+
+    Returns:
+        dict: Per-feature mean, std, bin edges and bin proportions, plus the
+        positive prediction rate
+    """
+    import numpy as np
+
+    features = {}
+    for i, name in enumerate(FEATURE_NAMES):
+        column = X[:, i]
+        low, high = float(column.min()), float(column.max())
+        edges = np.linspace(low, high, n_bins + 1) if high > low else np.array([low, low + 1.0])
+        counts, _ = np.histogram(column, bins=edges)
+        features[name] = {
+            'mean': float(column.mean()),
+            'std': float(column.std()),
+            'edges': edges.tolist(),
+            'proportions': (counts / len(column)).tolist(),
+        }
+
+    return {
+        'n_samples': int(len(X)),
+        'features': features,
+        'positive_rate': float(np.mean(predictions)),
+    }
+
+
+def build_artifact(pipeline, X, y, schema=None, version=None, n_samples=None):
+    """
+    Wrap a fitted pipeline with everything serving needs to use it
+
+    Args:
+        pipeline: Fitted sklearn Pipeline (scaler + classifier)
+        X: Training feature matrix, columns in FEATURE_NAMES order; also the
+            drift reference
+        y: Training labels
+        schema: Feature min/max to record instead of X's, for models whose
+            scaler was fixed before training (see schema_from_bounds)
+        version: Version string to use instead of one derived from X, y and
+            the model parameters
+        n_samples: Rows the model was trained on, when X is not all of them
+
+    Returns:
+        dict: Artifact ready for save_artifact()
+    """
+    import sklearn
+
+    if schema is None:
+        schema = schema_from_bounds(X.min(axis=0), X.max(axis=0))
+    if version is None:
+        params = {k: v for k, v in pipeline.get_params().items() if not hasattr(v, 'get_params')}
+        version = compute_version(X, y, params)
+
+    return {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'version': version,
+        'feature_names': list(FEATURE_NAMES),
+        'schema': schema,
+        'pipeline': pipeline,
+        'sklearn_version': sklearn.__version__,
+        'trained_at': datetime.utcnow().isoformat(),
+        'n_samples': int(len(y) if n_samples is None else n_samples),
+        'reference': build_reference(X, pipeline.predict(X)),
+    }
+
+
+def save_artifact(artifact, path):
+    """Write the artifact atomically so a reader never sees a partial file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path):
+    """Load and validate a model artifact"""
+    if not os.path.exists(path):
+        raise ArtifactError(f"Model artifact not found at {path}. Run model.py to build it.")
+
+    with open(path, 'rb') as f:
+        artifact = pickle.load(f)
+
+    if not isinstance(artifact, dict) or artifact.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported model artifact format in {path}")
+    if artifact.get('feature_names') != FEATURE_NAMES:
+        raise ArtifactError(
+            f"Artifact features {artifact.get('feature_names')} do not match {FEATURE_NAMES}"
+        )
+
+    return artifact
+
+
+def save_linear_params(artifact, scorer, header_path, params_path):
+    """
+    Write a linear scorer as a flat little-endian float64 file plus a JSON header
+
+    The params file holds the folded weights followed by the bias, so it can
+    be memory-mapped and shared by forked workers. The header is written
+    last; a version only counts as exported once its header exists.
+    """
+    import numpy as np
+
+    params = np.concatenate([scorer.weights, [scorer.bias]]).astype('<f8')
+    header = {field: artifact[field] for field in HEADER_FIELDS if field in artifact}
+    header.update({
+        'format': LINEAR_PARAMS_FORMAT,
+        'dtype': '<f8',
+        'n_features': int(len(scorer.weights)),
+        'classes': scorer.classes.tolist(),
+    })
+
+    tmp_path = f"{params_path}.tmp"
+    params.tofile(tmp_path)
+    os.replace(tmp_path, params_path)
+
+    tmp_path = f"{header_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp_path, header_path)
+
+
+def load_linear_params(header_path, params_path):
+    """
+    Load a scorer written by save_linear_params without unpickling or importing sklearn
+
+    Returns:
+        tuple: (header dict, LinearScorer)
+    """
+    import numpy as np
+    from inference import LinearScorer
+
+    with open(header_path) as f:
+        header = json.load(f)
+
+    if header.get('format') != LINEAR_PARAMS_FORMAT or header.get('feature_names') != FEATURE_NAMES:
+        raise ArtifactError(f"Unsupported numeric model header in {header_path}")
+
+    params = np.memmap(params_path, dtype=header['dtype'], mode='r')
+    n_features = header['n_features']
+    if params.shape != (n_features + 1,):
+        raise ArtifactError(f"Expected {n_features + 1} parameters in {params_path}, found {params.shape[0]}")
+
+    return header, LinearScorer(params[:n_features], params[n_features], header['classes'])
+
+
+def to_feature_matrix(rows, max_rows=None):
+    """
+    Validate submitted feature rows and stack them into one float matrix
+
+    Args:
+        rows: List of rows, each either a list in FEATURE_NAMES order or a
+              dict keyed by FEATURE_NAMES
+        max_rows: Optional upper bound on the number of rows accepted
+
+    Returns:
+        numpy.ndarray: Array of shape (n_rows, len(FEATURE_NAMES))
+
+    Raises:
+        ValueError: If the rows are empty, ragged, non-numeric or non-finite
+    """
+    import numpy as np
+
+    if not isinstance(rows, list) or not rows:
+        raise ValueError("'rows' must be a non-empty list")
+    if max_rows is not None and len(rows) > max_rows:
+        raise ValueError(f"At most {max_rows} rows can be scored per request")
+
+    if isinstance(rows[0], dict):
+        try:
+            rows = [[row[name] for name in FEATURE_NAMES] for row in rows]
+        except (KeyError, TypeError):
+            raise ValueError(f"Every row must provide {', '.join(FEATURE_NAMES)}")
+
+    try:
+        X = np.asarray(rows, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError("Rows must all have the same length and contain only numbers")
+
+    if X.ndim != 2 or X.shape[1] != len(FEATURE_NAMES):
+        raise ValueError(f"Each row must have {len(FEATURE_NAMES)} values: {', '.join(FEATURE_NAMES)}")
+    if not np.isfinite(X).all():
+        raise ValueError("Rows must not contain NaN or infinite values")
+
+    return X
@@ -0,0 +1,197 @@
+"""
+Model Registry
+Directory of versioned model artifacts with an ACTIVE pointer, plus a
+live handle that picks up pointer changes in the background and swaps
+the served model without restarting workers
+
+Layout:
+    model_registry/
+        ACTIVE                  version currently served
+        versions/<version>.pkl           artifacts written by `flask train`
+        versions/<version>.metrics.json  cross-validation and holdout metrics
+        versions/<version>.linear.json   header for the numeric export of linear models
+        versions/<version>.linear.f64    folded weights + bias as flat float64
+
+Serving prefers the numeric export when present, so a worker can load a
+linear model without unpickling anything or importing sklearn.
+"""
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from inference import LinearScorer, build_scorer
+from model_artifact import ArtifactError, load_artifact, load_linear_params, save_artifact, save_linear_params
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR') or os.path.join(BASE_DIR, 'model_registry')
+
+# Everything a request needs from one model version, swapped as a single reference.
+# `metadata` is the numeric export's header or the full pickled artifact.
+LoadedModel = namedtuple('LoadedModel', ['version', 'metadata', 'scorer', 'loaded_at'])
+
+
+class ModelRegistry:
+    def __init__(self, root=DEFAULT_REGISTRY_DIR):
+        self.root = root
+        self.versions_dir = os.path.join(root, 'versions')
+        self.pointer_path = os.path.join(root, 'ACTIVE')
+
+    def artifact_path(self, version):
+        return os.path.join(self.versions_dir, f"{version}.pkl")
+
+    def linear_paths(self, version):
+        """Header and params paths of the numeric export"""
+        prefix = os.path.join(self.versions_dir, f"{version}.linear")
+        return f"{prefix}.json", f"{prefix}.f64"
+
+    def metrics_path(self, version):
+        return os.path.join(self.versions_dir, f"{version}.metrics.json")
+
+    def versions(self):
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.versions_dir) if name.endswith('.pkl'))
+
+    def active_version(self):
+        try:
+            with open(self.pointer_path) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, version):
+        artifact = load_artifact(self.artifact_path(version))
+        if artifact['version'] != version:
+            raise ArtifactError(f"Artifact file for {version} contains version {artifact['version']}")
+        return artifact
+
+    def load_active(self):
+        version = self.active_version()
+        if not version:
+            raise ArtifactError(f"No active model in {self.root}. Run model.py to publish one.")
+        return self.load(version)
+
+    def load_scorer(self, version):
+        """
+        Load what serving needs for a version
+
+        Returns:
+            tuple: (metadata dict, scorer). Linear models come from the numeric
+            export when it exists; anything else is unpickled.
+        """
+        header_path, params_path = self.linear_paths(version)
+        if os.path.exists(header_path):
+            header, scorer = load_linear_params(header_path, params_path)
+            if header['version'] != version:
+                raise ArtifactError(f"Numeric export for {version} contains version {header['version']}")
+            return header, scorer
+
+        artifact = self.load(version)
+        return artifact, build_scorer(artifact['pipeline'])
+
+    def export_linear(self, artifact):
+        """Write the numeric export for a linear artifact; returns False for other models"""
+        scorer = LinearScorer.from_pipeline(artifact['pipeline'])
+        if scorer is None:
+            return False
+        save_linear_params(artifact, scorer, *self.linear_paths(artifact['version']))
+        return True
+
+    def publish(self, artifact, activate=True):
+        """Store an artifact under its version and optionally make it the active one"""
+        os.makedirs(self.versions_dir, exist_ok=True)
+        save_artifact(artifact, self.artifact_path(artifact['version']))
+        self.export_linear(artifact)
+        if activate:
+            self.activate(artifact['version'])
+        return artifact['version']
+
+    def activate(self, version):
+        """Point ACTIVE at an existing version; the rename makes the switch atomic"""
+        if not os.path.exists(self.artifact_path(version)):
+            raise ArtifactError(f"Unknown model version {version}")
+        tmp_path = f"{self.pointer_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(version + '\n')
+        os.replace(tmp_path, self.pointer_path)
+
+
+def load_model(registry, version):
+    metadata, scorer = registry.load_scorer(version)
+    return LoadedModel(version, metadata, scorer, time.time())
+
+
+class LiveModel:
+    """
+    Serves the registry's active model and follows changes to ACTIVE
+
+    A daemon thread polls the pointer, loads a new version off the request
+    path and then replaces self._current in one assignment. Readers take
+    `current` once per request and use that snapshot, so the hot path never
+    locks and a request never mixes two model versions.
+    """
+
+    def __init__(self, registry, poll_interval=5.0):
+        self.registry = registry
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.reload_errors = 0
+        version = registry.active_version()
+        if not version:
+            raise ArtifactError(f"No active model in {registry.root}. Run model.py to publish one.")
+        self._current = load_model(registry, version)
+        self._failed_version = None
+        self._watcher_pid = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def current(self):
+        # Threads do not survive fork, so each worker process starts its own watcher
+        if self._watcher_pid != os.getpid() and self.poll_interval > 0:
+            self._start_watcher()
+        return self._current
+
+    def _start_watcher(self):
+        with self._start_lock:
+            if self._watcher_pid == os.getpid():
+                return
+            thread = threading.Thread(target=self._watch, name='model-registry-watcher', daemon=True)
+            thread.start()
+            self._watcher_pid = os.getpid()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self.refresh()
+
+    def refresh(self):
+        """Load and swap in the active version if it changed; returns True on a swap"""
+        version = self.registry.active_version()
+        if not version or version in (self._current.version, self._failed_version):
+            return False
+        try:
+            loaded = load_model(self.registry, version)
+        except Exception:
+            # Not retried until ACTIVE points somewhere else
+            self._failed_version = version
+            self.reload_errors += 1
+            logger.exception("Failed to load model version %s; keeping %s", version, self._current.version)
+            return False
+        self._current = loaded
+        self.reloads += 1
+        logger.info("Switched to model version %s", version)
+        return True
+
+    def stats(self):
+        current = self._current
+        return {
+            'version': current.version,
+            'scorer': current.scorer.kind,
+            'loaded_at': current.loaded_at,
+            'reloads': self.reloads,
+            'reload_errors': self.reload_errors,
+        }
@@ -44,6 +44,7 @@ class HealthRecord(db.Model):
     bp_diastolic = db.Column(db.Float, nullable=False)
     family_history = db.Column(db.Boolean, default=False)
     prediction = db.Column(db.Integer, nullable=False)
+    model_version = db.Column(db.String(64), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
@@ -94,6 +95,9 @@ class UserGamification(db.Model):
 
 class WeeklyMission(db.Model):
     __tablename__ = 'weekly_missions'
+    __table_args__ = (
+        db.UniqueConstraint('week_start', 'mission_type', name='uq_weekly_missions_week_type'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -111,6 +115,9 @@ class WeeklyMission(db.Model):
 
 class UserMissionProgress(db.Model):
     __tablename__ = 'user_mission_progress'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'mission_id', name='uq_user_mission_progress_user_mission'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -126,6 +133,9 @@ class UserMissionProgress(db.Model):
 
 class SeasonalChallenge(db.Model):
     __tablename__ = 'seasonal_challenges'
+    __table_args__ = (
+        db.UniqueConstraint('season', 'start_date', 'challenge_type', name='uq_seasonal_challenges_season_type'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -145,6 +155,9 @@ class SeasonalChallenge(db.Model):
 
 class UserChallengeProgress(db.Model):
     __tablename__ = 'user_challenge_progress'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'challenge_id', name='uq_user_challenge_progress_user_challenge'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -160,6 +173,9 @@ class UserChallengeProgress(db.Model):
 
 class MarketplaceItem(db.Model):
     __tablename__ = 'marketplace_items'
+    __table_args__ = (
+        db.UniqueConstraint('name', name='uq_marketplace_items_name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -216,3 +232,48 @@ class UserPreferences(db.Model):
     
     def __repr__(self):
         return f'<UserPreferences User {self.user_id}>'
+
+class DriftSnapshot(db.Model):
+    __tablename__ = 'drift_snapshots'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    model_version = db.Column(db.String(64), nullable=False)
+    worker = db.Column(db.String(100), nullable=True)
+    observations = db.Column(db.Integer, nullable=False)
+    stats = db.Column(db.Text, nullable=False)
+    
+    def __repr__(self):
+        return f'<DriftSnapshot {self.model_version} - {self.observations} observations>'
+
+class AssistantAnswer(db.Model):
+    __tablename__ = 'assistant_answers'
+    __table_args__ = (
+        db.UniqueConstraint('model', 'question_key', name='uq_assistant_answers_model_question'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    model = db.Column(db.String(64), nullable=False)
+    question_key = db.Column(db.String(255), nullable=False)
+    answer = db.Column(db.Text, nullable=False)
+    tips = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    hits = db.Column(db.Integer, default=0)
+    
+    def __repr__(self):
+        return f'<AssistantAnswer {self.model} - {self.question_key}>'
+
+class AssistantJob(db.Model):
+    __tablename__ = 'assistant_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    question = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default='pending')
+    result = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<AssistantJob {self.id} - {self.status}>'
@@ -0,0 +1,232 @@
+"""
+Online Training
+Incrementally updates a linear model from new health_records rows with
+partial_fit, so each run costs time proportional to the rows added since
+the last checkpoint rather than to the whole table
+
+Records carry no diagnosis, only the served model's own prediction, so
+the learner can at best re-learn the current decision boundary and may
+reinforce its mistakes. A published model is therefore scored on the
+labelled holdout of diabetes.csv, and is only activated if it does at
+least as well there as the active version.
+"""
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from model_artifact import FEATURE_NAMES, build_artifact, schema_from_bounds, version_from_digest
+from model_registry import ModelRegistry
+from models import db, HealthRecord
+
+DEFAULT_BATCH_SIZE = 1000
+# Records younger than this are left for the next run; see stream_new_records()
+DEFAULT_SETTLE_SECONDS = 60
+CLASSES = np.array([0, 1])
+
+
+class HoldoutRegression(Exception):
+    """Raised when an online model scores below the active model on the labelled holdout"""
+
+
+def checkpoint_path(registry):
+    return os.path.join(registry.root, 'online', 'checkpoint.pkl')
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def save_checkpoint(state, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def new_state(registry, random_state=42):
+    """
+    Start from the active model's feature ranges
+
+    The scaler is fixed to the active model's min/max schema instead of
+    being refit, so earlier updates stay valid as new rows arrive.
+    """
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.preprocessing import MinMaxScaler
+
+    metadata, _ = registry.load_scorer(registry.active_version())
+    bounds = np.array([
+        [metadata['schema'][name]['min'] for name in FEATURE_NAMES],
+        [metadata['schema'][name]['max'] for name in FEATURE_NAMES],
+    ])
+    return {
+        'scaler': MinMaxScaler(feature_range=(0, 1)).fit(bounds),
+        'bounds': bounds,
+        'model': SGDClassifier(loss='hinge', alpha=1e-4, random_state=random_state),
+        'watermark': 0,
+        'rows_seen': 0,
+        'batches': 0,
+        'updated_at': None,
+    }
+
+
+def partial_fit_batch(state, X, y):
+    state['model'].partial_fit(state['scaler'].transform(X), y, classes=CLASSES)
+    state['rows_seen'] += len(y)
+    state['batches'] += 1
+
+
+def seed_from_csv(state, csv_path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Anchor a fresh model on the labelled training CSV before it sees app records
+
+    Only the training split is fitted; the holdout is kept for the quality
+    check in publish_state().
+    """
+    from training import holdout_split, load_training_data
+
+    X, y = load_training_data(csv_path)
+    X_train, _, y_train, _ = holdout_split(X, y)
+    for start in range(0, len(y_train), batch_size):
+        partial_fit_batch(state, X_train[start:start + batch_size], y_train[start:start + batch_size])
+
+
+def stream_new_records(watermark, batch_size=DEFAULT_BATCH_SIZE, settle_seconds=DEFAULT_SETTLE_SECONDS):
+    """
+    Yield (ids, X, y) batches of health records newer than the watermark, oldest first
+
+    The watermark is an id, and ids are handed out before their insert
+    commits: under concurrent inserts (on PostgreSQL, say) a lower id can
+    become visible after a higher one was read, and would then be skipped
+    for good. To make that unlikely, the scan stops at the first record
+    created within the last settle_seconds, leaving it and everything after
+    it for the next run. A transaction that takes longer than that to
+    commit can still be missed.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settle_seconds)
+    unsettled = db.session.execute(
+        db.select(db.func.min(HealthRecord.id))
+        .where(HealthRecord.id > watermark, HealthRecord.created_at > cutoff)
+    ).scalar()
+
+    query = db.select(
+        HealthRecord.id, HealthRecord.glucose, HealthRecord.insulin,
+        HealthRecord.bmi, HealthRecord.age, HealthRecord.prediction
+    ).where(HealthRecord.id > watermark).order_by(HealthRecord.id)
+    if unsettled is not None:
+        query = query.where(HealthRecord.id < unsettled)
+
+    result = db.session.execute(query.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        batch = np.array(rows, dtype=np.float64)
+        yield batch[:, 0].astype(np.int64), batch[:, 1:5], batch[:, 5].astype(np.int64)
+
+
+def update(registry=None, batch_size=DEFAULT_BATCH_SIZE, seed_csv=None, reset=False,
+           settle_seconds=DEFAULT_SETTLE_SECONDS):
+    """
+    Apply every record added since the last checkpoint
+
+    Args:
+        registry: ModelRegistry whose active model provides the feature ranges
+        batch_size: Rows fetched and fitted per partial_fit call
+        seed_csv: Labelled CSV to fit first when starting a new model
+        reset: Discard the checkpoint and start over
+        settle_seconds: Leave records younger than this for the next run
+
+    Returns:
+        tuple: (state, rows processed in this run)
+    """
+    registry = registry or ModelRegistry()
+    path = checkpoint_path(registry)
+    state = None if reset else load_checkpoint(path)
+    if state is None:
+        state = new_state(registry)
+        if seed_csv:
+            seed_from_csv(state, seed_csv, batch_size)
+
+    processed = 0
+    for ids, X, y in stream_new_records(state['watermark'], batch_size, settle_seconds):
+        partial_fit_batch(state, X, y)
+        state['watermark'] = int(ids[-1])
+        processed += len(ids)
+        # Checkpoint per batch so an interrupted run resumes where it stopped
+        state['updated_at'] = datetime.utcnow().isoformat()
+        save_checkpoint(state, path)
+
+    if processed == 0 and not os.path.exists(path):
+        state['updated_at'] = datetime.utcnow().isoformat()
+        save_checkpoint(state, path)
+
+    return state, processed
+
+
+def publish_state(state, registry=None, activate=False, data_path=None):
+    """
+    Publish the online model as a registry version (scaler + SGD pipeline)
+
+    The model is scored on the labelled holdout of the training CSV with
+    the metrics train() reports, and so is the active version. Activation
+    is refused when the online model's ROC AUC is lower.
+
+    Args:
+        state: Online training state from update()
+        registry: ModelRegistry to publish to
+        activate: Make the new version the served one if it passes the check
+        data_path: Labelled CSV to take the holdout from (default diabetes.csv)
+
+    Returns:
+        tuple: (version, metrics)
+
+    Raises:
+        HoldoutRegression: activate was requested and the model scored below
+            the active version; it is published but left inactive
+    """
+    from sklearn.pipeline import Pipeline
+    from training import DEFAULT_DATA_PATH, holdout_metrics, holdout_split, load_training_data
+
+    registry = registry or ModelRegistry()
+    pipeline = Pipeline([('scaler', state['scaler']), ('sgd', state['model'])])
+    X, y = load_training_data(data_path or DEFAULT_DATA_PATH)
+    X_train, X_test, y_train, y_test = holdout_split(X, y)
+
+    active_version = registry.active_version()
+    _, active_scorer = registry.load_scorer(active_version)
+    metrics = {
+        'holdout': holdout_metrics(pipeline, X_test, y_test),
+        'active_holdout': {'version': active_version, **holdout_metrics(active_scorer, X_test, y_test)},
+        'online': {'watermark': state['watermark'], 'batches': state['batches'], 'rows_seen': state['rows_seen']},
+    }
+    passed = metrics['holdout']['roc_auc'] >= metrics['active_holdout']['roc_auc']
+
+    # The schema is the fixed scaler's bounds, and the drift reference is the
+    # labelled training split; the watermark makes the version unique
+    digest = hashlib.sha256(repr(sorted(metrics['online'].items())).encode())
+    artifact = build_artifact(
+        pipeline, X_train, y_train,
+        schema=schema_from_bounds(*state['bounds']),
+        version=version_from_digest(digest),
+        n_samples=state['rows_seen'],
+    )
+    artifact['online'] = metrics['online']
+    artifact['metrics'] = metrics
+    metrics['version'] = artifact['version']
+
+    registry.publish(artifact, activate=activate and passed)
+    with open(registry.metrics_path(artifact['version']), 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+    if activate and not passed:
+        raise HoldoutRegression(
+            f"Published model {artifact['version']} but did not activate it: holdout ROC AUC "
+            f"{metrics['holdout']['roc_auc']:.4f} is below active model {active_version}'s "
+            f"{metrics['active_holdout']['roc_auc']:.4f}"
+        )
+    return artifact['version'], metrics
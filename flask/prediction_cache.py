@@ -0,0 +1,95 @@
+"""
+Prediction Cache
+Bounded LRU cache of prediction results and generated plans, keyed on
+the normalized form inputs and tied to the model version that produced them
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_prediction_key(glucose, insulin, bmi, age, bp_systolic, bp_diastolic, family_history):
+    """Normalize form inputs so equivalent submissions share a cache entry"""
+    return (
+        float(glucose), float(insulin), float(bmi), float(age),
+        float(bp_systolic), float(bp_diastolic), bool(family_history)
+    )
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with a per-entry TTL
+
+    Entries belong to one model version; seeing a different version drops
+    everything so results from a previous model are never served.
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key, version):
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'model_version': self.version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
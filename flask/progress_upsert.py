@@ -0,0 +1,193 @@
+"""
+Progress Upsert
+Set-based creation and increments of users' mission and challenge progress
+
+One INSERT ... SELECT ... ON CONFLICT statement creates or advances the
+progress row for every matching mission or challenge at once, instead of
+a query, an insert and an update per row. It relies on the unique
+(user_id, mission_id) / (user_id, challenge_id) constraints. PostgreSQL
+and SQLite 3.35+ (the first with RETURNING) get the upsert; other
+databases use the per-row path.
+"""
+from datetime import datetime
+
+from sqlalchemy import bindparam, case, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db
+
+UPSERT_INSERTS = {'postgresql': postgresql_insert, 'sqlite': sqlite_insert}
+
+# Oldest server version whose upsert supports RETURNING, where it is newer than ON CONFLICT
+RETURNING_SINCE = {'sqlite': (3, 35)}
+
+
+class ProgressUpsert:
+    """
+    Increments of one progress table, for the parent rows matching criteria
+
+    criteria are WHERE clauses on parent_model written with bindparam()s,
+    whose values are passed to increment(). Statements are built once per
+    dialect and reused, so a call costs one round trip and no statement
+    construction.
+    """
+
+    def __init__(self, progress_model, parent_model, parent_column, criteria):
+        """
+        Args:
+            progress_model: UserMissionProgress or UserChallengeProgress
+            parent_model: WeeklyMission or SeasonalChallenge
+            parent_column: The progress model's foreign key to parent_model, e.g. 'mission_id'
+            criteria: WHERE clauses selecting parent_model rows
+        """
+        self.progress_model = progress_model
+        self.parent_model = parent_model
+        self.parent_column = parent_column
+        self.criteria = tuple(criteria)
+        self._statements = {}
+
+    def _upsert_insert(self):
+        dialect = db.session.get_bind().dialect
+        minimum = RETURNING_SINCE.get(dialect.name)
+        if minimum and (dialect.server_version_info or ()) < minimum:
+            return None
+        return UPSERT_INSERTS.get(dialect.name)
+
+    def _increment_statement(self, insert):
+        statement = self._statements.get(insert)
+        if statement is not None:
+            return statement
+
+        progress = self.progress_model.__table__
+        parent = self.parent_model
+        parent_column = self.parent_column
+        user_id = bindparam('user_id', type_=db.Integer)
+        amount = bindparam('increment', type_=db.Integer)
+        now = bindparam('now', type_=db.DateTime)
+        source = select(
+            user_id,
+            parent.id,
+            amount,
+            amount >= parent.target_value,
+            case((amount >= parent.target_value, now), else_=None),
+        ).where(
+            *self.criteria,
+            # Completed rows never change again; leaving them out means a call
+            # with nothing left to advance writes nothing
+            ~select(progress.c.id).where(
+                progress.c.user_id == user_id,
+                progress.c[parent_column] == parent.id,
+                progress.c.completed.is_(True),
+            ).exists()
+        )
+
+        statement = insert(progress).from_select(
+            ['user_id', parent_column, 'current_progress', 'completed', 'completed_at'], source
+        )
+        # statement.excluded would be added to the subquery's FROM rather than
+        # correlated, so the proposed row is referenced by name
+        target = (
+            select(parent.target_value)
+            .where(parent.id == literal_column(f"excluded.{parent_column}"))
+            .scalar_subquery()
+        )
+        total = progress.c.current_progress + statement.excluded.current_progress
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', parent_column],
+            set_={
+                'current_progress': total,
+                'completed': total >= target,
+                'completed_at': case((total >= target, now), else_=None),
+            },
+            where=progress.c.completed.is_not(True),
+        ).returning(progress.c[parent_column], progress.c.completed)
+
+        self._statements[insert] = statement
+        return statement
+
+    def increment(self, user_id, increment=1, **params):
+        """
+        Add increment to user_id's progress on every parent row matching the criteria
+
+        Progress rows are created as needed; completed ones are left alone.
+        A row becomes completed, with completed_at set, once its progress
+        reaches the parent's target_value.
+
+        Args:
+            user_id: Whose progress to advance
+            increment: Amount to add
+            **params: Values for the criteria's bind parameters
+
+        Returns:
+            list: parent_model rows that this call completed
+        """
+        insert = self._upsert_insert()
+        if insert is None:
+            return self.increment_rowwise(user_id, increment, **params)
+
+        result = db.session.execute(
+            self._increment_statement(insert),
+            {'user_id': user_id, 'increment': increment, 'now': datetime.utcnow(), **params}
+        )
+        # Rows completed earlier are skipped (also by the WHERE, should one
+        # complete concurrently), so every completed row returned was
+        # completed by this statement
+        completed_ids = [row[0] for row in result if row[1]]
+        db.session.commit()
+        if not completed_ids:
+            return []
+        return self.parent_model.query.filter(self.parent_model.id.in_(completed_ids)).order_by(self.parent_model.id).all()
+
+    def increment_rowwise(self, user_id, increment=1, **params):
+        """Same as increment(), with a query, insert and update per parent row; for databases without ON CONFLICT"""
+        parents = db.session.execute(
+            select(self.parent_model).where(*self.criteria).order_by(self.parent_model.id), params
+        ).scalars().all()
+
+        completed = []
+        for parent in parents:
+            progress = self.progress_model.query.filter_by(user_id=user_id, **{self.parent_column: parent.id}).first()
+            if not progress:
+                progress = self.progress_model(user_id=user_id, current_progress=0, **{self.parent_column: parent.id})
+                db.session.add(progress)
+
+            if not progress.completed:
+                progress.current_progress += increment
+                if progress.current_progress >= parent.target_value:
+                    progress.completed = True
+                    progress.completed_at = datetime.utcnow()
+                    completed.append(parent)
+
+        db.session.commit()
+        return completed
+
+    def rows(self, user_id, parent_ids):
+        """
+        user_id's progress rows for parent_ids, creating any that are missing
+
+        Returns:
+            dict: parent ID -> progress_model row
+        """
+        if not parent_ids:
+            return {}
+        model = self.progress_model
+        column = getattr(model, self.parent_column)
+        rows = {getattr(row, self.parent_column): row for row in
+                model.query.filter(model.user_id == user_id, column.in_(parent_ids))}
+        missing = [parent_id for parent_id in parent_ids if parent_id not in rows]
+        if not missing:
+            return rows
+
+        insert = self._upsert_insert()
+        new_rows = [{'user_id': user_id, self.parent_column: parent_id, 'current_progress': 0, 'completed': False}
+                    for parent_id in missing]
+        if insert is None:
+            db.session.add_all(model(**row) for row in new_rows)
+        else:
+            db.session.execute(
+                insert(model.__table__).values(new_rows).on_conflict_do_nothing(index_elements=['user_id', self.parent_column])
+            )
+        db.session.commit()
+        return {getattr(row, self.parent_column): row for row in
+                model.query.filter(model.user_id == user_id, column.in_(parent_ids))}
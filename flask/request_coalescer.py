@@ -0,0 +1,141 @@
+"""
+Request Coalescer
+Gathers concurrent single-row /predict calls arriving within a short
+window into one vectorized predict call, then hands each caller its row
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+from metrics import Histogram
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class RequestCoalescer:
+    """
+    Micro-batches single-row predictions
+
+    Callers block for at most max_wait (plus scoring time). When fewer than
+    bypass_below requests are in flight the row is scored directly, so
+    quiet periods pay no batching delay. A caller whose batch has not been
+    scored within result_timeout scores its own row instead, so a stalled
+    batching thread slows requests down rather than hanging them.
+    """
+
+    def __init__(self, max_wait=0.002, max_batch_size=64, bypass_below=2, result_timeout=0.1):
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self.bypass_below = bypass_below
+        self.result_timeout = result_timeout
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.latency_ms = Histogram()
+        self.bypassed = 0
+        self.coalesced = 0
+        self.timed_out = 0
+        self.worker_errors = 0
+        self._in_flight = 0
+        self._counter_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+
+    def predict_one(self, loaded_model, features):
+        """Predict one row with the given LoadedModel snapshot"""
+        with self._counter_lock:
+            self._in_flight += 1
+            bypass = self._in_flight < self.bypass_below
+            if bypass:
+                self.bypassed += 1
+        started = time.perf_counter()
+        try:
+            if bypass:
+                return loaded_model.scorer.predict_one(features)
+
+            self._ensure_worker()
+            future = Future()
+            self._queue.put((loaded_model, features, future))
+            try:
+                return future.result(timeout=self.result_timeout)
+            except FutureTimeoutError:
+                with self._counter_lock:
+                    self.timed_out += 1
+                return loaded_model.scorer.predict_one(features)
+        finally:
+            self.latency_ms.observe((time.perf_counter() - started) * 1000)
+            with self._counter_lock:
+                self._in_flight -= 1
+
+    def _ensure_worker(self):
+        # The batching thread does not survive fork, so start one per process
+        if self._worker_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            thread = threading.Thread(target=self._run, args=(self._queue,), name='predict-coalescer', daemon=True)
+            thread.start()
+            self._worker_pid = os.getpid()
+
+    def _run(self, pending):
+        while True:
+            batch = []
+            try:
+                batch.append(pending.get())
+                deadline = time.perf_counter() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(pending.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._score(batch)
+            except Exception as e:
+                # Fail this batch's callers but keep the thread alive for the next one
+                with self._counter_lock:
+                    self.worker_errors += 1
+                for item in batch:
+                    if not item[2].done():
+                        item[2].set_exception(e)
+
+    def _score(self, batch):
+        self.batch_sizes.observe(len(batch))
+        self.coalesced += len(batch)
+
+        # Requests keep the model snapshot they started with, even across a hot swap
+        groups = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+
+        for items in groups.values():
+            loaded_model = items[0][0]
+            try:
+                features = np.array([item[1] for item in items], dtype=np.float64)
+                predictions = loaded_model.scorer.predict(features).tolist()
+            except Exception as e:
+                for item in items:
+                    item[2].set_exception(e)
+                continue
+            for item, prediction in zip(items, predictions):
+                item[2].set_result(prediction)
+
+    def stats(self):
+        return {
+            'max_wait_ms': self.max_wait * 1000,
+            'max_batch_size': self.max_batch_size,
+            'bypass_below': self.bypass_below,
+            'result_timeout_ms': self.result_timeout * 1000,
+            'bypassed': self.bypassed,
+            'coalesced': self.coalesced,
+            'timed_out': self.timed_out,
+            'worker_errors': self.worker_errors,
+            'batch_size': self.batch_sizes.snapshot(),
+            'latency_ms': self.latency_ms.snapshot(),
+        }
@@ -0,0 +1,7 @@
+from checkup_batch import verify_checkup_rules
+
+
+def test_batch_rules_match_reference():
+    checked, mismatches = verify_checkup_rules()
+    assert checked > 0
+    assert mismatches == []
@@ -0,0 +1,16 @@
+import json
+
+from diet_planner import generate_diet_plan, verify_diet_plan_table
+
+
+def test_compiled_table_matches_reference():
+    checked, mismatches = verify_diet_plan_table()
+    assert checked > 0
+    assert mismatches == []
+
+
+def test_plan_is_plain_data():
+    plan = generate_diet_plan(150, 50, 31, 40, 1)
+    json.dumps(plan)
+    plan['foods_to_avoid']['high_sugar'].append('changed')
+    assert 'changed' not in generate_diet_plan(150, 50, 31, 40, 1)['foods_to_avoid']['high_sugar']
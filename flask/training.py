@@ -0,0 +1,196 @@
+"""
+Training Pipeline
+Stratified k-fold hyperparameter search for the scaler + SVC pipeline,
+run in parallel across cores, publishing the best model and its metrics
+to the model registry
+"""
+import hashlib
+import json
+import os
+import time
+
+import click
+import numpy as np
+
+from model_artifact import FEATURE_NAMES, build_artifact
+from model_registry import DEFAULT_REGISTRY_DIR, ModelRegistry
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_PATH = os.path.join(BASE_DIR, 'diabetes.csv')
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, '.cache', 'training')
+
+# Linear kernels only, so the served model keeps the closed-form scorer
+DEFAULT_PARAM_GRID = {
+    'svc__C': [0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 100.0],
+    'svc__class_weight': [None, 'balanced'],
+}
+
+
+def load_training_data(path=DEFAULT_DATA_PATH):
+    import pandas as pd
+
+    dataset = pd.read_csv(path, usecols=FEATURE_NAMES + ['Outcome'])
+    return dataset[FEATURE_NAMES].to_numpy(dtype=np.float64), dataset['Outcome'].to_numpy()
+
+
+def holdout_split(X, y, test_size=0.2, random_state=42):
+    """
+    Stratified train/holdout split
+
+    Every model is scored on the same holdout for a given seed, so the
+    online learner can be compared with the model train() published.
+
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test)
+    """
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
+
+
+def holdout_metrics(model, X_test, y_test):
+    """
+    Accuracy and ROC AUC (the metric the search refits on) on a holdout
+
+    Args:
+        model: Anything with predict() and decision_function(), a pipeline or a scorer
+
+    Returns:
+        dict: {'rows', 'accuracy', 'roc_auc'}
+    """
+    from sklearn.metrics import accuracy_score, roc_auc_score
+
+    return {
+        'rows': int(len(y_test)),
+        'accuracy': float(accuracy_score(y_test, model.predict(X_test))),
+        'roc_auc': float(roc_auc_score(y_test, model.decision_function(X_test))),
+    }
+
+
+def cached_folds(X, y, n_splits, random_state, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Stratified k-fold splits, cached on disk keyed by the data and split settings
+
+    Reusing the exact splits keeps repeated searches comparable and skips
+    re-splitting large datasets.
+    """
+    from sklearn.model_selection import StratifiedKFold
+
+    digest = hashlib.sha256(X.tobytes() + y.tobytes() + f"{n_splits}:{random_state}".encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, f"folds-{digest}.npz")
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            fold_ids = cached['fold_ids']
+    else:
+        fold_ids = np.empty(len(y), dtype=np.int16)
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        for fold, (_, test_index) in enumerate(splitter.split(X, y)):
+            fold_ids[test_index] = fold
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez_compressed(path, fold_ids=fold_ids)
+
+    return [(np.flatnonzero(fold_ids != fold), np.flatnonzero(fold_ids == fold)) for fold in range(n_splits)]
+
+
+def build_pipeline(random_state=42):
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import MinMaxScaler
+    from sklearn.svm import SVC
+
+    return Pipeline([
+        ('scaler', MinMaxScaler(feature_range=(0, 1))),
+        ('svc', SVC(kernel='linear', random_state=random_state)),
+    ])
+
+
+def train(data_path=DEFAULT_DATA_PATH, n_splits=5, n_jobs=-1, random_state=42, test_size=0.2,
+          param_grid=None, registry=None, activate=True, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Search hyperparameters with cross-validation and publish the best pipeline
+
+    Args:
+        data_path: CSV in diabetes.csv format
+        n_splits: Number of stratified folds
+        n_jobs: Parallel fits (-1 uses every core)
+        random_state: Seed for the holdout split, folds and model
+        test_size: Fraction held out for the final evaluation
+        param_grid: Grid over pipeline parameters; DEFAULT_PARAM_GRID if None
+        registry: ModelRegistry to publish to
+        activate: Whether the new version becomes the served one
+
+    Returns:
+        tuple: (artifact, metrics)
+    """
+    from sklearn.model_selection import GridSearchCV
+
+    registry = registry or ModelRegistry()
+    X, y = load_training_data(data_path)
+    X_train, X_test, y_train, y_test = holdout_split(X, y, test_size, random_state)
+
+    search = GridSearchCV(
+        build_pipeline(random_state),
+        param_grid or DEFAULT_PARAM_GRID,
+        scoring={'accuracy': 'accuracy', 'roc_auc': 'roc_auc'},
+        refit='roc_auc',
+        cv=cached_folds(X_train, y_train, n_splits, random_state, cache_dir),
+        n_jobs=n_jobs,
+    )
+    started = time.perf_counter()
+    search.fit(X_train, y_train)
+    search_seconds = time.perf_counter() - started
+
+    pipeline = search.best_estimator_
+    best = search.best_index_
+    results = search.cv_results_
+    metrics = {
+        'best_params': {k: v for k, v in search.best_params_.items()},
+        'cv': {
+            'folds': n_splits,
+            'candidates': len(results['params']),
+            'accuracy_mean': float(results['mean_test_accuracy'][best]),
+            'accuracy_std': float(results['std_test_accuracy'][best]),
+            'roc_auc_mean': float(results['mean_test_roc_auc'][best]),
+            'roc_auc_std': float(results['std_test_roc_auc'][best]),
+        },
+        'holdout': holdout_metrics(pipeline, X_test, y_test),
+        'fit_time': {
+            'search_seconds': round(search_seconds, 3),
+            'mean_fold_fit_seconds': float(results['mean_fit_time'][best]),
+            'refit_seconds': round(float(search.refit_time_), 3),
+        },
+        'n_jobs': n_jobs,
+        'random_state': random_state,
+        'data_path': os.path.basename(data_path),
+        'data_sha256': hashlib.sha256(X.tobytes() + y.tobytes()).hexdigest(),
+    }
+
+    artifact = build_artifact(pipeline, X_train, y_train)
+    artifact['metrics'] = metrics
+    metrics['version'] = artifact['version']
+
+    registry.publish(artifact, activate=activate)
+    with open(registry.metrics_path(artifact['version']), 'w') as f:
+        json.dump(metrics, f, indent=2)
+
+    return artifact, metrics
+
+
+@click.command('train')
+@click.option('--data', 'data_path', default=DEFAULT_DATA_PATH, show_default=True,
+              type=click.Path(exists=True, dir_okay=False), help='Training CSV in diabetes.csv format')
+@click.option('--folds', default=5, show_default=True, help='Stratified cross-validation folds')
+@click.option('--jobs', default=-1, show_default=True, help='Parallel fits; -1 uses every core')
+@click.option('--seed', default=42, show_default=True, help='Random seed for splits and model')
+@click.option('--registry', 'registry_dir', default=DEFAULT_REGISTRY_DIR, show_default=True,
+              help='Model registry directory to publish to')
+@click.option('--activate/--no-activate', default=True, show_default=True,
+              help='Make the new model the served version')
+def train_command(data_path, folds, jobs, seed, registry_dir, activate):
+    """Cross-validate, tune and publish a new model version."""
+    registry = ModelRegistry(registry_dir)
+    artifact, metrics = train(
+        data_path, n_splits=folds, n_jobs=jobs, random_state=seed,
+        registry=registry, activate=activate
+    )
+    click.echo(json.dumps(metrics, indent=2))
+    click.echo(f"Published model {artifact['version']}{' (active)' if activate else ''} to {registry.root}")